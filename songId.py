@@ -1,36 +1,82 @@
 import os
 import sys
+import signal
 import asyncio
-from shazamio import Shazam, Serialize
-from typing import List, Dict
+from typing import List, Dict, Optional
 from mutagen import File
-from mutagen.flac import FLAC, Picture
-from mutagen.mp3 import MP3
-from mutagen.id3 import ID3, APIC, error, COMM, ID3NoHeaderError
-from mutagen.mp4 import MP4, MP4Cover
-import requests
 import pydantic
 import shutil
 import json
 import time
-import math
 import logging
+import threading
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pprint import pformat
 from logging.handlers import TimedRotatingFileHandler
 from appdirs import user_config_dir
 from pathlib import Path
 
-from tools.messaging_signal import signalBot
 from tools.appConfig import appConfig
+from tools.scan_index import scanIndex, treeWalker
+from tools.pipeline import stagedPipeline, trackJob, cycleScheduler, cyclePacer, throughputEstimator
+from tools.recognizer import windowSampler, recognitionResult, recognizerBackend, rateController
+from tools.recognition_cache import recognitionCache
+from tools.recognition_cache.audioHash import audio_payload_hash
+from tools.tagging import tagTransaction, metadataSnapshot
+from tools.cover_art import coverCache
+from tools.metrics import stageMetrics
+# Optional parts (Signal, watcher, fingerprinting with shazamio/pydub/numpy, the local index,
+# journal, leases, metrics endpoint, profiler) are imported where they are first built, so a
+# `scan --once` answered from the scan index or the recognition cache starts without them
 
 class songIdentificator:
     SCRIPT_DIR = Path(__file__).parent
     CONFIG_DIR = Path(user_config_dir("config"))
+    DATA_DIR = SCRIPT_DIR / "data"
+    SUPPORTED_EXTENSIONS = ('.mp3', '.wav', '.flac', '.m4a', '.ogg')
 
     def __init__(self):
         self.logger = self._setup_logging("INFO")
         self.config = {}
         self.notify_bot_signal = None
+        self.signal_bot_key = None
+        self.signal_outbox = None
+        self.scan_index = None
+        self.work_journal = None
+        self.lease_manager = None
+        self.recognition_cache = None
+        self.cover_cache = None
+        self.fingerprint_index = None  # Loaded by the first file that is fingerprinted, see _get_fingerprint_index
+        self._fingerprint_index_lock = threading.Lock()
+        self.fingerprint_pool = None
+        self.fingerprint_pool_size = 0
+        self._fingerprint_pool_lock = threading.Lock()
+        self.window_stats = windowSampler.windowStats()
+        self._vacated_dirs: Dict[str, set] = {}
+        self._vacated_lock = threading.Lock()
+        self._pruned_roots = set()
+        self._walk_totals: Dict[str, tuple] = {}
+        self.recognizer = None
+        self.recognizer_key = None
+        self.executor = None
+        self.executor_size = 0
+        self.rate_controller = None
+        self.backlog = 0
+        self.last_admitted = 0
+        self.cycle_pacer = None
+        self.throughput = throughputEstimator.throughputEstimator()
+        self._stage_totals: Dict[str, list] = {}
+        self._folder_remaining: Dict[str, int] = {}  # Files each folder left for later cycles, this cycle
+        self._folder_throttled: Dict[str, List[str]] = {}  # Files each folder left in place while throttled, this cycle
+        self.left_over: Dict[str, List[str]] = {}  # Candidates the last cycle did not get to, by monitored path
+        self.metrics = stageMetrics.stageMetrics()
+        self.metrics.register_collector(self._collect_metrics)
+        self.metrics_server = None
+        self.metrics_address = None
+        self.profile_session = None
+        self._profile_trigger = (0, 0)
         self._reload_config()  # Initial config load
 
     def _setup_logging(self,lvl) -> logging.Logger:
@@ -82,21 +128,169 @@ class songIdentificator:
 
                 # Update instance attributes from config
                 self.check_interval = int(self.config.get("checkInterval"))
+                self.backlog_interval = int(self.config.get("backlogInterval"))
+                self.max_idle_interval = int(self.config.get("maxIdleInterval"))
+                if self.cycle_pacer is None:
+                    self.cycle_pacer = cyclePacer.cyclePacer(self.check_interval, self.backlog_interval, self.max_idle_interval)
+                else:
+                    self.cycle_pacer.configure(self.check_interval, self.backlog_interval, self.max_idle_interval)
                 self.max_queue_size = int(self.config.get("maxQueueSize"))
+                self.schedule_priority = self.config.get("schedulePriority")
+                self.path_overrides = self.config.get("pathOverrides") or {}
                 self.rename_and_move_only = self.config.get("renameAndMoveOnly")
                 self.remove_empty_folders = self.config.get("removeEmptyFolders")
+                self.watch_mode = self.config.get("watchMode")
+                self.watch_debounce = int(self.config.get("watchDebounce"))
+                self.watch_poll_interval = int(self.config.get("watchPollInterval"))
+                self.reconcile_interval = int(self.config.get("reconcileInterval"))
+                self.fingerprint_workers = int(self.config.get("fingerprintWorkers")) or os.cpu_count() or 1
+                self.fingerprint_process_pool = self.config.get("fingerprintProcessPool")
+                self.sampling_mode = self.config.get("samplingMode")
+                self.sampling_windows = int(self.config.get("samplingWindows"))
+                self.sampling_window_seconds = int(self.config.get("samplingWindowSeconds"))
+                self.lookup_concurrency = int(self.config.get("lookupConcurrency"))
+                self.lookup_max_rate = float(self.config.get("lookupMaxRate"))
+                self.throttle_retries = int(self.config.get("throttleRetries"))
+                if self.rate_controller is None:
+                    self.rate_controller = rateController.rateController(
+                        self.lookup_concurrency, self.lookup_max_rate, logger=self.logger
+                    )
+                else:
+                    self.rate_controller.configure(self.lookup_concurrency, self.lookup_max_rate)
+                self.recognizer_backend = self.config.get("recognizerBackend")
+                self.replay_latency = self.config.get("replayLatency")
+                self.tag_workers = int(self.config.get("tagWorkers"))
+                self.move_workers = int(self.config.get("moveWorkers"))
+                self.notify_workers = int(self.config.get("notifyWorkers"))
+                self.pipeline_queue_size = int(self.config.get("pipelineQueueSize"))
+                if self.config.get("useScanIndex"):
+                    if self.scan_index is None:
+                        self.scan_index = scanIndex.scanIndex(self.DATA_DIR / "scan_index.db")
+                elif self.scan_index is not None:
+                    self.scan_index.close()
+                    self.scan_index = None
+                if self.config.get("useWorkJournal"):
+                    if self.work_journal is None:
+                        from tools.work_journal import workJournal
+                        self.work_journal = workJournal.workJournal(self.DATA_DIR / "work_journal.db")
+                        unfinished = len(self.work_journal)
+                        if unfinished:
+                            self.logger.info(f"♻️ {unfinished} files were in flight when songID stopped, resuming them first")
+                elif self.work_journal is not None:
+                    self.work_journal.close()
+                    self.work_journal = None
+                if self.config.get("workerLeases"):
+                    lease_seconds = int(self.config.get("workerLeaseSeconds"))
+                    if self.lease_manager is None:
+                        from tools.work_lease import leaseManager
+                        self.lease_manager = leaseManager.leaseManager(
+                            self.config.get("workerId") or None, lease_seconds, logger=self.logger
+                        )
+                        self.logger.info(f"🪪 Sharing monitored paths with other workers as {self.lease_manager.worker_id}")
+                    else:
+                        self.lease_manager.lease_seconds = lease_seconds
+                elif self.lease_manager is not None:
+                    self.lease_manager.close()
+                    self.lease_manager = None
+                if self.config.get("useRecognitionCache"):
+                    ttl_seconds = int(self.config.get("recognitionCacheTtlDays")) * 86400
+                    max_entries = int(self.config.get("recognitionCacheMaxEntries"))
+                    if self.recognition_cache is None:
+                        self.recognition_cache = recognitionCache.recognitionCache(
+                            self.DATA_DIR / "recognition_cache.db", ttl_seconds, max_entries
+                        )
+                    else:
+                        self.recognition_cache.ttl_seconds = ttl_seconds
+                        self.recognition_cache.max_entries = max_entries
+                elif self.recognition_cache is not None:
+                    self.recognition_cache.close()
+                    self.recognition_cache = None
+                self.use_fingerprint_index = self.config.get("useFingerprintIndex")
+                self.fingerprint_index_min_matches = int(self.config.get("fingerprintIndexMinMatches"))
+                if self.use_fingerprint_index:
+                    if self.fingerprint_index is not None:
+                        self.fingerprint_index.min_matches = self.fingerprint_index_min_matches
+                elif self.fingerprint_index is not None:
+                    self.fingerprint_index.close()
+                    self.fingerprint_index = None
+                cover_memory_entries = int(self.config.get("coverCacheMemoryEntries"))
+                cover_max_bytes = int(self.config.get("coverCacheMaxMB")) * 1024 * 1024
+                if self.cover_cache is None:
+                    self.cover_cache = coverCache.coverCache(
+                        self.DATA_DIR / "covers", cover_memory_entries, cover_max_bytes, logger=self.logger
+                    )
+                else:
+                    self.cover_cache.memory_entries = cover_memory_entries
+                    self.cover_cache.max_disk_bytes = cover_max_bytes
+                if self.config.get("metricsEnabled"):
+                    address = (self.config.get("metricsHost"), int(self.config.get("metricsPort")))
+                    if self.metrics_server is not None and self.metrics_address != address:
+                        self.metrics_server.stop()
+                        self.metrics_server = None
+                    if self.metrics_server is None and self.metrics_address != address:
+                        from tools.metrics import metricsServer
+                        server = metricsServer.metricsServer(self.metrics, *address, logger=self.logger)
+                        try:
+                            server.start()
+                            self.metrics_server = server
+                        except OSError as e:
+                            # E.g. the port is taken by another songID using the same config; retried once the address changes
+                            self.logger.error(f"📈 Could not serve metrics on {address[0]}:{address[1]}, running without them: {e}")
+                        self.metrics_address = address
+                else:
+                    if self.metrics_server is not None:
+                        self.metrics_server.stop()
+                        self.metrics_server = None
+                    self.metrics_address = None
+                # Changing profileFiles/profileCycles to a non-zero value starts a profiling session
+                profile_trigger = (int(self.config.get("profileFiles")), int(self.config.get("profileCycles")))
+                if profile_trigger != self._profile_trigger:
+                    self._profile_trigger = profile_trigger
+                    if any(profile_trigger):
+                        self._start_profiling()
                 signal_notifier = self.config.get("notifySignal")
                 if signal_notifier:
-                    self.notify_bot_signal = signalBot.signalBot(
-                        self.config["signalSender"],
-                        self.config["signalGroup"],
-                        self.config["signalEndpoint"],
-                    )
+                    from tools.messaging_signal import signalBot, signalOutbox
+                    # Reloaded every cycle: keep the bot and its pooled connections unless they changed
+                    bot_key = (self.config["signalSender"], self.config["signalGroup"],
+                               str(self.config["signalEndpoint"]), int(self.config.get("signalTimeout")))
+                    if self.notify_bot_signal is None or self.signal_bot_key != bot_key:
+                        previous_bot = self.notify_bot_signal
+                        self.notify_bot_signal = signalBot.signalBot(
+                            *bot_key[:3],
+                            image_fetcher=self.cover_cache.get_bytes,
+                            timeout=bot_key[3],
+                        )
+                        self.signal_bot_key = bot_key
+                        if self.signal_outbox is not None:
+                            self.signal_outbox.bot = self.notify_bot_signal
+                        if previous_bot is not None:
+                            previous_bot.close()
+                    coalesce_window = int(self.config.get("signalCoalesceWindow"))
+                    retry_interval = int(self.config.get("signalRetryInterval"))
+                    if self.signal_outbox is None:
+                        self.signal_outbox = signalOutbox.signalOutbox(
+                            self.notify_bot_signal,
+                            self.DATA_DIR / "signal_outbox.jsonl",
+                            coalesce_window=coalesce_window,
+                            retry_interval=retry_interval,
+                            logger=self.logger,
+                            metrics=self.metrics,
+                        )
+                    else:
+                        self.signal_outbox.coalesce_window = coalesce_window
+                        self.signal_outbox.retry_interval = retry_interval
                     self.notifyEachSong = self.config.get("notifyEachSong")
                     self.notifySummary = self.config.get("notifySummary")
                     self.notifyErrors = self.config.get("notifyErrors")
                 else:
-                    self.notify_bot_signal = None
+                    if self.signal_outbox is not None:
+                        self.signal_outbox.close()
+                        self.signal_outbox = None
+                    if self.notify_bot_signal is not None:
+                        self.notify_bot_signal.close()
+                        self.notify_bot_signal = None
+                        self.signal_bot_key = None
             return
         
         except (FileNotFoundError, json.JSONDecodeError, pydantic.ValidationError, ValueError) as e:
@@ -111,249 +305,661 @@ class songIdentificator:
     
         raise RuntimeError("Failed to load config.")
 
-    def _estimate_processing_time(self, total_files: int) -> str:
-        cycles = math.ceil(total_files / self.max_queue_size)
-        total_seconds = cycles * self.check_interval
-        hours = total_seconds / 3600
-        return hours
+    def _estimate_time_left(self, remaining: int):
+        """Hours until `remaining` files are done at the measured throughput, None before anything was measured."""
+        seconds = self.throughput.eta(remaining, self.max_queue_size, self.backlog_interval)
+        return None if seconds is None else seconds / 3600
 
-    def add_cover_art(self, file_path: str, cover_url: str):
-        response = requests.get(cover_url)
-        if response.status_code != 200:
-            self.logger.error(f"Failed to download cover art from {cover_url}")
-            return 
-        
-        image_data = response.content
-        # Guess MIME from url extension (could be improved)
-        ext = os.path.splitext(cover_url)[1].lower()
-        if ext == '.png':
-            mime_type = 'image/png'
-        else:
-            mime_type = 'image/jpeg'  # default fallback
+    def _index_status(self, file_path: str, stat_result: os.stat_result = None) -> Optional[str]:
+        """Status the scan index recorded for the file, None when unknown or changed since."""
+        if self.scan_index is None:
+            return None
+        return self.scan_index.lookup(file_path, stat_result)
 
-        ext = os.path.splitext(file_path)[1].lower()
-        
-        if ext == '.mp3':
-            self._add_cover_mp3(file_path, image_data, mime_type)
-        elif ext == '.flac':
-            self._add_cover_flac(file_path, image_data, mime_type)
-        elif ext == '.m4a':
-            self._add_cover_m4a(file_path, image_data)
-        else:
-            self.logger.error(f"Cover art embedding not supported for {file_path}")
+    def _index_done(self, status: Optional[str]) -> bool:
+        if self.rename_and_move_only:
+            return status in ('tagged', 'renamed')
+        return status in ('tagged', 'manual')
 
-    def update_mp3_tags(self, file_path: str, cover_url: str=None, add_comment: str=None):
-        if add_comment:
-            id3 = ID3(file_path)
-            id3.add(COMM(encoding=3, lang='eng', desc='Comment', text=add_comment))
-            id3.save(file_path)
+    def _index_unchanged(self, file_path: str, stat_result: os.stat_result = None) -> bool:
+        """True when the scan index says the file was already handled and has not changed since."""
+        return self._index_done(self._index_status(file_path, stat_result))
 
-        # Add cover art if present
-        if cover_url:
-            self.add_cover_art(file_path, cover_url)
+    def _index_record(self, file_path: str, status: str, old_path: str = None):
+        if self.scan_index is None:
+            return
+        try:
+            if old_path:
+                self.scan_index.move(old_path, file_path, status)
+            else:
+                self.scan_index.record(file_path, status)
+        except Exception as e:
+            self.logger.warning(f"🗃️ Could not update scan index for {file_path}: {e}")
 
-        return id3
+    def _journal(self, job: trackJob.trackJob, step: str):
+        """Records a finished step in the work journal, with what is needed to resume right after it."""
+        if self.work_journal is None:
+            return
+        try:
+            payload, signature = {}, None
+            if step == 'fingerprinted':
+                payload = {"windows": job.windows, "window": job.window}
+                signature = job.signature.encode_to_binary() if job.signature is not None else None
+            elif step == 'looked_up':
+                payload = {"match": job.match.to_dict() if job.match else None, "audio_hash": job.audio_hash, "cached": job.cached}
+            if step == 'queued':
+                self.work_journal.enqueue(job.source_path, job.folder_path)
+            else:
+                self.work_journal.advance(job.source_path, step, job.path, payload, signature)
+            job.step = step
+        except Exception as e:
+            self.logger.warning(f"📒 Could not journal {step} for {job.path}: {e}")
 
-    def update_flac_tags(self, file_path: str, cover_url: str=None, add_comment: str=None):
-        if add_comment:
-            audio_flac = FLAC(file_path)
-            audio_flac['comment'] = add_comment
-            audio_flac.save()
+    def _journal_complete(self, job: trackJob.trackJob):
+        if self.work_journal is None:
+            return
+        try:
+            self.work_journal.complete(job.source_path)
+        except Exception as e:
+            self.logger.warning(f"📒 Could not close journal entry for {job.path}: {e}")
 
-        # Add cover art if present
-        if cover_url:
-            self.add_cover_art(file_path, cover_url)
-
-    def update_m4a_tags(self, file_path: str, artist: str=None, title: str=None, cover_url: str=None, album: str=None, release_date: str=None, add_comment: str=None):
-        audio = MP4(file_path)
-        # Apple uses special key names for tags:
-        if artist:
-            audio["\xa9ART"] = artist
-        if title:
-            audio["\xa9nam"] = title
-        if album:
-            audio["\xa9alb"] = album
-        if release_date:
-            audio["\xa9day"] = release_date
-        if add_comment:
-            audio["\xa9cmt"] = add_comment
-
-        audio.save()
-
-        # Add cover art if present
-        if cover_url:
-            self.add_cover_art(file_path, cover_url)
-            
-        return audio
-
-    def update_tags(self, file_path: str, artist: str=None, title: str=None, cover_url: str=None, album: str=None, release_date: str=None, add_comment: str=None):
-        audio = File(file_path, easy=True)
-        if audio is None:
-            self.logger.critical(f"Unsupported or invalid audio file: {file_path}")
-            return file_path
-        
-        if artist:
-            audio["artist"] = artist
-        if title:
-            audio["title"] = title
-        if album:
-            audio["album"] = album
-        if release_date:
-            audio["date"] = release_date
+    def _resume_jobs(self, folder_path: str) -> List[trackJob.trackJob]:
+        """Rebuilds the jobs a previous run left unfinished in this folder, each from its last journaled step."""
+        if self.work_journal is None:
+            return []
+        jobs = []
+        for entry in self.work_journal.pending(folder_path):
+            if not os.path.exists(entry["path"]):
+                # Moved or removed after its last journaled step, nothing left to do
+                self.work_journal.complete(entry["source_path"])
+                continue
+            if not self._claim(folder_path, entry["source_path"]):
+                # Another worker took the file over while we were down
+                self.work_journal.complete(entry["source_path"])
+                continue
+            job = trackJob.trackJob(entry["path"], folder_path)
+            job.source_path = entry["source_path"]
+            job.step = entry["step"]
+            payload = entry["payload"]
+            if job.step == 'fingerprinted':
+                from tools.recognizer import fingerprint
+                job.signature = fingerprint.signature_from_bytes(entry["signature"])
+                job.windows = payload.get("windows")
+                job.window = payload.get("window", 0)
+            elif job.step in ('looked_up', 'tagged'):
+                job.match = recognitionResult.recognitionResult.from_dict(payload.get("match"))
+                job.audio_hash = payload.get("audio_hash")
+                job.cached = payload.get("cached", False)
+            self.logger.info(f"♻️ Resuming {os.path.basename(job.path)} after step {job.step}")
+            jobs.append(job)
+        return jobs
+
+    def _claim(self, folder_path: str, file_path: str) -> bool:
+        """Claims the file for this worker; always True when songID runs alone."""
+        if self.lease_manager is None:
+            return True
+        try:
+            if not self.lease_manager.claim(folder_path, file_path):
+                return False
+        except OSError as e:
+            self.logger.warning(f"🪪 Could not claim {file_path}, leaving it for now: {e}")
+            return False
+        if not os.path.exists(file_path):
+            # Finished by the worker that held it before us
+            self.lease_manager.release(folder_path, file_path)
+            return False
+        return True
 
-        audio.save()
+    def _release(self, folder_path: str, file_path: str):
+        if self.lease_manager is None:
+            return
+        try:
+            self.lease_manager.release(folder_path, file_path)
+        except OSError as e:
+            self.logger.warning(f"🪪 Could not release the lease on {file_path}, it will expire: {e}")
 
-        if file_path.lower().endswith('.mp3'):
-            self.update_mp3_tags(file_path, cover_url, add_comment=add_comment)
+    def _fetch_cover(self, cover_url: str):
+        """Returns (image_data, mime_type) from the shared cover cache, or None."""
+        with self.metrics.time("cover_fetch"):
+            return self.cover_cache.get(cover_url)
 
-        elif file_path.lower().endswith('.flac'):
-            self.update_flac_tags(file_path, cover_url, add_comment=add_comment)
+    def add_cover_art(self, file_path: str, cover_url: str):
+        self.update_tags(file_path, cover_url=cover_url)
 
-        elif file_path.lower().endswith('.m4a'):
-            self.update_m4a_tags(file_path, artist, title, cover_url, album, release_date, add_comment=add_comment)
+    def update_tags(self, file_path: str, artist: str=None, title: str=None, cover_url: str=None, album: str=None, release_date: str=None, add_comment: str=None, strip: bool=False):
+        """Writes tags, comment and cover art with a single load and save of the file."""
+        transaction = tagTransaction.tagTransaction(file_path)
+        if strip:
+            transaction.strip()
+        transaction.set(artist=artist, title=title, album=album, date=release_date).comment(add_comment)
 
+        if cover_url:
+            if file_path.lower().endswith(('.mp3', '.flac', '.m4a')):
+                cover = self._fetch_cover(cover_url)
+                if cover:
+                    transaction.cover(*cover)
+            else:
+                self.logger.error(f"Cover art embedding not supported for {file_path}")
 
+        with self.metrics.time("tag_write"):
+            transaction.commit()
         return file_path
 
-    def handle_fallback(self, file_path: str, folder_path: str) -> int:
+    def handle_fallback(self, file_path: str, folder_path: str, snapshot: metadataSnapshot.metadataSnapshot = None) -> int:
         manual_input_dir = os.path.join(folder_path, 'manual_input')
-        os.makedirs(manual_input_dir, exist_ok=True)
 
         self.logger.debug(f"🟡Could not find {os.path.basename(file_path)}")
         self.logger.debug(f"🟡🔵Fallback using minimal tags...")
         
         if self.rename_and_move_only:
             self.logger.info(f"✅ Rename and Moving only {file_path}")
-            tags = self._read_tags(file_path)
-            new_path = self._rename_and_move(file_path, folder_path, tags.get('artist'), tags.get('title'))
+            if snapshot is None:
+                snapshot = self.metrics.timed("tag_read", self._read_snapshot)(file_path)
+            tags = self._read_tags(file_path, snapshot)
+            with self.metrics.time("move"):
+                new_path = self._rename_and_move(file_path, folder_path, tags.get('artist'), tags.get('title'), snapshot)
+            self._index_record(new_path, 'renamed', old_path=file_path)
+            self._note_vacated(folder_path, file_path, new_path)
             return 3
 
-        if self._minimal_tags_present(file_path):
+        if snapshot is None:
+            snapshot = self.metrics.timed("tag_read", self._read_snapshot)(file_path)
+        if self._minimal_tags_present(file_path, snapshot):
             self.logger.info(f"🟡☑️ Minimal in place...processing...")
-            tags = self._strip_tags(file_path)
-            new_path = self._rename_and_move(file_path, folder_path, tags.get('artist'), tags.get('title'))
-            self.update_tags(new_path, add_comment='roybatty')
+            with self.metrics.time("tag_write"):
+                tags = tagTransaction.tagTransaction(file_path).strip().comment('roybatty').commit()
+            with self.metrics.time("move"):
+                new_path = self._rename_and_move(file_path, folder_path, tags.get('artist'), tags.get('title'), snapshot)
+            self._index_record(new_path, 'tagged', old_path=file_path)
+            self._note_vacated(folder_path, file_path, new_path)
             self.logger.info(f"🟡✅Processed!")
             return 0
         else:
             self.logger.info(f"☔️ I guess all these tags are lost in time like tears in rain...")
+            os.makedirs(manual_input_dir, exist_ok=True)
             destination = os.path.join(manual_input_dir, os.path.basename(file_path))
-            shutil.move(file_path, destination)
+            with self.metrics.time("move"):
+                shutil.move(file_path, destination)
+            self._index_record(destination, 'manual', old_path=file_path)
+            self._note_vacated(folder_path, file_path, destination)
             self.logger.info(f"🕊️ Moved for manual input.")
             return 1
 
-    async def recognize_tracks_in_folder(self, folder_path: str) -> List[Dict]:
-        self.logger.info(f"🗄️Scanning folder: {folder_path}")
-        if not os.path.isdir(folder_path):
-            self.logger.error(f"Error: The folder '{folder_path}' does not exist.")
-            return []
-
-        shazam = Shazam()
-        supported_extensions = ('.mp3', '.wav', '.flac', '.m4a', '.ogg')
+    def _quarantine(self, job: trackJob.trackJob, e: Exception):
+        file_path = job.path
+        job.error = e
+        self.logger.error(f"❌ Failed to process {file_path}. Error: {e}")
+        try:
+            parent_dir = Path(job.folder_path).parent
+            quarantine_dir = parent_dir / 'quarantine' 
+            os.makedirs(quarantine_dir, exist_ok=True)
+            destination_path = os.path.join(quarantine_dir, os.path.basename(file_path))
+            shutil.move(file_path, destination_path)
+            if self.scan_index is not None:
+                self.scan_index.forget(file_path)
+            self._note_vacated(job.folder_path, file_path, destination_path)
+            self.logger.warning(f"☣️ Moved problematic file to {destination_path}")
+
+            if self.notify_bot_signal and self.notifyErrors:
+                payload = {
+                    "☣️": f"quarantine: {destination_path}"
+                }
+                self.logger.debug(f"✉️ sending notification {payload}")
+                self.signal_outbox.send(payload=payload)
+
+        except Exception as move_error:
+            msg = f"🚨 COULD NOT MOVE problematic file {file_path}. Error: {move_error}"
+            self.logger.critical(msg)
+            if self.notify_bot_signal and self.notifyErrors:
+                self.signal_outbox.send(bot_message=msg)
+        # Given up on either way; if the file stayed, the next scan will look at it afresh
+        self._journal_complete(job)
+
+    async def _discover(self, folder_path: str, supported_files: List[str], stats: Dict, jobs: List, executor,
+                        scheduler: cycleScheduler.cycleScheduler):
+        """Pipeline source: skips files that are already done and yields jobs the scheduler admits."""
+        loop = asyncio.get_running_loop()
 
-        supported_files = []
+        try:
+            # Files a previous run left half done go first, continuing after their last step
+            resumed = await loop.run_in_executor(executor, self._resume_jobs, folder_path)
+            resumed_paths = {job.path for job in resumed}
+            for job in resumed:
+                stats["processed"] += 1
+                jobs.append(job)
+                yield job
+
+            for file_path in supported_files:
+                filename = os.path.basename(file_path)
+                if file_path in resumed_paths:
+                    scheduler.skip(file_path)
+                    continue
+                try:
+                    # Unchanged files already handled in a previous cycle are skipped without opening them
+                    status = self._index_status(file_path)
+                    if self._index_done(status):
+                        scheduler.skip(file_path)
+                        stats["skipped"] += 1
+                        self.logger.debug(f"🗃️ Unchanged, skipping {filename}")
+                        continue
+
+                    # With other workers on the same library, only the one holding the lease opens the file
+                    if not await loop.run_in_executor(executor, self._claim, folder_path, file_path):
+                        scheduler.skip(file_path)
+                        stats["skipped"] += 1
+                        self.logger.debug(f"🪪 Claimed by another worker, skipping {filename}")
+                        continue
+
+                    # One parse answers the roybatty check here and the quality folder and fallback tags later
+                    snapshot = await loop.run_in_executor(executor, self.metrics.timed("tag_read", self._read_snapshot), file_path)
+
+                    # A backfill found artist and title tags (`tag_only`): renamed from those like rename-only files
+                    if self.rename_and_move_only or status == 'tag_only':
+                        # No lookup involved, so this does not count against the budget
+                        scheduler.skip(file_path)
+                        await loop.run_in_executor(executor, self.handle_fallback, file_path, folder_path, snapshot)
+                        self._release(folder_path, file_path)
+                        stats["skipped"] += 1
+                        stats["processed"] += 1
+                        self.logger.debug(f"☑️ Rename and Move only {filename}")
+                        continue
+
+                    #Check comment tag before calling Shazam
+                    if self._has_roybatty_comment(file_path, snapshot):
+                        scheduler.skip(file_path)
+                        self._index_record(file_path, 'tagged')
+                        self._release(folder_path, file_path)
+                        stats["skipped"] += 1
+                        self.logger.debug(f"☑️ Skipping {filename}")
+                        continue
+
+                except FileNotFoundError:
+                    # Moved or deleted since the walk, e.g. finished by another worker
+                    scheduler.skip(file_path)
+                    self._release(folder_path, file_path)
+                    self.logger.debug(f"👻 {filename} is gone, skipping")
+                    continue
+                except Exception as e:
+                    scheduler.skip(file_path)
+                    if self.lease_manager is not None and not self.lease_manager.holds(folder_path, file_path):
+                        # Another worker may be rewriting it; only the lease holder quarantines a file
+                        self.logger.warning(f"🪪 Could not read {filename} without holding its lease, skipping: {e}")
+                        continue
+                    await loop.run_in_executor(executor, self._quarantine, trackJob.trackJob(file_path, folder_path), e)
+                    self._release(folder_path, file_path)
+                    continue
 
-        for root, dirs, files in os.walk(folder_path):
-            for filename in files:
-                if filename.lower().endswith(supported_extensions):
-                    full_path = os.path.join(root, filename)
-                    supported_files.append(full_path)
+                # Waits until better ranked files of every monitored path were decided
+                if not await scheduler.admit(folder_path, file_path):
+                    self._release(folder_path, file_path)
+                    self.logger.info(f"Max queue {scheduler.budget} reached!")
+                    break
 
-        total = len(supported_files)
-        count = 0
-        count_fallback = 0
-        count_fallback_manual = 0
-        count_skipped = 0
-        
-        for filename in supported_files:
-            file_path = os.path.join(folder_path, filename)
+                stats["processed"] += 1
+                job = trackJob.trackJob(file_path, folder_path)
+                job.snapshot = snapshot
+                await loop.run_in_executor(executor, self._journal, job, 'queued')
+                jobs.append(job)
+                yield job
+        finally:
+            scheduler.finish(folder_path)
+
+    def _stage_fingerprint(self, job: trackJob.trackJob) -> trackJob.trackJob:
+        if job.step not in (None, 'queued'):
+            return job  # Resumed from the work journal, already past this stage
+
+        if self.recognition_cache is not None:
+            job.audio_hash = audio_payload_hash(job.path)
+            job.match = recognitionResult.recognitionResult.from_dict(self.recognition_cache.get(job.audio_hash))
+            if job.match:
+                job.cached = True
+                self.logger.info(f"💾 Known audio, reusing cached result for {os.path.basename(job.path)}")
+                self._journal(job, 'looked_up')
+                return job
+
+        self.logger.info(f"Searching... {os.path.basename(job.path)}...")
+        if self.sampling_mode == 'windowed':
+            job.windows = windowSampler.window_offsets(
+                self._track_length(job.path, job.snapshot), self.sampling_windows, self.sampling_window_seconds
+            )
+            self._fingerprint_window(job)
+        else:
+            job.signature, _, job.landmarks = self._generate_signature(job.path)
+            self._match_locally(job)
+            self._journal(job, 'looked_up' if job.match else 'fingerprinted')
+        return job
+
+    def _fingerprint_window(self, job: trackJob.trackJob):
+        """Decodes only the job's current sampling window and checks it against the local index."""
+        job.signature, job.decode_seconds, job.landmarks = self._generate_signature(
+            job.path, job.windows[job.window], self.sampling_window_seconds
+        )
+        self._match_locally(job)
+        self._journal(job, 'looked_up' if job.match else 'fingerprinted')
+
+    def _generate_signature(self, file_path: str, start_second: float = None, duration: float = None):
+        """Returns (signature, decode seconds, landmarks); landmarks only while the local index is enabled."""
+        from tools.recognizer import fingerprint  # shazamio, pydub and numpy, only once a file needs decoding
+        data, decode_seconds, landmarks = self._run_fingerprint(
+            fingerprint.generate_fingerprint_bytes, file_path, start_second, duration, self.use_fingerprint_index
+        )
+        return fingerprint.signature_from_bytes(data), decode_seconds, landmarks
 
-            try:
-                if self.remove_empty_folders:
-                    self._remove_empty_folders(folder_path)
-
-                if self.rename_and_move_only:
-                    self.handle_fallback(file_path, folder_path)
-                    count_skipped += 1
-                    count += 1
-                    self.logger.debug(f"☑️ Rename and Move only {filename}")
+    def _match_locally(self, job: trackJob.trackJob):
+        """Answers from the local fingerprint index when the audio was identified before, saving a Shazam lookup."""
+        if job.landmarks is None:
+            return
+        index = self._get_fingerprint_index()
+        if index is None:
+            return
+        with self.metrics.time("local_match"):
+            found = index.match(*job.landmarks)
+        if found:
+            result, score = found
+            job.match = recognitionResult.recognitionResult.from_dict(result)
+            job.match.backend = 'local'
+            self.logger.info(f"🧬 Matched locally ({score} landmarks): {os.path.basename(job.path)}")
+
+    def _get_fingerprint_index(self):
+        """The local fingerprint index, None when disabled.
+
+        Loaded (with numpy) by the first file that gets fingerprinted rather
+        than at startup, so runs answered by the scan index or the recognition
+        cache never read it.
+        """
+        if not self.use_fingerprint_index:
+            return None
+        with self._fingerprint_index_lock:
+            if self.fingerprint_index is None:
+                from tools.fingerprint_index import fingerprintIndex
+                self.fingerprint_index = fingerprintIndex.fingerprintIndex(
+                    self.DATA_DIR / "fingerprint_index.npz", self.fingerprint_index_min_matches, logger=self.logger
+                )
+            return self.fingerprint_index
+
+    def _run_fingerprint(self, func, *args):
+        """Decodes and fingerprints on the process pool so long files use every core."""
+        if not self.fingerprint_process_pool:
+            with self.metrics.time("fingerprint"):
+                return func(*args)
+
+        pool = self._get_fingerprint_pool()
+        try:
+            with self.metrics.time("fingerprint"):
+                return pool.submit(func, *args).result()
+        except BrokenProcessPool:
+            # A worker died (e.g. OOM on a huge file), start over with a fresh pool next time
+            with self._fingerprint_pool_lock:
+                if self.fingerprint_pool is pool:
+                    self.fingerprint_pool = None
+            pool.shutdown(wait=False)
+            raise
+
+    def _get_fingerprint_pool(self) -> ProcessPoolExecutor:
+        with self._fingerprint_pool_lock:
+            if self.fingerprint_pool is not None and self.fingerprint_pool_size != self.fingerprint_workers:
+                self.fingerprint_pool.shutdown(wait=False)
+                self.fingerprint_pool = None
+            if self.fingerprint_pool is None:
+                # spawn, not fork: the parent holds threads, sqlite handles and inotify descriptors
+                self.fingerprint_pool = ProcessPoolExecutor(
+                    max_workers=self.fingerprint_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                self.fingerprint_pool_size = self.fingerprint_workers
+                self.logger.debug(f"🧮 Started fingerprint pool with {self.fingerprint_workers} processes")
+            return self.fingerprint_pool
+
+    async def _stage_lookup(self, job: trackJob.trackJob) -> trackJob.trackJob:
+        if job.match or job.step in ('looked_up', 'tagged'):
+            return job
+
+        # Built by the first file that needs one, cycles answered by the caches never load shazamio
+        recognizer = await self._get_recognizer()
+        await self._lookup_windows(recognizer, job)
+        if not job.deferred:
+            # The paid-for answer (match or not) is on disk before anything else happens
+            await asyncio.get_running_loop().run_in_executor(None, self._journal, job, 'looked_up')
+        return job
+
+    async def _lookup_windows(self, recognizer: recognizerBackend.recognizerBackend, job: trackJob.trackJob):
+        loop = asyncio.get_running_loop()
+        while True:
+            lookup_seconds = 0.0
+            if job.signature is not None and not job.match:
+                started = time.perf_counter()
+                job.match = await self._recognize(recognizer, job)
+                lookup_seconds = time.perf_counter() - started
+                if job.deferred:
+                    return
+
+            if job.windows is None:
+                return
+
+            hit = bool(job.match)
+            self.window_stats.record(job.window, job.decode_seconds, lookup_seconds, hit)
+            self.logger.debug(
+                f"🪟 {os.path.basename(job.path)} window {job.window + 1}/{len(job.windows)} @{job.windows[job.window]:.0f}s: "
+                f"decode {job.decode_seconds:.2f}s lookup {lookup_seconds:.2f}s {'hit' if hit else 'miss'}"
+            )
+            if hit or job.window + 1 >= len(job.windows):
+                return
+
+            # Only decode the next window once the previous one failed to match
+            job.window += 1
+            await loop.run_in_executor(None, self._fingerprint_window, job)
+
+    async def _recognize(self, recognizer: recognizerBackend.recognizerBackend, job: trackJob.trackJob):
+        """One lookup under the shared rate controller.
+
+        Throttled lookups wait out the controller's backoff and try again; after
+        `throttleRetries` the file is deferred to a later cycle instead of
+        being quarantined.
+        """
+        for _ in range(self.throttle_retries + 1):
+            async with self.rate_controller.slot():
+                try:
+                    with self.metrics.time("lookup"):
+                        match = await recognizer.recognize(job.signature)
+                except recognizerBackend.throttledError as e:
+                    self.rate_controller.on_throttle(e.retry_after)
                     continue
+            self.rate_controller.on_success()
+            return match
+
+        job.deferred = True
+        self.logger.warning(f"⏳ Still throttled, leaving {os.path.basename(job.path)} for the next cycle")
+        return None
+
+    async def _get_recognizer(self) -> recognizerBackend.recognizerBackend:
+        """One recognizer backend, and with it one connection pool, for the life of the process.
+
+        Rebuilt only when recognizerBackend or replayLatency change in the config.
+        """
+        key = (self.recognizer_backend, self.replay_latency)
+        if self.recognizer is not None and self.recognizer_key == key:
+            return self.recognizer
+
+        pool_size = max(2, self.lookup_concurrency * 2)
+        recordings_path = self.DATA_DIR / "recordings.jsonl"
+        if self.recognizer_backend == 'record':
+            from tools.recognizer import replayRecognizer, shazamRecognizer
+            recognizer = replayRecognizer.replayRecognizer(
+                recordings_path, 'record', inner=shazamRecognizer.shazamRecognizer(pool_size), logger=self.logger
+            )
+        elif self.recognizer_backend == 'replay':
+            from tools.recognizer import replayRecognizer
+            recognizer = replayRecognizer.replayRecognizer(
+                recordings_path, 'replay', replay_latency=self.replay_latency, logger=self.logger
+            )
+        else:
+            from tools.recognizer import shazamRecognizer
+            recognizer = shazamRecognizer.shazamRecognizer(pool_size)
+        # Swapped in before closing the old one, so concurrent lookups never build a second backend
+        previous, self.recognizer, self.recognizer_key = self.recognizer, recognizer, key
+        self.logger.debug(f"🎧 Using the {self.recognizer_backend} recognizer")
+        if previous is not None:
+            await previous.close()
+        return self.recognizer
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Thread pool shared by every monitored path, resized when the worker settings change."""
+        per_path = self.fingerprint_workers + self.tag_workers + self.move_workers + self.notify_workers + 1
+        size = per_path * max(1, len(self.config.get('monitored_paths') or []))
+        if self.executor is not None and self.executor_size != size:
+            self.executor.shutdown(wait=False)
+            self.executor = None
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="songId")
+            self.executor_size = size
+        return self.executor
+
+    def _stage_tag(self, job: trackJob.trackJob) -> trackJob.trackJob:
+        if job.deferred:
+            return None
+        if self.lease_manager is not None and not self.lease_manager.holds(job.folder_path, job.source_path):
+            # Stalled past the lease and another worker took over, it finishes the file
+            self.logger.warning(f"🪪 Lease on {os.path.basename(job.path)} was lost, leaving the file to its new owner")
+            self._journal_complete(job)
+            return None
+        if not job.match:
+            job.landmarks = None
+            job.fallback = self.handle_fallback(job.path, job.folder_path, job.snapshot)
+            job.snapshot = None
+            self._journal_complete(job)
+            return None
+
+        match = job.match
+        if job.step == 'tagged':
+            return job  # Resumed after the tag write, only the move is left
+
+        if self.recognition_cache is not None and job.audio_hash and not job.cached:
+            self.recognition_cache.put(job.audio_hash, match.to_dict())
+        index = self._get_fingerprint_index() if job.landmarks is not None and match.backend != 'local' else None
+        if index is not None:
+            # Learn every network match so re-encodes and copies are answered locally next time
+            index.add(match.to_dict(), *job.landmarks)
+        job.landmarks = None
+
+        self.logger.info(f"👀Found! {match.artist} - {match.title} /{match.album}/{match.release_date}")
+        self.update_tags(job.path, match.artist, match.title, match.cover_url, match.album, match.release_date, add_comment='roybatty', strip=True)
+        self._journal(job, 'tagged')
+        return job
+
+    def _stage_move(self, job: trackJob.trackJob) -> trackJob.trackJob:
+        with self.metrics.time("move"):
+            new_path = self._rename_and_move(job.path, job.folder_path, job.match.artist, job.match.title, job.snapshot)
+        job.snapshot = None
+        self._index_record(new_path, 'tagged', old_path=job.path)
+        self._note_vacated(job.folder_path, job.path, new_path)
+        job.path = new_path
+        self._journal_complete(job)
+
+        self.logger.info(f"✅Processed!")
+        return job
+
+    def _note_vacated(self, folder_path: str, old_path: str, new_path: str):
+        """Remembers the directory a file left so it can be pruned at the end of the pass."""
+        old_dir = os.path.dirname(old_path)
+        if old_dir == os.path.dirname(new_path):
+            return
+        with self._vacated_lock:
+            self._vacated_dirs.setdefault(folder_path, set()).add(old_dir)
 
-                #Check comment tag before calling Shazam
-                if self._has_roybatty_comment(file_path):
-                    count_skipped += 1
-                    self.logger.debug(f"☑️ Skipping {filename}")
-                    continue
-                
-                if count >= self.max_queue_size:
-                    self.logger.info(f"Max queue {self.max_queue_size} reached!")
-                    break
+    def _stage_notify(self, job: trackJob.trackJob) -> None:
+        if self.notify_bot_signal and self.notifyEachSong:
+            payload = {
+                "📻": f"{job.match.title} - {job.match.artist}",
+                "image_url": job.match.cover_url
+            }
+            self.logger.debug(f"✉️ queueing notification {payload}")
+            self.signal_outbox.send(payload=payload, coalesce=True)
+        return None
 
-                self.logger.info(f"Searching... {filename}...")
-            
-                count += 1
-                out = await shazam.recognize_song(file_path)
-                if out and out.get('track'):
-                    track = out['track']
-                    album = None
-                    release_date = None
-                    for section in track.get('sections', []):
-                        if section.get('type') == 'SONG' and 'metadata' in section:
-                            album = section['metadata'][0].get('text') if section['metadata'] else None
-                            release_date =  section['metadata'][2].get('text') if section['metadata'] else None
-                            break
-
-                    title = track.get('title')
-                    artist = track.get('subtitle')
-                    cover_url = track.get('images', {}).get('coverart', None)
-
-                    self.logger.info(f"👀Found! {artist} - {title} /{album}/{release_date}")
-                    self._strip_tags(file_path)
-                    new_path = self._rename_and_move(file_path, folder_path, artist, title)
-
-                    self.update_tags(new_path, artist, title, cover_url, album, release_date, add_comment='roybatty')
-                    self.logger.info(f"✅Processed!")
-
-                    if self.notify_bot_signal and self.notifyEachSong:
-                        payload = {
-                            "📻": f"{title} - {artist}",
-                            "image_url": cover_url
-                        }
-                        self.logger.debug(f"✉️ sending notification {payload}")
-                        self.notify_bot_signal.sendMessage(payload=payload)
-                else:
-                    count_fallback += 1
-                    count_fallback_manual = count_fallback_manual + self.handle_fallback(file_path, folder_path)
+    async def recognize_tracks_in_folder(self, folder_path: str, files: List[str] = None,
+                                         scheduler: cycleScheduler.cycleScheduler = None) -> List[Dict]:
+        if not os.path.isdir(folder_path):
+            self.logger.error(f"Error: The folder '{folder_path}' does not exist.")
+            return []
 
-            except Exception as e:
-                self.logger.error(f"❌ Failed to process {file_path}. Error: {e}")
-                try:
-                    parent_dir = Path(folder_path).parent
-                    quarantine_dir = parent_dir / 'quarantine' 
-                    os.makedirs(quarantine_dir, exist_ok=True)
-                    destination_path = os.path.join(quarantine_dir, os.path.basename(file_path))
-                    shutil.move(file_path, destination_path)
-                    self.logger.warning(f"☣️ Moved problematic file to {destination_path}")
-
-                    if self.notify_bot_signal and self.notifyErrors:
-                        payload = {
-                            "☣️": f"quarantine: {destination_path}"
-                        }
-                        self.logger.debug(f"✉️ sending notification {payload}")
-                        self.notify_bot_signal.sendMessage(payload=payload)
-
-                except Exception as move_error:
-                    msg = f"🚨 COULD NOT MOVE problematic file {file_path}. Error: {move_error}"
-                    self.logger.critical(msg)
-                    if self.notify_bot_signal and self.notifyErrors:
-                        self.notify_bot_signal.sendMessage(bot_message=msg)
-
-                continue # Always continue to the next file
-            
-        queueProcessingDuration = self._estimate_processing_time(total)
+        loop = asyncio.get_running_loop()
+        stats = {"processed": 0, "skipped": 0}
+        jobs = []
+
+        executor = self._get_executor()
+        if scheduler is None:
+            scheduler = self._new_scheduler()
+            scheduler.plan({folder_path: await loop.run_in_executor(
+                executor, self.metrics.timed("walk", self._list_candidates), folder_path, files, self._walk_limit(folder_path)
+            )})
+        if self.remove_empty_folders and folder_path not in self._pruned_roots:
+            # One full sweep per folder for leftovers from before this run,
+            # afterwards only the directories we moved files out of are checked
+            await loop.run_in_executor(executor, self._remove_empty_folders, folder_path)
+            self._pruned_roots.add(folder_path)
+
+        # Already ranked by the scheduler, best candidates first
+        supported_files = scheduler.files_for(folder_path)
+        if files is not None:
+            # Watch mode hands over just the files that showed up
+            self.logger.info(f"👁️New files in {folder_path}: {len(supported_files)}")
+        else:
+            self.logger.info(f"🗄️Scanning folder: {folder_path}")
+
+        pipeline = stagedPipeline.stagedPipeline(
+            [
+                stagedPipeline.pipelineStage("fingerprint", self._traced("fingerprint", self._stage_fingerprint), self.fingerprint_workers, blocking=True),
+                stagedPipeline.pipelineStage("lookup", self._traced("lookup", self._stage_lookup), self.lookup_concurrency),
+                stagedPipeline.pipelineStage("tag", self._traced("tag", self._stage_tag), self.tag_workers, blocking=True),
+                stagedPipeline.pipelineStage("move", self._traced("move", self._stage_move), self.move_workers, blocking=True),
+                stagedPipeline.pipelineStage("notify", self._traced("notify", self._stage_notify), self.notify_workers, blocking=True),
+            ],
+            queue_size=self.pipeline_queue_size,
+            executor=executor,
+            on_error=self._quarantine,
+            logger=self.logger,
+        )
+        try:
+            await pipeline.run(self._discover(folder_path, supported_files, stats, jobs, executor, scheduler))
+        finally:
+            for job in jobs:
+                self._release(folder_path, job.source_path)
+            for name, (files, busy, concurrency) in pipeline.stage_stats.items():
+                totals = self._stage_totals.setdefault(name, [0, 0.0, 0])
+                totals[0] += files
+                totals[1] += busy
+                totals[2] += concurrency
+
+        with self._vacated_lock:
+            vacated = self._vacated_dirs.pop(folder_path, set())
+        if self.remove_empty_folders and vacated:
+            await loop.run_in_executor(executor, self._prune_empty_dirs, folder_path, vacated)
+        if self.fingerprint_index is not None:
+            await loop.run_in_executor(executor, self.fingerprint_index.save)
+
+        # A full scan leaves the folder's file count; files already handled never reached _discover
+        total, already_done = self._walk_totals.pop(folder_path, (len(supported_files), 0))
+        count = stats["processed"]
+        count_skipped = stats["skipped"] + already_done
+        count_fallback = sum(1 for job in jobs if job.fallback is not None)
+        count_fallback_manual = sum(job.fallback or 0 for job in jobs)
+
+        # Files of this folder nobody looked at this cycle, or left in place while throttled; they wait for the next ones
+        throttled = [job.path for job in jobs if job.deferred]
+        self._folder_throttled[folder_path] = throttled
+        count_deferred = len(throttled)
+        remaining = max(0, total - count_skipped - count) + count_deferred
+        self._folder_remaining[folder_path] = remaining
+        queueProcessingDuration = self._estimate_time_left(remaining)
 
         self.logger.info(f"🏁Processed: {count}/{total}/{count_skipped}/{count_fallback}/{count_fallback_manual} (processed/total/skip/fallback/manual)")
-        self.logger.info(f"Time left: {queueProcessingDuration}")
+        if self.sampling_mode == 'windowed' and count:
+            self.logger.info(f"🪟 Sampling: {self.window_stats.summary()}")
+        if count_deferred:
+            self.logger.info(f"⏳ Deferred while throttled: {count_deferred}")
+        if remaining:
+            eta_text = "unknown until the first cycle was measured" if queueProcessingDuration is None else f"{queueProcessingDuration:.2f}h"
+            self.logger.info(f"⏱️ {remaining} files left, estimated time left: {eta_text}")
 
         if self.notify_bot_signal and ((count) >= self.notifySummary):
             payload = {
@@ -366,180 +972,376 @@ class songIdentificator:
                 "manual": count_fallback_manual
             }
 
-            if queueProcessingDuration > 0.20:
-                payload["time_left"] = f"{queueProcessingDuration:.2f}hours ⏱️"
-            else:
+            if not remaining:
                 payload["✅"] = "completed!"
+            elif queueProcessingDuration is not None:
+                payload["time_left"] = f"{queueProcessingDuration:.2f}hours ⏱️"
+                slowest = self.throughput.bottleneck()
+                payload["rate"] = f"{slowest[1] * 3600:.0f} files/h ({slowest[0]})"
             self.logger.debug(f"✉️ sending notification {payload}")
-            self.notify_bot_signal.sendMessage(payload=payload)
+            self.signal_outbox.send(payload=payload)
 
         return True
 
-    def run(self):
-        while True:
-            start_time = time.time()
-            self.logger.info("--- Starting new song identification check cycle ---")
-            self._reload_config()  # Check for config changes at the start of each loop
-            
-            monitored_paths = self.config.get('monitored_paths')
+    def _collect_metrics(self):
+        """Values owned by other objects, read when the metrics endpoint is scraped."""
+        yield ("songid_backlog_files", "gauge", "Files still waiting for a lookup after the last full scan.", {}, self.backlog)
+        for stage, rate in self.throughput.rates.items():
+            yield ("songid_stage_throughput", "gauge", "Smoothed files per second each pipeline stage can handle.", {"stage": stage}, rate)
+        eta = self.throughput.eta(self.backlog, self.max_queue_size, self.backlog_interval)
+        if eta is not None:
+            yield ("songid_backlog_eta_seconds", "gauge", "Estimated seconds until the backlog is processed.", {}, eta)
+        for name, cache in (("recognition", self.recognition_cache), ("cover", self.cover_cache),
+                            ("fingerprint_index", self.fingerprint_index)):
+            if cache is not None:
+                yield ("songid_cache_hits_total", "counter", "Cache lookups answered from the cache.", {"cache": name}, cache.hits)
+                yield ("songid_cache_misses_total", "counter", "Cache lookups that had to go to the network.", {"cache": name}, cache.misses)
+        if self.rate_controller is not None:
+            yield ("songid_lookup_concurrency_limit", "gauge", "Lookups currently allowed in flight.", {}, int(self.rate_controller.concurrency))
+            yield ("songid_lookup_rate_limit", "gauge", "Lookups per second currently allowed, 0 when not limited.", {}, self.rate_controller.rate or 0)
+            yield ("songid_lookup_throttled_total", "counter", "Lookups refused by the recognizer because of rate limiting.", {}, self.rate_controller.throttled)
+        if self.lease_manager is not None:
+            yield ("songid_leases_held", "gauge", "Files this worker currently holds a lease on.", {}, len(self.lease_manager))
+            yield ("songid_lease_contended_total", "counter", "Files skipped because another worker held them.", {}, self.lease_manager.contended)
+            yield ("songid_lease_reclaimed_total", "counter", "Expired leases of dead workers taken over.", {}, self.lease_manager.reclaimed)
+            yield ("songid_lease_lost_total", "counter", "Leases taken over by another worker while still in use.", {}, self.lease_manager.lost)
+        if self.signal_outbox is not None:
+            yield ("songid_signal_queue_length", "gauge", "Signal messages waiting in the outbox.", {}, self.signal_outbox.pending())
+
+    def _start_profiling(self):
+        """Profiles the next profileFiles files or profileCycles cycles, one cycle when neither is set."""
+        if self.profile_session is not None:
+            self.logger.info(f"🔬 Already profiling {self.profile_session.describe()}")
+            return
+        files, cycles = self._profile_trigger
+        from tools.metrics import profileSession
+        self.profile_session = profileSession.profileSession(self.SCRIPT_DIR / "logs", files, cycles, logger=self.logger)
+        self.logger.info(f"🔬 Profiling {self.profile_session.describe()}, traces go to {self.profile_session.trace_path}")
+
+    def _finish_profiling(self):
+        session, self.profile_session = self.profile_session, None
+        if session is None:
+            return
+        summary = session.close()
+        self.logger.info(f"🔬 Profiled {session.files} files over {session.cycles} cycles: {summary or 'no calls recorded'}")
+
+    def _traced(self, stage: str, handler):
+        """Pipeline stage handler that also records per-file timings while a profiling session runs."""
+        return handler if self.profile_session is None else self.profile_session.wrap(stage, handler)
+
+    def _walk_limit(self, folder_path: str):
+        """With `walk` priority the first files found are the ones processed, so the walk can stop at the budget."""
+        if self.schedule_priority != 'walk':
+            return None  # Ranking by age or size needs every candidate
+        if self.scan_index is None:
+            # Without an index nothing is ever reported done, so a limited walk would find the same first files every cycle
+            return None
+        if self.lease_manager is not None:
+            # Other workers' indexes hold what they finished, so every worker's limited walk would
+            # return the same first files, mostly leased by someone else, and extra workers would idle
+            return None
+        override = (self.path_overrides.get(folder_path) or {}).get('maxQueueSize')
+        return min(self.max_queue_size, override or self.max_queue_size)
+
+    def _new_scheduler(self) -> cycleScheduler.cycleScheduler:
+        return cycleScheduler.cycleScheduler(self.max_queue_size, self.schedule_priority, self.path_overrides)
+
+    async def _scan_paths(self, paths: Dict[str, List[str]]) -> int:
+        """Processes monitored paths concurrently under one shared, globally ranked maxQueueSize budget.
+
+        `paths` maps each folder to the files to process, or to None for a full scan.
+        Returns the number of candidates left over for later cycles.
+        """
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        session = self.profile_session
+        if session is not None:
+            session.start_cycle()
+        try:
+            return await self._scan_cycle(paths, loop, executor)
+        finally:
+            if session is not None:
+                session.end_cycle()
+                if session.finished:
+                    await loop.run_in_executor(executor, self._finish_profiling)
+
+    async def _scan_cycle(self, paths: Dict[str, List[str]], loop, executor) -> int:
+        walk_started = time.monotonic()
+        listings = await asyncio.gather(
+            *(loop.run_in_executor(executor, self.metrics.timed("walk", self._list_candidates), path, files, self._walk_limit(path))
+              for path, files in paths.items())
+        )
+        walk_seconds = time.monotonic() - walk_started
+        self._stage_totals = {}
+        self._folder_remaining = {}
+        self._folder_throttled = {}
+        scheduler = self._new_scheduler()
+        scheduler.plan(dict(zip(paths, listings)))
+
+        async def scan(path, files):
             try:
-                for path in monitored_paths:
-                    asyncio.run(self.recognize_tracks_in_folder(path))
-               
-            except (json.JSONDecodeError) as e:
-                self.logger.critical(f"Could not load monitored paths {e}")
-                raise RuntimeError("Could not load monitored paths!")
+                return await self.recognize_tracks_in_folder(path, files=files, scheduler=scheduler)
+            finally:
+                scheduler.finish(path)  # A failed path must not keep the others waiting
+
+        results = await asyncio.gather(*(scan(path, files) for path, files in paths.items()), return_exceptions=True)
+        for path, result in zip(paths, results):
+            if isinstance(result, Exception):
+                self.logger.error(f"❌ Scanning {path} failed: {result!r}")
+
+        # Paths ran side by side, so their workers add up for the cycle's stage capacities
+        for name, (files, busy, concurrency) in self._stage_totals.items():
+            self.throughput.observe_stage(name, files, busy, concurrency)
+        if scheduler.used:
+            self.throughput.observe_cycle(walk_seconds)
+            self.logger.debug(f"📈 Throughput: {self.throughput.summary()}")
+        self.last_admitted = scheduler.used
+        self.left_over = {}
+        for path, file_path in scheduler.deferred_files:
+            self.left_over.setdefault(path, []).append(file_path)
+        for path, files in self._folder_throttled.items():
+            self.left_over.setdefault(path, []).extend(files)
+        # A walk stopped at its limit never listed the rest, so the scheduler alone undercounts
+        return max(scheduler.deferred, sum(self._folder_remaining.values()))
+
+    async def _full_scan(self, target: str = None):
+        """One cycle over every monitored path, or only over `target` (see `_scan_targets`)."""
+        if target is not None:
+            paths = self._scan_targets(target)
+        else:
+            paths = {path: None for path in self.config.get('monitored_paths')}
+        self.backlog = await self._scan_paths(paths)
+
+    def _scan_targets(self, target: str) -> Dict[str, List[str]]:
+        """Maps a folder or file given on the command line to {library root: files, None for all of it}.
+
+        Inside a monitored path the monitored path stays the root, so files
+        end up in its Artist/Quality folders as usual; anything else is its
+        own root.
+        """
+        target = os.path.abspath(target)
+        for root in self.config.get('monitored_paths'):
+            root_path = os.path.abspath(root)
+            if target == root_path:
+                return {root: None}
+            if target.startswith(root_path + os.sep):
+                if os.path.isfile(target):
+                    return {root: [target]}
+                return {root: [
+                    os.path.join(directory, name)
+                    for directory, _, names in os.walk(target)
+                    for name in names if name.lower().endswith(self.SUPPORTED_EXTENSIONS)
+                ]}
+        if os.path.isfile(target):
+            return {os.path.dirname(target): [target]}
+        return {target: None}
+
+    async def identify(self, file_path: str):
+        """Looks the file up like a scan would, without tagging, moving or journaling it; returns the match or None."""
+        job = trackJob.trackJob(os.path.abspath(file_path), os.path.dirname(os.path.abspath(file_path)))
+        loop = asyncio.get_running_loop()
+        try:
+            job = await loop.run_in_executor(self._get_executor(), self._stage_fingerprint, job)
+            await self._stage_lookup(job)
+        finally:
+            await self._close_runtime()
+        return job.match
+
+    async def run_watch(self):
+        """Processes files as they appear, with a periodic full scan as a safety net."""
+        loop = asyncio.get_running_loop()
+        watcher = None
+        watched_paths = None
+        next_full_scan = 0.0
+        carry_over = []  # (root, file) handed out by the watcher but left for a later cycle
+
+        try:
+            while True:
+                self._reload_config()
+                if not self.watch_mode:
+                    self.logger.info("👁️ watchMode disabled, switching back to interval scans")
+                    return
+
+                monitored_paths = tuple(self.config.get('monitored_paths'))
+                if monitored_paths != watched_paths:
+                    if watcher:
+                        watcher.stop()
+                    from tools.watcher import folderWatcher
+                    watcher = folderWatcher.folderWatcher(
+                        list(monitored_paths),
+                        self.SUPPORTED_EXTENSIONS,
+                        debounce=self.watch_debounce,
+                        poll_interval=self.watch_poll_interval,
+                        logger=self.logger,
+                    )
+                    watcher.start()
+                    watched_paths = monitored_paths
+                    next_full_scan = 0.0  # Catch up on anything that arrived while not watching
+                    carry_over = []
+
+                if watcher.take_overflow() or time.monotonic() >= next_full_scan:
+                    self.logger.info("--- Starting reconciliation scan ---")
+                    started = time.monotonic()
+                    await self._full_scan()
+                    delay = self.reconcile_interval
+                    if self.backlog:
+                        # Work off what the scan left over at the backlog pace, not once per reconcileInterval
+                        delay = self.cycle_pacer.next_delay(
+                            time.monotonic() - started, self.last_admitted, self.backlog, self.rate_controller.pause_remaining()
+                        )
+                        self.logger.info(f"📚 {self.backlog} files left, next reconciliation scan in {delay:.2f} seconds.")
+                    next_full_scan = time.monotonic() + delay
+                    self.logger.info("--- Reconciliation finished ---")
+
+                # Files over the budget or deferred while throttled go first next time
+                ready = list(dict.fromkeys(carry_over + watcher.ready()))
+                carry_over = []
+                if ready:
+                    by_root = {}
+                    for root, file_path in ready:
+                        by_root.setdefault(root, []).append(file_path)
+                    await self._scan_paths(by_root)
+                    carry_over = [(root, file_path) for root, files in self.left_over.items() for file_path in files]
+
+                timeout = min(next_full_scan - time.monotonic(), 60)
+                if carry_over:
+                    timeout = min(timeout, max(self.backlog_interval, self.rate_controller.pause_remaining()))
+                    self.logger.info(f"📚 {len(carry_over)} new files left, next pass in {max(1.0, timeout):.2f} seconds.")
+                await loop.run_in_executor(None, watcher.wait, max(1.0, timeout))
+        finally:
+            if watcher:
+                watcher.stop()
+
+    async def _close_runtime(self):
+        """Releases what the event loop owns: the recognizer's connection pool."""
+        if self.recognizer is not None:
+            await self.recognizer.close()
+
+    def close(self):
+        """Flushes pending notifications before the process exits."""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.fingerprint_pool is not None:
+            self.fingerprint_pool.shutdown(wait=False, cancel_futures=True)
+        if self.signal_outbox is not None:
+            self.signal_outbox.close()
+        if self.notify_bot_signal is not None:
+            self.notify_bot_signal.close()
+        if self.fingerprint_index is not None:
+            self.fingerprint_index.close()
+        if self.work_journal is not None:
+            self.work_journal.close()
+        if self.lease_manager is not None:
+            self.lease_manager.close()
+        if self.profile_session is not None:
+            self._finish_profiling()
+
+    async def _run_forever(self, target: str = None, once: bool = False):
+        try:
+            # `kill -USR1 <pid>` profiles the next cycle (or profileFiles/profileCycles) without a restart
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self._start_profiling)
+        except (AttributeError, NotImplementedError, RuntimeError, ValueError):
+            pass  # No SIGUSR1 on this platform or not on the main thread; the config flags still work
+        try:
+            while True:
+                self._reload_config()
+                if self.watch_mode and target is None and not once:
+                    await self.run_watch()
+                    continue
 
+                start_time = time.monotonic()
+                self.logger.info("--- Starting new song identification check cycle ---")
+                await self._full_scan(target)
+
+                self.logger.info("--- Cycle finished ---")
+                if once:
+                    return
+                # Short pauses while a backlog is left, longer ones the longer nothing turns up
+                elapsed_time = time.monotonic() - start_time
+                sleep_duration = self.cycle_pacer.next_delay(
+                    elapsed_time, self.last_admitted, self.backlog, self.rate_controller.pause_remaining()
+                )
+                if self.backlog:
+                    self.logger.info(f"📚 {self.backlog} files left, next cycle in {sleep_duration:.2f} seconds.")
+                else:
+                    self.logger.info(f"Sleeping for {sleep_duration:.2f} seconds.")
+                await asyncio.sleep(sleep_duration)
+        finally:
+            await self._close_runtime()
 
-            self.logger.info("--- Cycle finished ---")
-            # Sleep for the remainder of the interval
-            elapsed_time = time.time() - start_time
-            sleep_duration = max(0, self.check_interval - elapsed_time)
-            self.logger.info(f"Sleeping for {sleep_duration:.2f} seconds.")
-            time.sleep(sleep_duration)
+    def run(self, target: str = None, once: bool = False):
+        """Runs every cycle on one long-lived event loop; `target` limits the scans to one folder or file."""
+        asyncio.run(self._run_forever(target, once))
 
     # --- Static Helper Methods ---
     @staticmethod
-    def _minimal_tags_present(file_path: str) -> bool:
-        audio = File(file_path, easy=True)
-        if audio is None:
-            return False
-        title = audio.get('title')
-        artist = audio.get('artist')
-        return bool(title and artist)
-    
-    @staticmethod
-    def _has_roybatty_comment(file_path: str) -> bool:
-        ext = os.path.splitext(file_path)[1].lower()
-        audio = File(file_path, easy=True)
-        if audio is None:
-            return False
-
-        # Generic easy tag 'comment' (works for FLAC, OGG, generic, sometimes M4A)
-        comments = audio.get('comment', [])
-        if any('roybatty' in str(c).lower() for c in comments):
-            return True
-
-        # MP3 raw ID3 check
-        if ext == '.mp3':
-            try:
-                id3 = ID3(file_path)
-            except ID3NoHeaderError:
-                id3 = ID3()            # Create empty ID3 tag object
-                id3.save(file_path) 
-            
-            for comm in id3.getall("COMM"):
-                if 'roybatty' in comm.text[0].lower():
-                    return True
-
-        # FLAC direct field check
-        if ext == '.flac':
-            audio_flac = FLAC(file_path)
-            comments = audio_flac.get('comment', [])
-            if any('roybatty' in str(c).lower() for c in comments):
-                return True
-
-        # M4A/MP4 comment check
-        if ext == '.m4a':
-            audio_mp4 = MP4(file_path)
-            # Apple uses '\xa9cmt' for comment
-            comments = audio_mp4.tags.get('\xa9cmt', [])
-            if any('roybatty' in str(c).lower() for c in comments):
-                return True
-
-        return False
+    def _track_length(file_path: str, snapshot: metadataSnapshot.metadataSnapshot = None) -> float:
+        if snapshot is not None:
+            return snapshot.length
+        audio = File(file_path)
+        if audio is None or audio.info is None:
+            return 0.0
+        return getattr(audio.info, 'length', 0.0) or 0.0
+
+    def _list_candidates(self, folder_path: str, files: List[str] = None, limit: int = None) -> List[tuple]:
+        """Returns (file, stat) for the given files, or for the files below the folder that still need work.
+
+        The folder is streamed with a `treeWalker` that skips unchanged, fully
+        handled directories and stops after `limit` candidates; its file
+        counts are left in `_walk_totals` for the cycle summary.
+        """
+        if files is not None:
+            candidates = []
+            for file_path in files:
+                try:
+                    candidates.append((file_path, os.stat(file_path)))
+                except OSError:
+                    continue  # Gone since it was listed
+            return candidates
+        if not os.path.isdir(folder_path):
+            return []
 
-    @staticmethod
-    def _add_cover_mp3(file_path: str, image_data: str, mime_type: str):
-        audio = MP3(file_path, ID3=ID3)
-        try:
-            audio.add_tags()
-        except error:
-            pass
-
-        audio.tags.add(
-            APIC(
-                encoding=3,        # utf-8
-                mime=mime_type,    # e.g., 'image/jpeg'
-                type=3,            # front cover
-                desc='Cover',
-                data=image_data
-            )
+        walker = treeWalker.treeWalker(
+            self.SUPPORTED_EXTENSIONS, self.scan_index, is_done=self._index_unchanged,
+            settle_key='rename' if self.rename_and_move_only else 'identify',
+        )
+        candidates = list(walker.walk(folder_path, limit))
+        total = walker.total if walker.complete else walker.count(folder_path)
+        self._walk_totals[folder_path] = (total, walker.done)
+        self.logger.debug(
+            f"🚶 {folder_path}: listed {walker.listed} folders, skipped {walker.pruned} unchanged, "
+            f"{len(candidates)} of {total} files to check"
         )
-        audio.save()
-        return audio
+        return candidates
 
     @staticmethod
-    def _add_cover_flac(file_path: str, image_data: str, mime_type: str):
-        audio = FLAC(file_path)
-        image = Picture()
-        image.data = image_data
-        image.type = 3  # cover(front)
-        image.mime = mime_type
-        image.desc = "Cover"
-        audio.clear_pictures()  # remove existing pictures if needed
-        audio.add_picture(image)
-        audio.save()
-        return audio
+    def _read_snapshot(file_path: str) -> metadataSnapshot.metadataSnapshot:
+        """Tags and stream info of the file from a single parse."""
+        return metadataSnapshot.metadataSnapshot.load(file_path)
 
     @staticmethod
-    def _add_cover_m4a(file_path: str, image_data: str):
-        audio = MP4(file_path)
-        cover = MP4Cover(image_data, imageformat=MP4Cover.FORMAT_JPEG)
-        audio["covr"] = [cover]
-        return audio
+    def _minimal_tags_present(file_path: str, snapshot: metadataSnapshot.metadataSnapshot = None) -> bool:
+        snapshot = snapshot or metadataSnapshot.metadataSnapshot.load(file_path)
+        return snapshot.has_minimal_tags
+    
+    @staticmethod
+    def _has_roybatty_comment(file_path: str, snapshot: metadataSnapshot.metadataSnapshot = None) -> bool:
+        snapshot = snapshot or metadataSnapshot.metadataSnapshot.load(file_path)
+        return snapshot.has_comment('roybatty')
 
     @staticmethod
-    def _extract_audio_quality(file_path: str) -> Dict[str, any]:
+    def _extract_audio_quality(file_path: str, snapshot: metadataSnapshot.metadataSnapshot = None) -> Dict[str, any]:
         """Extract audio quality information from the file."""
-        audio = File(file_path)
-        if audio is None:
-            return {"quality_category": "Unknown", "bitrate": 0, "sample_rate": 0}
-        
-        quality_info = {
-            "bitrate": getattr(audio.info, 'bitrate', 0),
-            "sample_rate": getattr(audio.info, 'sample_rate', 0),
-            "channels": getattr(audio.info, 'channels', 0),
-            "length": getattr(audio.info, 'length', 0)
-        }
-        
-        # Add format-specific information
-        ext = os.path.splitext(file_path)[1].lower()
-        if ext == '.flac':
-            # FLAC is lossless
-            flac_audio = FLAC(file_path)
-            if flac_audio and flac_audio.info:
-                quality_info["bits_per_sample"] = getattr(flac_audio.info, 'bits_per_sample', 16)
-                quality_info["quality_category"] = "Lossless"
-        elif ext in ['.mp3', '.m4a', '.ogg']:
-            # Lossy formats - categorize by bitrate
-            bitrate_kbps = (quality_info["bitrate"] or 0) // 1000  # Convert bps to kbps
-            if bitrate_kbps >= 320:
-                quality_info["quality_category"] = "High (320+ kbps)"
-            elif bitrate_kbps >= 256:
-                quality_info["quality_category"] = "High (256+ kbps)"
-            elif bitrate_kbps >= 192:
-                quality_info["quality_category"] = "Medium (192+ kbps)"
-            elif bitrate_kbps >= 128:
-                quality_info["quality_category"] = "Medium (128+ kbps)"
-            elif bitrate_kbps > 0:
-                quality_info["quality_category"] = "Low (<128 kbps)"
-            else:
-                quality_info["quality_category"] = "Unknown"
-        elif ext == '.wav':
-            # WAV is typically lossless
-            quality_info["quality_category"] = "Lossless"
-        else:
-            quality_info["quality_category"] = "Unknown"
-            
-        return quality_info
+        snapshot = snapshot or metadataSnapshot.metadataSnapshot.load(file_path)
+        return snapshot.quality()
 
     @staticmethod
-    def _rename_and_move(file_path: str, folder_path: str, artist: str, title: str) -> str:
+    def _rename_and_move(file_path: str, folder_path: str, artist: str, title: str,
+                         snapshot: metadataSnapshot.metadataSnapshot = None) -> str:
         safe_artist = artist.replace("/", "_") if artist else "Unknown"
         safe_title = title.replace("/", "_") if title else "Unknown"
         
-        quality_info = songIdentificator._extract_audio_quality(file_path)
+        quality_info = songIdentificator._extract_audio_quality(file_path, snapshot)
         quality_folder = quality_info["quality_category"].replace("/", "_").replace("<", "").replace(">", "")
         
         extension = os.path.splitext(file_path)[1]
@@ -569,78 +1371,16 @@ class songIdentificator:
 
     @staticmethod
     def _strip_tags(file_path: str) -> Dict[str, str]:
-        audio = File(file_path)
-        if audio is None:
-            print(f"Unsupported or invalid audio file: {file_path}")
-            return {}
-
-        tags = {}
-        
-        # Save minimal tags first
-        easy_audio = File(file_path, easy=True)
-        tags['title'] = easy_audio.get('title', [None])[0] if easy_audio else None
-        tags['artist'] = easy_audio.get('artist', [None])[0] if easy_audio else None
-        tags['album'] = easy_audio.get('album', [None])[0] if easy_audio else None
-        tags['date'] = easy_audio.get('date', [None])[0] if easy_audio else None
-
-        ext = file_path.lower().split('.')[-1]
-        if ext == 'mp3':
-            id3 = ID3(file_path)
-            # Always strip comments
-            id3.delall("COMM")
-            frames_to_keep = {'TIT2', 'TPE1', 'TALB', 'TDRC', 'TYER', 'APIC'}
-            for key in list(id3.keys()):
-                if key not in frames_to_keep:
-                    id3.delall(key)
-            id3.save(file_path)
-            
-        elif ext == 'flac':
-            pictures = audio.pictures
-            audio.delete()
-            audio.save()
-            audio = FLAC(file_path)
-            if tags['title']:
-                audio['TITLE'] = tags['title']
-            if tags['artist']:
-                audio['ARTIST'] = tags['artist']
-            if tags['album']:
-                audio['ALBUM'] = tags['album']
-            if tags['date']:
-                audio['DATE'] = tags['date']
-            audio.clear_pictures()
-            for pic in pictures:
-                audio.add_picture(pic)
-            audio.save()
-        
-        else:
-            audio.delete()
-            audio.save()
-            if tags['title']:
-                audio['title'] = tags['title']
-            if tags['artist']:
-                audio['artist'] = tags['artist']
-            if tags['album']:
-                audio['album'] = tags['album']
-            if tags['date']:
-                audio['date'] = tags['date']
-            audio.save()
-
-        return tags
+        """Drops all but the minimal tags in one rewrite and returns title/artist/album/date."""
+        return tagTransaction.tagTransaction(file_path).strip().commit()
  
     @staticmethod
-    def _read_tags(file_path: str) -> Dict[str, str]:
-        audio = File(file_path)
-        if audio is None:
+    def _read_tags(file_path: str, snapshot: metadataSnapshot.metadataSnapshot = None) -> Dict[str, str]:
+        snapshot = snapshot or metadataSnapshot.metadataSnapshot.load(file_path)
+        if not snapshot.supported:
             print(f"Unsupported or invalid audio file: {file_path}")
             return {}
-
-        tags = {}
-        
-        easy_audio = File(file_path, easy=True)
-        tags['title'] = easy_audio.get('title', [None])[0] if easy_audio else None
-        tags['artist'] = easy_audio.get('artist', [None])[0] if easy_audio else None
-
-        return tags
+        return {'title': snapshot.title, 'artist': snapshot.artist}
 
     @staticmethod
     def _remove_empty_folders(root_folder):
@@ -650,12 +1390,39 @@ class songIdentificator:
                 if not os.listdir(full_path):
                     os.rmdir(full_path)
 
+    @staticmethod
+    def _prune_empty_dirs(root_folder: str, dirs: set) -> int:
+        """Removes the given directories and their parents up to `root_folder` while they are empty.
+
+        Deepest directories go first so a parent is only tried once its children are gone.
+        Returns the number of removed directories.
+        """
+        root = os.path.abspath(root_folder)
+        removed = 0
+        for directory in sorted({os.path.abspath(d) for d in dirs}, key=lambda d: d.count(os.sep), reverse=True):
+            while directory != root and directory.startswith(root + os.sep):
+                try:
+                    os.rmdir(directory)
+                    removed += 1
+                except FileNotFoundError:
+                    pass  # Already gone, e.g. pruned through a deeper sibling
+                except OSError:
+                    break  # Not empty (or not ours to remove), so no parent is either
+                directory = os.path.dirname(directory)
+        return removed
+
 if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        # Subcommands (scan, identify, status, dry-run); without any, run as the service
+        from tools.cli import commandLine
+        sys.exit(commandLine.main())
+
     songIdentificator9000 = songIdentificator()
     try:
         songIdentificator9000.run()
     except KeyboardInterrupt:
         print("\nExiting application.")
+        songIdentificator9000.close()
         sys.exit(0)
     except Exception:
         songIdentificator9000.logger.exception("A fatal, unhandled error occurred in the main loop.")
@@ -1,6 +1,6 @@
 import pydantic
 import json
-from typing import Annotated, Optional, List
+from typing import Annotated, Optional, List, Dict
 from pathlib import Path
 import json
 import re
@@ -9,6 +9,11 @@ os.environ['PYDANTIC_ERRORS_INCLUDE_URL'] = '0'
 
 SCRIPT_DIR = Path(__file__).parent.parent.parent
 
+class pathOverride(pydantic.BaseModel):
+    """Per monitored path scheduling settings."""
+    weight: Annotated[float, pydantic.Field(gt=0)] = 1.0
+    maxQueueSize: Optional[Annotated[int, pydantic.Field(gt=0)]] = None
+
 class appConfig(pydantic.BaseModel):
     @classmethod
     def load_and_validate(cls, config_path: Path) -> 'appConfig':
@@ -28,9 +33,48 @@ class appConfig(pydantic.BaseModel):
     logLevel: Annotated[str, pydantic.Field(pattern=r'^(DEBUG|INFO|WARNING|ERROR|CRITICAL)$')] = "INFO"
     monitored_paths: list[str]
     maxQueueSize: Annotated[int, pydantic.Field(gt=0)] = 50
+    schedulePriority: Annotated[str, pydantic.Field(pattern=r'^(newest|smallest|walk)$')] = "newest"
+    pathOverrides: Dict[str, pathOverride] = {}
     checkInterval: Annotated[int, pydantic.Field(gt=0)] = 300
+    backlogInterval: Annotated[int, pydantic.Field(ge=0)] = 5
+    maxIdleInterval: Annotated[int, pydantic.Field(gt=0)] = 1800
     renameAndMoveOnly: bool = False
     removeEmptyFolders: bool = True 
+    useScanIndex: bool = True
+    useWorkJournal: bool = True
+    workerLeases: bool = False
+    workerLeaseSeconds: Annotated[int, pydantic.Field(ge=30)] = 300
+    workerId: str = ""
+    useRecognitionCache: bool = True
+    recognitionCacheTtlDays: Annotated[int, pydantic.Field(gt=0)] = 90
+    recognitionCacheMaxEntries: Annotated[int, pydantic.Field(gt=0)] = 50000
+    useFingerprintIndex: bool = True
+    fingerprintIndexMinMatches: Annotated[int, pydantic.Field(gt=0)] = 20
+    watchMode: bool = False
+    watchDebounce: Annotated[int, pydantic.Field(gt=0)] = 5
+    watchPollInterval: Annotated[int, pydantic.Field(gt=0)] = 10
+    reconcileInterval: Annotated[int, pydantic.Field(gt=0)] = 3600
+    fingerprintWorkers: Annotated[int, pydantic.Field(ge=0)] = 0
+    fingerprintProcessPool: bool = True
+    samplingMode: Annotated[str, pydantic.Field(pattern=r'^(full|windowed)$')] = "windowed"
+    samplingWindows: Annotated[int, pydantic.Field(ge=1, le=7)] = 3
+    samplingWindowSeconds: Annotated[int, pydantic.Field(ge=4, le=60)] = 12
+    lookupConcurrency: Annotated[int, pydantic.Field(gt=0)] = 2
+    lookupMaxRate: Annotated[float, pydantic.Field(ge=0)] = 0.5
+    throttleRetries: Annotated[int, pydantic.Field(ge=0)] = 5
+    recognizerBackend: Annotated[str, pydantic.Field(pattern=r'^(shazam|record|replay)$')] = "shazam"
+    replayLatency: bool = False
+    tagWorkers: Annotated[int, pydantic.Field(gt=0)] = 2
+    moveWorkers: Annotated[int, pydantic.Field(gt=0)] = 1
+    notifyWorkers: Annotated[int, pydantic.Field(gt=0)] = 1
+    pipelineQueueSize: Annotated[int, pydantic.Field(gt=0)] = 8
+    coverCacheMemoryEntries: Annotated[int, pydantic.Field(ge=0)] = 64
+    coverCacheMaxMB: Annotated[int, pydantic.Field(gt=0)] = 200
+    metricsEnabled: bool = False
+    metricsHost: str = "127.0.0.1"
+    metricsPort: Annotated[int, pydantic.Field(gt=0, lt=65536)] = 9464
+    profileFiles: Annotated[int, pydantic.Field(ge=0)] = 0
+    profileCycles: Annotated[int, pydantic.Field(ge=0)] = 0
     notifySignal: bool = False
     notifyErrors: bool = True
     notifyEachSong: bool = False
@@ -38,6 +82,9 @@ class appConfig(pydantic.BaseModel):
     signalSender: str
     signalGroup: str
     signalEndpoint: pydantic.HttpUrl
+    signalTimeout: Annotated[int, pydantic.Field(gt=0)] = 10
+    signalCoalesceWindow: Annotated[int, pydantic.Field(ge=0)] = 10
+    signalRetryInterval: Annotated[int, pydantic.Field(gt=0)] = 300
 
     @pydantic.field_validator('logLevel', mode='before')
     @classmethod
@@ -68,6 +115,15 @@ class appConfig(pydantic.BaseModel):
             raise ValueError('📈 maxQueueSize must be greater than 0')
         return v
 
+    @pydantic.field_validator('pathOverrides')
+    @classmethod
+    def validate_path_overrides(cls, v: dict, info: pydantic.ValidationInfo) -> dict:
+        monitored_paths = info.data.get('monitored_paths') or []
+        for path in v:
+            if path not in monitored_paths:
+                raise ValueError(f'📁 pathOverrides entry {path} is not one of the monitored_paths')
+        return v
+
     @pydantic.field_validator('checkInterval')
     @classmethod
     def validate_check_interval(cls, v: int) -> int:
@@ -0,0 +1,138 @@
+import datetime
+import functools
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from tools.scan_index import treeWalker
+from tools.tagging import metadataSnapshot
+
+def classify_file(file_path: str, rename_only: bool = False) -> Dict:
+    """Sorts one file by its tags alone; runs in the backfill worker processes."""
+    record = {"path": file_path}
+    try:
+        snapshot = metadataSnapshot.metadataSnapshot.load(file_path)
+    except Exception as e:
+        record["category"] = "error"
+        record["error"] = str(e)
+        return record
+    if rename_only:
+        category = "rename"
+    elif snapshot.has_comment('roybatty'):
+        category = "done"
+    elif snapshot.has_minimal_tags:
+        category = "rename"
+    else:
+        category = "lookup"
+    record["category"] = category
+    record["artist"] = snapshot.artist
+    record["title"] = snapshot.title
+    record["quality"] = snapshot.quality_category
+    return record
+
+class libraryBackfill:
+    """Sorts a whole library into done, tag-only rename and needs-lookup files before the first scans.
+
+    Meant for pointing songID at a large existing collection: instead of
+    finding out `maxQueueSize` files per cycle that a file was already
+    processed or carries its own artist and title, every file's tags are
+    read once on a process pool, one parse per file. Each file gets a line
+    in the manifest (`data/backfill_manifest.jsonl`) with its category,
+    tags and quality folder, and with a scan index the outcome is recorded
+    against the file's stat signature. Runs append to the manifest, each
+    line carrying its run's start time, so backfilling one subfolder does
+    not wipe the lines of an earlier full run:
+
+    - `done`: has the roybatty comment, recorded as `tagged` so scans skip it unopened
+    - `rename`: has artist and title, recorded as `tag_only`; the next scan renames,
+      tags and moves it from those tags without a lookup or a place in the queue
+    - `lookup`: needs Shazam, left for the normal cycles
+    - `error`: could not be read, left for the normal cycles to quarantine
+
+    Files the index already knows as handled are counted as done without being
+    opened. A file changed after the backfill no longer matches its recorded
+    signature and is looked at afresh.
+    """
+
+    CATEGORIES = ('done', 'rename', 'lookup', 'error')
+    BATCH_SIZE = 2048   # Files handed to the pool at once, so the walk and the manifest stream
+    CHUNK_SIZE = 64     # Files per task sent to a worker process
+
+    def __init__(self, manifest_path: Path, extensions: Iterable[str], index=None, workers: int = None,
+                 rename_only: bool = False, logger: logging.Logger = None):
+        self.manifest_path = Path(manifest_path)
+        self.extensions = tuple(extensions)
+        self.index = index
+        self.workers = workers or os.cpu_count() or 1
+        self.rename_only = rename_only
+        self.logger = logger or logging.getLogger("log")
+        self.counts = dict.fromkeys(self.CATEGORIES, 0)
+        self.run_started = None
+
+    def run(self, roots: List[str], progress_every: int = 10000) -> Dict[str, int]:
+        """Classifies every supported file below `roots`; returns the number of files per category."""
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        classify = functools.partial(classify_file, rename_only=self.rename_only)
+        started = time.monotonic()
+        self.run_started = datetime.datetime.now().isoformat(timespec="milliseconds")
+        reported = 0
+        # spawn, not fork: as for the fingerprint pool, the caller may hold threads and sqlite handles
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool, \
+                open(self.manifest_path, 'a', encoding='utf-8') as manifest:
+            for batch in self._batches(roots, manifest):
+                stats = dict(batch)
+                indexed = []
+                for record in pool.map(classify, list(stats), chunksize=self.CHUNK_SIZE):
+                    status = self._record(record, stats[record["path"]], manifest)
+                    if status is not None:
+                        indexed.append((record["path"], status, stats[record["path"]]))
+                if self.index is not None and indexed:
+                    # The walk's stat, so a file changed since then does not match and gets looked at again
+                    self.index.record_many(indexed)
+                classified = sum(self.counts.values())
+                if classified - reported >= progress_every:
+                    reported = classified
+                    rate = classified / max(time.monotonic() - started, 1e-9)
+                    self.logger.info(f"🧺 Backfill: {classified} files sorted ({rate:.0f}/s)")
+        return self.counts
+
+    # --- Internals ---
+    def _batches(self, roots: List[str], manifest):
+        batch = []
+        for root in roots:
+            # No index for the walker: every folder is listed, whatever earlier scans settled
+            walker = treeWalker.treeWalker(self.extensions)
+            for file_path, stat_result in walker.walk(root):
+                if self._already_done(file_path, stat_result):
+                    self.counts["done"] += 1
+                    manifest.write(json.dumps({"path": file_path, "category": "done", "indexed": True, "run": self.run_started}) + "\n")
+                    continue
+                batch.append((file_path, stat_result))
+                if len(batch) >= self.BATCH_SIZE:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def _already_done(self, file_path: str, stat_result: os.stat_result) -> bool:
+        if self.index is None:
+            return False
+        status = self.index.lookup(file_path, stat_result)
+        return status in (('tagged', 'renamed') if self.rename_only else ('tagged', 'manual'))
+
+    def _record(self, record: Dict, stat_result: os.stat_result, manifest) -> Optional[str]:
+        """Writes the manifest line; returns the scan index status for the file, if any."""
+        category = record["category"]
+        self.counts[category] += 1
+        record["size"] = stat_result.st_size
+        record["mtime_ns"] = stat_result.st_mtime_ns
+        record["run"] = self.run_started
+        manifest.write(json.dumps(record) + "\n")
+        if self.rename_only:
+            return None  # Every file is renamed without a lookup anyway
+        return {"done": "tagged", "rename": "tag_only"}.get(category)
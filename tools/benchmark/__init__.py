@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['syntheticLibrary', 'stubShazam', 'stageProbe', 'runBenchmark']
\ No newline at end of file
@@ -0,0 +1,195 @@
+"""Benchmarks songID on a synthetic library with a stubbed Shazam.
+
+    python -m tools.benchmark.runBenchmark --files 500 --latency 0.3 --miss-rate 0.2 --output bench.json
+
+Builds the library in a temporary folder, runs `recognize_tracks_in_folder`
+once and writes throughput, per-stage latency, syscalls, bytes written and
+peak RSS as JSON, so runs of different versions can be diffed.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.insert(0, str(REPO_DIR))
+
+from tools.benchmark import stageProbe, stubShazam, syntheticLibrary
+
+# songIdentificator method -> stage name, matching the metrics endpoint where they overlap
+PROBED_STAGES = {
+    '_list_candidates': 'walk',
+    '_read_snapshot': 'tag_read',
+    '_stage_fingerprint': 'fingerprint',
+    '_stage_lookup': 'lookup',
+    '_stage_tag': 'tag_write',
+    '_stage_move': 'move',
+    '_stage_notify': 'notify',
+}
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark songID against a synthetic library and a stub recognizer.")
+    parser.add_argument('--files', type=int, default=200, help="number of audio files to generate")
+    parser.add_argument('--mix', default=syntheticLibrary.DEFAULT_MIX, help="format shares, e.g. mp3=40,flac=20,wav=40")
+    parser.add_argument('--tagged-ratio', type=float, default=0.5, help="share of files with title/artist tags")
+    parser.add_argument('--done-ratio', type=float, default=0.1, help="share of files already marked as processed")
+    parser.add_argument('--depth', type=int, default=3, help="maximum folder nesting")
+    parser.add_argument('--duration', type=float, default=30.0, help="length of each generated track in seconds")
+    parser.add_argument('--variants', type=int, default=8, help="distinct tones per format")
+    parser.add_argument('--latency', type=float, default=0.2, help="stub lookup latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.05, help="random +/- added to the latency")
+    parser.add_argument('--miss-rate', type=float, default=0.2, help="share of lookups that find nothing")
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="stub lookups per second before it answers 429, 0 for no limit")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help="config override, VALUE is JSON (e.g. --set samplingMode='\"full\"' --set lookupConcurrency=4)")
+    parser.add_argument('--templates', type=Path, default=Path(tempfile.gettempdir()) / 'songid-bench-templates',
+                        help="where encoded tone templates are cached between runs")
+    parser.add_argument('--label', default=None, help="free text stored with the results, e.g. a version")
+    parser.add_argument('--output', type=Path, default=None, help="JSON file to write, stdout when omitted")
+    parser.add_argument('--keep', action='store_true', help="keep the generated library and logs")
+    return parser.parse_args(argv)
+
+def build_config(library: Path, overrides) -> dict:
+    config = {
+        "monitored_paths": [str(library)],
+        "maxQueueSize": 1000000,
+        "notifySummary": 0,
+        "logLevel": "WARNING",
+        "notifySignal": False,
+        "signalSender": "+10000000000",
+        "signalGroup": "group.benchmark",
+        "signalEndpoint": "http://127.0.0.1:9",
+        # Synthetic files share audio, the cache would turn most lookups into hits
+        "useRecognitionCache": False,
+        "useFingerprintIndex": False,  # Same reason: lookups would become local index hits
+        "lookupMaxRate": 0,  # Measure the pipeline, not the default cap; --rate-limit makes the stub push back instead
+    }
+    for item in overrides:
+        key, _, value = item.partition('=')
+        try:
+            config[key] = json.loads(value)
+        except json.JSONDecodeError:
+            config[key] = value
+    return config
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def worker_report(identificator) -> dict:
+    """I/O and peak RSS of the fingerprint process pool, read before it shuts down."""
+    pool = identificator.fingerprint_pool
+    processes = getattr(pool, '_processes', None) or {}
+    report = {"processes": len(processes), "syscalls": 0, "bytes_read": 0, "bytes_written": 0, "peak_rss_bytes": 0}
+    for pid in list(processes):
+        io = stageProbe.read_io(f'/proc/{pid}/io')
+        report["syscalls"] += io.get('syscr', 0) + io.get('syscw', 0)
+        report["bytes_read"] += io.get('rchar', 0)
+        report["bytes_written"] += io.get('wchar', 0)
+        report["peak_rss_bytes"] = max(report["peak_rss_bytes"], stageProbe.read_peak_rss(pid))
+    return report
+
+def run(args: argparse.Namespace) -> dict:
+    work_dir = Path(tempfile.mkdtemp(prefix='songid-bench-'))
+    try:
+        library = work_dir / 'music'
+        started = time.perf_counter()
+        summary = syntheticLibrary.build_library(
+            library, args.files, syntheticLibrary.parse_mix(args.mix), args.tagged_ratio, args.done_ratio,
+            args.depth, args.duration, args.variants, args.seed, template_dir=args.templates,
+        )
+        generate_seconds = time.perf_counter() - started
+
+        config = build_config(library, args.set)
+        (work_dir / 'config').mkdir()
+        (work_dir / 'config' / 'config.json').write_text(json.dumps(config, indent=4))
+
+        import songId
+        songId.songIdentificator.SCRIPT_DIR = work_dir
+        songId.songIdentificator.DATA_DIR = work_dir / 'data'
+        from tools.recognizer import shazamRecognizer
+        shazamRecognizer.Shazam = stubShazam.stubShazam
+        stubShazam.stubShazam.configure(args.latency, args.jitter, args.miss_rate, args.seed, args.rate_limit)
+
+        identificator = songId.songIdentificator()
+        probe = stageProbe.stageProbe()
+        for name, stage in PROBED_STAGES.items():
+            setattr(identificator, name, probe.wrap(stage, getattr(identificator, name)))
+
+        io_before = stageProbe.read_io('/proc/self/io')
+
+        async def scan():
+            try:
+                await identificator.recognize_tracks_in_folder(str(library))
+            finally:
+                await identificator._close_runtime()
+
+        started = time.perf_counter()
+        asyncio.run(scan())
+        wall_seconds = time.perf_counter() - started
+
+        io_after = stageProbe.read_io('/proc/self/io')
+        workers = worker_report(identificator)
+        identificator.close()
+
+        latencies = identificator.metrics.snapshot()
+        stages = probe.report()
+        for stage, values in stages.items():
+            timing = latencies.get(stage)
+            if timing:
+                values["seconds_total"] = timing["seconds"]
+                values["seconds_mean"] = timing["seconds"] / timing["count"] if timing["count"] else 0.0
+                values["errors"] = timing["errors"]
+
+        identified = latencies.get('tag_write', {}).get('count', 0)
+        return {
+            "label": args.label,
+            "revision": git_revision(),
+            "created": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "library": {**summary, "generate_seconds": generate_seconds},
+            "stub": {"latency": args.latency, "jitter": args.jitter, "miss_rate": args.miss_rate,
+                     "rate_limit": args.rate_limit, "lookups": stubShazam.stubShazam.calls,
+                     "misses": stubShazam.stubShazam.misses, "throttled": stubShazam.stubShazam.throttled},
+            "config": {key: value for key, value in config.items() if key != "monitored_paths"},
+            "wall_seconds": wall_seconds,
+            "files_per_sec": args.files / wall_seconds if wall_seconds else None,
+            "identified_per_sec": identified / wall_seconds if wall_seconds else None,
+            "process": {
+                "syscalls": sum(io_after.get(k, 0) - io_before.get(k, 0) for k in ('syscr', 'syscw')),
+                "bytes_written": io_after.get('wchar', 0) - io_before.get('wchar', 0),
+                "peak_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+            },
+            "fingerprint_workers": workers,
+            "stages": stages,
+        }
+    finally:
+        if args.keep:
+            print(f"Kept benchmark files in {work_dir}", file=sys.stderr)
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = run(args)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import asyncio
+import functools
+import os
+import threading
+from typing import Callable, Dict
+
+IO_FIELDS = ('rchar', 'wchar', 'syscr', 'syscw', 'read_bytes', 'write_bytes')
+PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+
+def read_io(path: str = '/proc/thread-self/io') -> Dict[str, int]:
+    """Linux per-task I/O counters; empty when /proc is not available."""
+    try:
+        with open(path) as f:
+            values = dict(line.split(':', 1) for line in f)
+    except OSError:
+        return {}
+    return {key: int(values[key]) for key in IO_FIELDS if key in values}
+
+def read_rss() -> int:
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return 0
+
+def read_peak_rss(pid: int) -> int:
+    """VmHWM of a running process in bytes, 0 when unknown."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+class stageProbe:
+    """Attributes syscalls, bytes read/written and RSS to the stage handler that caused them.
+
+    Counters come from /proc/thread-self/io, so they are exact for blocking
+    handlers (one handler per worker thread at a time). Async handlers share
+    the event loop thread with everything else running on it, so their
+    numbers are an approximation.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.stages: Dict[str, Dict[str, int]] = {}
+
+    def wrap(self, stage: str, func: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                before = read_io()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    self._record(stage, before, read_io())
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            before = read_io()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._record(stage, before, read_io())
+
+        return wrapper
+
+    def _record(self, stage: str, before: Dict[str, int], after: Dict[str, int]):
+        rss = read_rss()
+        with self._lock:
+            totals = self.stages.setdefault(stage, {"calls": 0, "peak_rss_bytes": 0, **{key: 0 for key in IO_FIELDS}})
+            totals["calls"] += 1
+            totals["peak_rss_bytes"] = max(totals["peak_rss_bytes"], rss)
+            for key in IO_FIELDS:
+                if key in before and key in after:
+                    totals[key] += after[key] - before[key]
+
+    def report(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {
+                stage: {
+                    "calls": totals["calls"],
+                    "syscalls": totals["syscr"] + totals["syscw"],
+                    "read_syscalls": totals["syscr"],
+                    "write_syscalls": totals["syscw"],
+                    "bytes_read": totals["rchar"],
+                    "bytes_written": totals["wchar"],
+                    "disk_bytes_written": totals["write_bytes"],
+                    "peak_rss_bytes": totals["peak_rss_bytes"],
+                }
+                for stage, totals in self.stages.items()
+            }
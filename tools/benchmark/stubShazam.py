@@ -0,0 +1,71 @@
+import asyncio
+import collections
+import random
+import time
+
+from tools.recognizer.recognizerBackend import throttledError
+
+class stubShazam:
+    """Stands in for `shazamio.Shazam` with a configurable latency, miss rate and rate limit.
+
+    Only the calls songID makes are implemented. Settings are class level so
+    every instance songID creates shares them; call `configure()` first.
+    """
+
+    latency = 0.2
+    jitter = 0.0
+    miss_rate = 0.0
+    calls = 0
+    misses = 0
+    rate_limit = 0.0   # Requests per second tolerated before answering 429, 0 for no limit
+    throttled = 0
+    _rng = random.Random(0)
+    _recent = collections.deque()
+
+    def __init__(self, *args, **kwargs):
+        self.http_client = kwargs.get('http_client')
+
+    @classmethod
+    def configure(cls, latency: float = 0.2, jitter: float = 0.0, miss_rate: float = 0.0, seed: int = 0,
+                  rate_limit: float = 0.0):
+        cls.latency = latency
+        cls.jitter = jitter
+        cls.miss_rate = miss_rate
+        cls.rate_limit = rate_limit
+        cls.calls = 0
+        cls.misses = 0
+        cls.throttled = 0
+        cls._rng = random.Random(seed)
+        cls._recent = collections.deque()
+
+    async def send_recognize_request(self, signature, proxy=None) -> dict:
+        cls = type(self)
+        if cls.rate_limit:
+            # Sliding one second window, like a simple API gateway
+            now = time.monotonic()
+            while cls._recent and cls._recent[0] <= now - 1.0:
+                cls._recent.popleft()
+            if len(cls._recent) >= cls.rate_limit:
+                cls.throttled += 1
+                await asyncio.sleep(0.01)
+                raise throttledError(429)
+            cls._recent.append(now)
+        cls.calls += 1
+        delay = max(0.0, cls.latency + cls._rng.uniform(-cls.jitter, cls.jitter))
+        await asyncio.sleep(delay)
+        if cls._rng.random() < cls.miss_rate:
+            cls.misses += 1
+            return {"matches": []}
+        number = cls.calls
+        return {
+            "matches": [{"id": str(number)}],
+            "track": {
+                "title": f"Stub Title {number}",
+                "subtitle": f"Stub Artist {number % 50}",
+                "images": {},
+                "sections": [{"type": "SONG", "metadata": [{"text": "Stub Album"}, {"text": "Stub Label"}, {"text": "2024"}]}],
+            },
+        }
+
+    async def recognize_song(self, data, proxy=None) -> dict:
+        return await self.send_recognize_request(data, proxy=proxy)
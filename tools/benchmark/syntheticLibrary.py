@@ -0,0 +1,98 @@
+import os
+import random
+import shutil
+import subprocess
+from pathlib import Path
+from typing import Dict
+
+from tools.tagging import tagTransaction
+
+# ffmpeg output options per format
+ENCODERS = {
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '192k'],
+    'flac': ['-c:a', 'flac'],
+    'm4a': ['-c:a', 'aac', '-b:a', '160k'],
+    'wav': ['-c:a', 'pcm_s16le'],
+    'ogg': ['-c:a', 'libvorbis', '-q:a', '4'],
+}
+DEFAULT_MIX = "mp3=40,flac=20,m4a=15,wav=10,ogg=15"
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """Parses "mp3=40,flac=20" into normalized shares per format."""
+    mix = {}
+    for part in text.split(','):
+        ext, _, share = part.partition('=')
+        ext = ext.strip().lower().lstrip('.')
+        if ext not in ENCODERS:
+            raise ValueError(f"Unsupported format in mix: {ext}")
+        mix[ext] = float(share or 1)
+    total = sum(mix.values())
+    if total <= 0:
+        raise ValueError("Mix shares must add up to more than 0")
+    return {ext: share / total for ext, share in mix.items()}
+
+def render_template(path: Path, ext: str, frequency: int, duration: float):
+    """Encodes a tone (with a little noise so it is not trivially compressible) with ffmpeg."""
+    ffmpeg = shutil.which('ffmpeg')
+    if ffmpeg is None:
+        raise RuntimeError("ffmpeg is required to build synthetic libraries")
+    source = f"sine=frequency={frequency}:duration={duration}:sample_rate=44100"
+    noise = f"anoisesrc=color=pink:amplitude=0.05:duration={duration}:sample_rate=44100"
+    subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-y',
+         '-f', 'lavfi', '-i', source, '-f', 'lavfi', '-i', noise,
+         '-filter_complex', 'amix=inputs=2,aformat=channel_layouts=stereo',
+         '-map_metadata', '-1', *ENCODERS[ext], str(path)],
+        check=True,
+    )
+
+def build_library(root: Path, files: int, mix: Dict[str, float], tagged_ratio: float = 0.5, done_ratio: float = 0.1,
+                  depth: int = 3, duration: float = 30.0, variants: int = 8, seed: int = 0,
+                  template_dir: Path = None) -> Dict:
+    """Creates `files` audio files below `root` and returns a summary of what was made.
+
+    Each file is a copy of one of `variants` encoded tones per format. A
+    `done_ratio` share already carries songID's comment (skipped without a
+    lookup), a `tagged_ratio` share has title/artist (usable by the fallback)
+    and the rest is untagged. Files land in folders up to `depth` levels deep.
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    template_dir = Path(template_dir or root.parent / 'templates')
+    template_dir.mkdir(parents=True, exist_ok=True)
+
+    templates = {}
+    for ext in mix:
+        for variant in range(variants):
+            path = template_dir / f"tone{variant}_{int(duration)}s.{ext}"
+            if not path.exists():
+                render_template(path, ext, 220 + 55 * variant, duration)
+            templates.setdefault(ext, []).append(path)
+
+    formats = list(mix)
+    weights = [mix[ext] for ext in formats]
+    summary = {"files": files, "formats": {}, "done": 0, "tagged": 0, "untagged": 0, "bytes": 0}
+    for index in range(files):
+        ext = rng.choices(formats, weights)[0]
+        folder = root
+        for level in range(rng.randint(0, depth)):
+            folder = folder / f"{('artist', 'album', 'disc', 'extra')[min(level, 3)]}{rng.randint(0, 9)}"
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"track{index:06d}.{ext}"
+        shutil.copyfile(rng.choice(templates[ext]), path)
+
+        roll = rng.random()
+        transaction = tagTransaction.tagTransaction(str(path))
+        if roll < done_ratio:
+            transaction.set(artist=f"Artist {index % 97}", title=f"Song {index}").comment('roybatty').commit()
+            summary["done"] += 1
+        elif roll < done_ratio + tagged_ratio:
+            transaction.set(artist=f"Artist {index % 97}", title=f"Song {index}").commit()
+            summary["tagged"] += 1
+        else:
+            summary["untagged"] += 1
+
+        summary["formats"][ext] = summary["formats"].get(ext, 0) + 1
+        summary["bytes"] += os.path.getsize(path)
+    return summary
@@ -0,0 +1,5 @@
+import sys
+
+from tools.cli import commandLine
+
+sys.exit(commandLine.main())
@@ -0,0 +1,290 @@
+"""songID from the command line, for cron jobs and download-client hooks.
+
+    python -m tools.cli scan /music/incoming --once    # one cycle over a folder (or file), then exit
+    python -m tools.cli identify /music/track.flac     # look a file up without changing it
+    python -m tools.cli status                         # what the index, journal and caches hold
+    python -m tools.cli dry-run                        # what the next scans would do, changing nothing
+    python -m tools.cli backfill --workers 8           # sort a large library before its first scans
+    python -m tools.cli forget /music/track.flac       # drop a wrong match from the caches
+
+Through `python -m tools.cli` only this module and the standard library are
+loaded up front. The pipeline is imported by the commands that run it (`scan`,
+`identify`), and `status`, `dry-run` and `backfill` never load it; songId.py
+in turn leaves shazamio, numpy and the HTTP clients until a file needs them.
+`python songId.py <command> ...` also works, but songId.py is loaded before it
+hands over to this module, and `scan`/`identify` then import it a second time
+as `songId`.
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent.parent
+if str(REPO_DIR) not in sys.path:
+    sys.path.insert(0, str(REPO_DIR))
+
+SUPPORTED_EXTENSIONS = ('.mp3', '.wav', '.flac', '.m4a', '.ogg')  # As songIdentificator.SUPPORTED_EXTENSIONS
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="songid", description="Identify, tag and sort audio files with Shazam.")
+    parser.add_argument('--home', type=Path, default=REPO_DIR,
+                        help="folder holding config/, data/ and logs/ (default: the songID folder)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    scan = commands.add_parser('scan', help="process a monitored path, a folder or a single file")
+    scan.add_argument('path', help="inside a monitored path, files are sorted into that path's Artist/Quality folders")
+    scan.add_argument('--once', action='store_true', help="run a single cycle and exit instead of repeating")
+
+    identify = commands.add_parser('identify', help="look a file up and print the match, without changing anything")
+    identify.add_argument('file')
+    identify.add_argument('--json', action='store_true', help="print the match as JSON")
+
+    forget = commands.add_parser('forget', help="drop a file's match from the recognition cache and the fingerprint index")
+    forget.add_argument('file')
+
+    status = commands.add_parser('status', help="summarize the scan index, work journal and caches")
+    status.add_argument('--json', action='store_true', help="print the summary as JSON")
+
+    dry_run = commands.add_parser('dry-run', help="list what the next scans would do with each file")
+    dry_run.add_argument('path', nargs='?', default=None, help="folder to check (default: every monitored path)")
+    dry_run.add_argument('--limit', type=int, default=None, help="stop after this many files that need work")
+
+    backfill = commands.add_parser('backfill', help="sort every file into done, tag-only rename and needs lookup on a process pool")
+    backfill.add_argument('path', nargs='?', default=None, help="folder to sort (default: every monitored path)")
+    backfill.add_argument('--workers', type=int, default=None, help="processes reading tags (default: one per CPU)")
+    backfill.add_argument('--manifest', type=Path, default=None,
+                          help="manifest to append to (default: data/backfill_manifest.jsonl)")
+    return parser.parse_args(argv)
+
+def load_identificator(home: Path):
+    """Imports the pipeline, whose optional parts load on first use; only scan and identify pay for it."""
+    import songId
+    songId.songIdentificator.SCRIPT_DIR = home
+    songId.songIdentificator.DATA_DIR = home / "data"
+    return songId.songIdentificator()
+
+def cmd_scan(args: argparse.Namespace) -> int:
+    if not os.path.exists(args.path):
+        print(f"{args.path} does not exist", file=sys.stderr)
+        return 2
+    identificator = load_identificator(args.home)
+    try:
+        identificator.run(target=args.path, once=args.once)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        identificator.close()
+    return 0
+
+def cmd_identify(args: argparse.Namespace) -> int:
+    if not os.path.isfile(args.file):
+        print(f"{args.file} is not a file", file=sys.stderr)
+        return 2
+    import asyncio
+    identificator = load_identificator(args.home)
+    try:
+        match = asyncio.run(identificator.identify(args.file))
+    finally:
+        identificator.close()
+    if args.json:
+        print(json.dumps(match.to_dict() if match else None, indent=2))
+    elif match:
+        print(f"{match.artist} - {match.title} / {match.album} / {match.release_date} ({match.backend})")
+    else:
+        print("No match")
+    return 0 if match else 1
+
+def cmd_forget(args: argparse.Namespace) -> int:
+    if not os.path.isfile(args.file):
+        print(f"{args.file} is not a file", file=sys.stderr)
+        return 2
+    from tools.appConfig import appConfig
+    from tools.recognition_cache.audioHash import audio_payload_hash
+
+    config = appConfig.appConfig.load_and_validate(args.home / "config" / "config.json").get_data()
+    data_dir = args.home / "data"
+    forgotten = False
+    match = None
+
+    audio_hash = audio_payload_hash(args.file)
+    if audio_hash and (data_dir / "recognition_cache.db").exists():
+        from tools.recognition_cache import recognitionCache
+        cache = recognitionCache.recognitionCache(
+            data_dir / "recognition_cache.db",
+            int(config.get("recognitionCacheTtlDays")) * 86400, int(config.get("recognitionCacheMaxEntries")),
+        )
+        try:
+            match = cache.get(audio_hash)
+            if cache.invalidate(audio_hash):
+                forgotten = True
+                print(f"💾 Removed the cached result ({match.get('artist')} - {match.get('title')})")
+        finally:
+            cache.close()
+
+    if (data_dir / "fingerprint_index.npz").exists():
+        # The index is held by the running service, so it drops the track itself at its next save (or start)
+        from tools.fingerprint_index import fingerprintIndex
+        if match is None:
+            from tools.tagging import metadataSnapshot
+            snapshot = metadataSnapshot.metadataSnapshot.load(args.file)
+            match = {"artist": snapshot.artist, "title": snapshot.title}
+        if match.get("artist") and match.get("title"):
+            fingerprintIndex.fingerprintIndex.request_forget(data_dir / "fingerprint_index.npz", match["artist"], match["title"])
+            forgotten = True
+            print(f"🧬 {match['artist']} - {match['title']} will be dropped from the fingerprint index")
+
+    if not forgotten:
+        print("Nothing cached for this file")
+        return 1
+    return 0
+
+def cmd_status(args: argparse.Namespace) -> int:
+    data_dir = args.home / "data"
+    status = {}
+
+    if (data_dir / "scan_index.db").exists():
+        from tools.scan_index import scanIndex
+        index = scanIndex.scanIndex(data_dir / "scan_index.db")
+        status["scan_index"] = index.counts()
+        index.close()
+    if (data_dir / "work_journal.db").exists():
+        from tools.work_journal import workJournal
+        journal = workJournal.workJournal(data_dir / "work_journal.db")
+        steps = {}
+        for entry in journal.pending():
+            steps[entry["step"]] = steps.get(entry["step"], 0) + 1
+        status["work_journal"] = steps
+        journal.close()
+    if (data_dir / "recognition_cache.db").exists():
+        # Read only: opening recognitionCache would purge expired entries
+        import sqlite3
+        conn = sqlite3.connect(f"file:{data_dir / 'recognition_cache.db'}?mode=ro", uri=True)
+        status["recognition_cache"] = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        conn.close()
+    if (data_dir / "fingerprint_index.npz").exists():
+        # The main file plus the delta segments saved since it was last rewritten
+        status["fingerprint_index_bytes"] = sum(path.stat().st_size for path in data_dir.glob("fingerprint_index*.npz"))
+    if (data_dir / "signal_outbox.jsonl").exists():
+        with open(data_dir / "signal_outbox.jsonl") as spool:
+            status["signal_spooled"] = sum(1 for line in spool if line.strip())
+
+    if args.json:
+        print(json.dumps(status, indent=2))
+        return 0
+    if not status:
+        print(f"Nothing recorded yet in {data_dir}")
+        return 0
+    if "scan_index" in status:
+        counts = status["scan_index"]
+        detail = ", ".join(f"{name} {count}" for name, count in sorted(counts.items()))
+        print(f"🗃️ Scan index: {sum(counts.values())} files ({detail or 'empty'})")
+    if "work_journal" in status:
+        steps = status["work_journal"]
+        detail = ", ".join(f"{name} {count}" for name, count in steps.items())
+        print(f"📒 Work journal: {sum(steps.values())} files in flight" + (f" ({detail})" if detail else ""))
+    if "recognition_cache" in status:
+        print(f"💾 Recognition cache: {status['recognition_cache']} results")
+    if "fingerprint_index_bytes" in status:
+        print(f"🧬 Fingerprint index: {status['fingerprint_index_bytes'] / 1e6:.1f} MB")
+    if "signal_spooled" in status:
+        print(f"✉️ Signal messages waiting for a retry: {status['signal_spooled']}")
+    return 0
+
+def cmd_dry_run(args: argparse.Namespace) -> int:
+    # Config validation, the scan index and tag reading, but no recognizer, fingerprinting or HTTP
+    from tools.appConfig import appConfig
+    from tools.scan_index import scanIndex, treeWalker
+    from tools.tagging import metadataSnapshot
+
+    config = appConfig.appConfig.load_and_validate(args.home / "config" / "config.json").get_data()
+    rename_only = config.get("renameAndMoveOnly")
+    index_path = args.home / "data" / "scan_index.db"
+    index = scanIndex.scanIndex(index_path) if config.get("useScanIndex") and index_path.exists() else None
+    roots = [args.path] if args.path else config.get("monitored_paths")
+
+    counts = {"done": 0, "rename": 0, "lookup": 0, "error": 0}
+    try:
+        for root in roots:
+            # No index for the walker: a dry run must not remember folders as checked
+            walker = treeWalker.treeWalker(SUPPORTED_EXTENSIONS)
+            for file_path, stat_result in walker.walk(root):
+                status = index.lookup(file_path, stat_result) if index is not None else None
+                if status in (('tagged', 'renamed') if rename_only else ('tagged', 'manual')):
+                    counts["done"] += 1
+                    continue
+                if status == 'tag_only':
+                    # Sorted by a backfill: renamed from its own tags without a lookup
+                    counts["rename"] += 1
+                    print(f"rename  {file_path} [backfill]")
+                    if args.limit and counts["rename"] + counts["lookup"] >= args.limit:
+                        return 0
+                    continue
+                try:
+                    snapshot = metadataSnapshot.metadataSnapshot.load(file_path)
+                except Exception as e:
+                    counts["error"] += 1
+                    print(f"error   {file_path} ({e})")
+                    continue
+                if rename_only:
+                    action = "rename"
+                elif snapshot.has_comment('roybatty'):
+                    counts["done"] += 1
+                    continue
+                else:
+                    action = "lookup"
+                counts[action] += 1
+                note = f" [tags: {snapshot.artist} - {snapshot.title}]" if snapshot.has_minimal_tags else ""
+                print(f"{action:<7} {file_path}{note}")
+                if args.limit and counts["rename"] + counts["lookup"] >= args.limit:
+                    return 0
+    finally:
+        if index is not None:
+            index.close()
+        print(f"{counts['done']} done, {counts['rename']} to rename, {counts['lookup']} to look up "
+              f"({config.get('maxQueueSize')} per cycle), {counts['error']} unreadable", file=sys.stderr)
+    return 0
+
+def cmd_backfill(args: argparse.Namespace) -> int:
+    # Like dry-run, no recognizer or HTTP clients; the worker processes only import the tag reader
+    import logging
+    from tools.appConfig import appConfig
+    from tools.backfill import libraryBackfill
+    from tools.scan_index import scanIndex
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s", datefmt="%m-%d %H:%M:%S")
+    config = appConfig.appConfig.load_and_validate(args.home / "config" / "config.json").get_data()
+    roots = [args.path] if args.path else config.get("monitored_paths")
+    missing = [root for root in roots if not os.path.isdir(root)]
+    if missing:
+        print(f"{', '.join(missing)} not found", file=sys.stderr)
+        return 2
+    index = scanIndex.scanIndex(args.home / "data" / "scan_index.db") if config.get("useScanIndex") else None
+    if index is None:
+        print("useScanIndex is off: writing the manifest only, scans will not use it", file=sys.stderr)
+
+    backfill = libraryBackfill.libraryBackfill(
+        args.manifest or args.home / "data" / "backfill_manifest.jsonl", SUPPORTED_EXTENSIONS,
+        index=index, workers=args.workers, rename_only=config.get("renameAndMoveOnly"),
+    )
+    try:
+        counts = backfill.run(roots)
+    finally:
+        if index is not None:
+            index.close()
+    print(f"{counts['done']} done, {counts['rename']} to rename from their tags, {counts['lookup']} to look up "
+          f"({config.get('maxQueueSize')} per cycle), {counts['error']} unreadable; "
+          f"appended to {backfill.manifest_path} as run {backfill.run_started}",
+          file=sys.stderr)
+    return 0
+
+COMMANDS = {'scan': cmd_scan, 'identify': cmd_identify, 'forget': cmd_forget, 'status': cmd_status,
+            'dry-run': cmd_dry_run, 'backfill': cmd_backfill}
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    return COMMANDS[args.command](args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['coverCache']
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+class coverCache:
+    """Cover art fetched once per URL and shared between tag embedding and notifications.
+
+    Lookups go memory LRU -> bounded on-disk store -> HTTP through a single
+    pooled session. Concurrent requests for the same URL wait for one download.
+    The session, and with it `requests`, is only set up for the first download.
+    """
+
+    def __init__(self, cache_dir: Path, memory_entries: int = 64, max_disk_bytes: int = 200 * 1024 * 1024,
+                 timeout: float = 15.0, logger: logging.Logger = None):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.memory_entries = memory_entries
+        self.max_disk_bytes = max_disk_bytes
+        self.timeout = timeout
+        self.logger = logger or logging.getLogger("log")
+        self.hits = 0
+        self.misses = 0
+
+        self.session = None
+
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._disk_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.img"))
+
+    def get(self, url: str) -> Optional[Tuple[bytes, str]]:
+        """Returns (image_data, mime_type) for the URL, or None when it can not be fetched."""
+        data = self.get_bytes(url)
+        if data is None:
+            return None
+        return data, self.mime_type(data)
+
+    def get_bytes(self, url: str) -> Optional[bytes]:
+        if not url:
+            return None
+
+        with self._lock:
+            data = self._memory.get(url)
+            if data is not None:
+                self._memory.move_to_end(url)
+                self.hits += 1
+                return data
+            url_lock = self._inflight.setdefault(url, threading.Lock())
+
+        with url_lock:
+            # Another thread may have finished the same download while we waited
+            with self._lock:
+                data = self._memory.get(url)
+                if data is not None:
+                    self.hits += 1
+                    return data
+
+            data = self._read_disk(url)
+            if data is not None:
+                with self._lock:
+                    self.hits += 1
+            else:
+                data = self._download(url)
+                if data is None:
+                    with self._lock:
+                        self._inflight.pop(url, None)
+                    return None
+                with self._lock:
+                    self.misses += 1
+                self._write_disk(url, data)
+
+            with self._lock:
+                self._remember(url, data)
+                self._inflight.pop(url, None)
+        return data
+
+    @staticmethod
+    def mime_type(data: bytes) -> str:
+        return 'image/png' if data.startswith(PNG_SIGNATURE) else 'image/jpeg'
+
+    # --- Internals ---
+    def _remember(self, url: str, data: bytes):
+        self._memory[url] = data
+        self._memory.move_to_end(url)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _get_session(self):
+        with self._lock:
+            if self.session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.session = session
+            return self.session
+
+    def _download(self, url: str) -> Optional[bytes]:
+        import requests
+        try:
+            response = self._get_session().get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            self.logger.error(f"Failed to download cover art from {url}: {e}")
+            return None
+        if response.status_code != 200 or not response.content:
+            self.logger.error(f"Failed to download cover art from {url}")
+            return None
+        return response.content
+
+    def _path_for(self, url: str) -> Path:
+        return self.cache_dir / (hashlib.sha1(url.encode('utf-8')).hexdigest() + ".img")
+
+    def _read_disk(self, url: str) -> Optional[bytes]:
+        path = self._path_for(url)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Mark as recently used for eviction
+            return data
+        except OSError:
+            return None
+
+    def _write_disk(self, url: str, data: bytes):
+        path = self._path_for(url)
+        tmp_path = path.with_suffix(".tmp")
+        try:
+            tmp_path.write_bytes(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            self.logger.warning(f"🖼️ Could not store cover art on disk: {e}")
+            return
+        with self._lock:
+            self._disk_bytes += len(data)
+            over_budget = self._disk_bytes > self.max_disk_bytes
+        if over_budget:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        """Removes least recently used files until the store fits in 90% of its budget."""
+        entries = []
+        for path in self.cache_dir.glob("*.img"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = self.max_disk_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except OSError:
+                continue
+        with self._lock:
+            self._disk_bytes = total
@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['landmarks', 'fingerprintIndex']
\ No newline at end of file
@@ -0,0 +1,335 @@
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+class fingerprintIndex:
+    """Landmark index of already identified audio, kept in sorted NumPy arrays.
+
+    Postings are three parallel arrays (hash, track id, frame offset) sorted
+    by hash, so a query is a vectorized `searchsorted` followed by a vote on
+    (track, offset difference): material that really matches lines up at a
+    constant offset. New postings go to a small buffer that is searched
+    separately. Once the buffer reaches an eighth of the index, it is sorted
+    on its own and merged into the main arrays in one linear pass, so adding a
+    track never re-sorts the whole index.
+
+    The main arrays live in one `.npz` file that is only rewritten after such
+    a merge. Other saves append the postings and tracks added since the last
+    save as a small delta segment next to it (`<name>.delta-<n>.npz`). Each
+    segment carries the generation of the main file it extends, so segments
+    left over from before a rewrite are ignored and removed.
+
+    Wrong matches are dropped with `request_forget`, which other processes
+    (the command line) may call while the service holds the index: the
+    request is appended to `<name>.forget.jsonl` and applied by whoever has
+    the index open, at its next `save()` or when it is loaded.
+    """
+
+    MERGE_THRESHOLD = 50000  # Pending postings before they are merged, at least; grows with the index
+    MERGE_FRACTION = 8       # ... or 1/8 of the main arrays, so merges cost amortized O(1) per posting
+    MAX_SEGMENTS = 64        # Delta segments on disk before the main file is rewritten anyway
+    FORGET_SUFFIX = ".forget.jsonl"
+
+    def __init__(self, path: Path, min_matches: int = 20, logger: logging.Logger = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.min_matches = min_matches
+        self.logger = logger or logging.getLogger("log")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._tracks: List[Dict] = []
+        self._track_ids: Dict[Tuple, int] = {}
+        self._hashes = np.zeros(0, dtype=np.uint32)
+        self._ids = np.zeros(0, dtype=np.uint32)
+        self._offsets = np.zeros(0, dtype=np.uint32)
+        self._pending: List[Tuple[np.ndarray, np.ndarray, np.ndarray]] = []
+        self._pending_count = 0
+        self._pending_sorted = None
+        self._generation = 0
+        self._segments = 0            # Delta segments on disk for the current generation
+        self._saved_pending = 0       # Pending chunks already written to a segment
+        self._saved_tracks = 0        # Tracks already in the main file or a segment
+        self._merged = False          # Main arrays changed since the main file was written
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def add(self, result: Dict, hashes: np.ndarray, offsets: np.ndarray) -> Optional[int]:
+        """Indexes the landmarks of identified audio, returns its track id."""
+        if hashes is None or len(hashes) == 0 or not result:
+            return None
+        key = (result.get('artist'), result.get('title'))
+        with self._lock:
+            track_id = self._track_ids.get(key)
+            if track_id is None:
+                track_id = len(self._tracks)
+                self._tracks.append(dict(result))
+                self._track_ids[key] = track_id
+            self._pending.append((
+                np.asarray(hashes, dtype=np.uint32),
+                np.full(len(hashes), track_id, dtype=np.uint32),
+                np.asarray(offsets, dtype=np.uint32),
+            ))
+            self._pending_count += len(hashes)
+            self._pending_sorted = None
+            self._dirty = True
+            if self._pending_count >= max(self.MERGE_THRESHOLD, len(self._hashes) // self.MERGE_FRACTION):
+                self._merge()
+        return track_id
+
+    def match(self, hashes: np.ndarray, offsets: np.ndarray) -> Optional[Tuple[Dict, int]]:
+        """Returns (result, aligned landmark count) of the best match, or None below `min_matches`."""
+        if hashes is None or len(hashes) == 0:
+            return None
+        hashes = np.asarray(hashes, dtype=np.uint32)
+        offsets = np.asarray(offsets, dtype=np.int64)
+
+        with self._lock:
+            sources = [(self._hashes, self._ids, self._offsets)]
+            if self._pending:
+                if self._pending_sorted is None:
+                    self._pending_sorted = self._sorted(*(np.concatenate([p[i] for p in self._pending]) for i in range(3)))
+                sources.append(self._pending_sorted)
+            tracks = self._tracks
+
+        found_ids, found_deltas = [], []
+        for db_hashes, db_ids, db_offsets in sources:
+            postings, query_index = self._postings(db_hashes, hashes)
+            if len(postings):
+                found_ids.append(db_ids[postings].astype(np.int64))
+                found_deltas.append(db_offsets[postings].astype(np.int64) - offsets[query_index])
+        if not found_ids:
+            self.misses += 1
+            return None
+        ids = np.concatenate(found_ids)
+        deltas = np.concatenate(found_deltas)
+
+        # Votes per (track, offset difference); a real match piles up on one difference.
+        # Lossy encoders shift peaks by a fraction of a frame, so neighbouring
+        # differences are counted together.
+        keys = (ids << 32) + (deltas + (1 << 31))
+        unique_keys, votes = np.unique(keys, return_counts=True)
+        neighbour = np.searchsorted(unique_keys, unique_keys + 1)
+        present = neighbour < len(unique_keys)
+        present[present] = unique_keys[neighbour[present]] == unique_keys[present] + 1
+        votes = votes + np.where(present, votes[np.minimum(neighbour, len(votes) - 1)], 0)
+        best = int(np.argmax(votes))
+        score = int(votes[best])
+        if score < self.min_matches:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return dict(tracks[int(unique_keys[best] >> 32)]), score
+
+    def save(self):
+        """Persists what changed since the last save: a delta segment, or the whole index after a merge."""
+        with self._lock:
+            applying = self._apply_forget_requests()
+            if self._dirty:
+                if self._merged or self._segments >= self.MAX_SEGMENTS or not self.path.exists():
+                    self._save_main()
+                else:
+                    self._save_segment()
+                self._dirty = False
+            if applying is not None:
+                applying.unlink(missing_ok=True)  # Only once the main file no longer has the tracks
+
+    def forget(self, artist: str, title: str) -> bool:
+        """Drops a track and its postings; the main file is rewritten at the next save."""
+        with self._lock:
+            return self._forget(artist, title)
+
+    @classmethod
+    def request_forget(cls, path: Path, artist: str, title: str):
+        """Asks whichever process has the index at `path` open (or opens it next) to drop a track."""
+        path = Path(path)
+        with open(path.with_name(path.stem + cls.FORGET_SUFFIX), "a", encoding="utf-8") as f:
+            f.write(json.dumps({"artist": artist, "title": title}) + "\n")
+
+    def close(self):
+        self.save()
+
+    # --- Internals ---
+    @staticmethod
+    def _postings(db_hashes: np.ndarray, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions in `db_hashes` equal to any query hash, with the query index of each."""
+        if len(db_hashes) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        left = np.searchsorted(db_hashes, hashes, side='left')
+        counts = np.searchsorted(db_hashes, hashes, side='right') - left
+        total = int(counts.sum())
+        if not total:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        # Expand every query landmark into the run of postings sharing its hash
+        query_index = np.repeat(np.arange(len(hashes)), counts)
+        within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+        return np.repeat(left, counts) + within, query_index
+
+    @staticmethod
+    def _sorted(hashes: np.ndarray, ids: np.ndarray, offsets: np.ndarray):
+        order = np.argsort(hashes, kind='stable')
+        return hashes[order], ids[order], offsets[order]
+
+    def _merge(self):
+        """Sorts the pending postings on their own and merges them into the main arrays in one pass."""
+        if not self._pending:
+            return
+        hashes, ids, offsets = self._pending_sorted or self._sorted(
+            *(np.concatenate([p[i] for p in self._pending]) for i in range(3))
+        )
+        # Two sorted runs: each pending posting goes after the equal main hashes, keeping add order
+        positions = np.searchsorted(self._hashes, hashes, side='right')
+        self._hashes = np.insert(self._hashes, positions, hashes)
+        self._ids = np.insert(self._ids, positions, ids)
+        self._offsets = np.insert(self._offsets, positions, offsets)
+        self._pending = []
+        self._pending_count = 0
+        self._pending_sorted = None
+        self._saved_pending = 0
+        self._merged = True
+
+    def _save_main(self):
+        self._merge()
+        self._write(self.path, generation=self._generation + 1, hashes=self._hashes, ids=self._ids,
+                    offsets=self._offsets, tracks=self._tracks)
+        self._generation += 1
+        self._remove_segments()
+        self._segments = 0
+        self._saved_tracks = len(self._tracks)
+        self._merged = False
+
+    def _save_segment(self):
+        chunks = self._pending[self._saved_pending:]
+        if not chunks and self._saved_tracks == len(self._tracks):
+            return
+        hashes, ids, offsets = (np.concatenate([c[i] for c in chunks]) if chunks else np.zeros(0, dtype=np.uint32)
+                                for i in range(3))
+        self._write(self._segment_path(self._segments + 1), generation=self._generation, hashes=hashes, ids=ids,
+                    offsets=offsets, tracks=self._tracks[self._saved_tracks:], first_track=self._saved_tracks)
+        self._segments += 1
+        self._saved_pending = len(self._pending)
+        self._saved_tracks = len(self._tracks)
+
+    @staticmethod
+    def _write(path: Path, tracks: List[Dict], **arrays):
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, tracks=np.frombuffer(json.dumps(tracks).encode("utf-8"), dtype=np.uint8),
+                     **{name: np.asarray(value) for name, value in arrays.items()})
+        os.replace(tmp_path, path)
+
+    def _segment_path(self, number: int) -> Path:
+        return self.path.with_name(f"{self.path.stem}.delta-{number:04d}.npz")
+
+    def _segment_paths(self) -> List[Path]:
+        return sorted(self.path.parent.glob(f"{self.path.stem}.delta-*.npz"))
+
+    def _forget(self, artist: str, title: str) -> bool:
+        track_id = self._track_ids.pop((artist, title), None)
+        if track_id is None:
+            return False
+        self._tracks[track_id] = {}  # Keeps the ids of later tracks
+        keep = self._ids != track_id
+        self._hashes, self._ids, self._offsets = self._hashes[keep], self._ids[keep], self._offsets[keep]
+        pending = []
+        for chunk in self._pending:
+            keep = chunk[1] != track_id
+            if keep.any():
+                pending.append(tuple(column[keep] for column in chunk))
+        self._pending = pending
+        self._pending_count = sum(len(chunk[0]) for chunk in pending)
+        self._pending_sorted = None
+        # Segments on disk still hold the postings, so the main file has to be rewritten
+        self._merged = True
+        self._dirty = True
+        return True
+
+    def _apply_forget_requests(self) -> Optional[Path]:
+        """Applies queued forget requests; returns the taken-over request file to remove after saving."""
+        requests = self.path.with_name(self.path.stem + self.FORGET_SUFFIX)
+        applying = requests.with_suffix(".applying")
+        if not applying.exists():
+            try:
+                # Taken over first, so requests appended meanwhile go to a fresh file
+                os.replace(requests, applying)
+            except FileNotFoundError:
+                return None
+        try:
+            with open(applying, encoding="utf-8") as f:
+                lines = f.readlines()
+        except OSError:
+            return None
+        for line in lines:
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if self._forget(request.get("artist"), request.get("title")):
+                self.logger.info(f"🧬 Forgot {request.get('artist')} - {request.get('title')} from the fingerprint index")
+        self._dirty = self._dirty or bool(lines)
+        return applying
+
+    def _remove_segments(self):
+        for segment in self._segment_paths():
+            try:
+                segment.unlink()
+            except OSError:
+                pass
+
+    def _load(self):
+        try:
+            with np.load(self.path) as data:
+                tracks = json.loads(data["tracks"].tobytes().decode("utf-8"))
+                hashes, ids, offsets = data["hashes"], data["ids"], data["offsets"]
+                generation = data["generation"] if "generation" in data.files else 0
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError) as e:
+            # The index is derived data, start over rather than fail
+            self.logger.warning(f"🧬 Could not load fingerprint index, starting empty: {e}")
+            return
+        if not (len(hashes) == len(ids) == len(offsets)) or (len(ids) and int(ids.max()) >= len(tracks)):
+            self.logger.warning("🧬 Fingerprint index is inconsistent, starting empty")
+            return
+        self._tracks = tracks
+        self._hashes, self._ids, self._offsets = hashes, ids, offsets
+        self._generation = int(generation)
+        self._load_segments()
+        self._track_ids = {(t.get('artist'), t.get('title')): i for i, t in enumerate(self._tracks) if t}
+        self._saved_tracks = len(self._tracks)
+        self._saved_pending = len(self._pending)
+        self._apply_forget_requests()  # The request file is removed by the next save
+
+    def _load_segments(self):
+        """Applies the delta segments of the main file's generation, in order, as pending postings."""
+        for segment in self._segment_paths():
+            try:
+                with np.load(segment) as data:
+                    generation = int(data["generation"])
+                    first_track = int(data["first_track"])
+                    tracks = json.loads(data["tracks"].tobytes().decode("utf-8"))
+                    hashes, ids, offsets = data["hashes"], data["ids"], data["offsets"]
+            except (OSError, ValueError, KeyError) as e:
+                self.logger.warning(f"🧬 Skipping unreadable fingerprint index segment {segment.name}: {e}")
+                break  # Later segments may refer to its tracks
+            if generation != self._generation:
+                continue  # Already part of a newer main file, or of an older one that was replaced
+            if first_track != len(self._tracks) or (len(ids) and int(ids.max()) >= first_track + len(tracks)):
+                self.logger.warning(f"🧬 Fingerprint index segment {segment.name} does not fit, ignoring the rest")
+                break
+            self._tracks.extend(tracks)
+            if len(hashes):
+                self._pending.append((hashes, ids, offsets))
+                self._pending_count += len(hashes)
+            self._segments += 1
+        if self._pending_count >= max(self.MERGE_THRESHOLD, len(self._hashes) // self.MERGE_FRACTION):
+            self._merge()
+            self._dirty = True  # Folds the segments into the main file at the next save
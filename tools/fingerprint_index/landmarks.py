@@ -0,0 +1,68 @@
+from typing import Tuple
+
+import numpy as np
+
+# Tuned for 16 kHz mono input (what the Shazam signature is generated from)
+FFT_SIZE = 1024
+HOP = 256                  # 16 ms per frame
+NEIGHBOURHOOD_BINS = 12    # A peak is the loudest point within +/- this many bins...
+NEIGHBOURHOOD_FRAMES = 12  # ...and frames
+PEAKS_PER_SECOND = 30
+FAN_OUT = 6                # Pairs formed per anchor peak
+MAX_DT = 63                # Frames, 6 bits
+MAX_DF = 63                # Bins, 7 bits signed
+
+def _sliding_max(values: np.ndarray, radius: int, axis: int) -> np.ndarray:
+    padded = np.pad(values, [(radius, radius) if a == axis else (0, 0) for a in range(values.ndim)],
+                    mode='constant', constant_values=-np.inf)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, 2 * radius + 1, axis=axis)
+    return windows.max(axis=-1)
+
+def spectrogram(samples: np.ndarray) -> np.ndarray:
+    """Log magnitude STFT, shape (frames, bins)."""
+    if len(samples) < FFT_SIZE:
+        return np.zeros((0, FFT_SIZE // 2 + 1), dtype=np.float32)
+    frames = np.lib.stride_tricks.sliding_window_view(samples.astype(np.float32), FFT_SIZE)[::HOP]
+    spectrum = np.abs(np.fft.rfft(frames * np.hanning(FFT_SIZE).astype(np.float32), axis=1))
+    return np.log1p(spectrum).astype(np.float32)
+
+def peaks(spec: np.ndarray, sample_rate: int = 16000) -> Tuple[np.ndarray, np.ndarray]:
+    """Spectral peaks as (frame, bin) arrays sorted by frame, strongest ones only."""
+    if spec.size == 0:
+        return np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32)
+    # A 2D max filter, done separably
+    local_max = _sliding_max(_sliding_max(spec, NEIGHBOURHOOD_BINS, axis=1), NEIGHBOURHOOD_FRAMES, axis=0)
+    floor = spec.mean() + spec.std()
+    frame_idx, bin_idx = np.nonzero((spec == local_max) & (spec > floor))
+    if len(frame_idx) == 0:
+        return frame_idx.astype(np.int32), bin_idx.astype(np.int32)
+
+    seconds = spec.shape[0] * HOP / sample_rate
+    keep = max(1, int(seconds * PEAKS_PER_SECOND))
+    if len(frame_idx) > keep:
+        strongest = np.argpartition(spec[frame_idx, bin_idx], -keep)[-keep:]
+        frame_idx, bin_idx = frame_idx[strongest], bin_idx[strongest]
+    order = np.lexsort((bin_idx, frame_idx))
+    return frame_idx[order].astype(np.int32), bin_idx[order].astype(np.int32)
+
+def extract(samples: np.ndarray, sample_rate: int = 16000) -> Tuple[np.ndarray, np.ndarray]:
+    """Landmark hashes and their frame offsets for 16 kHz mono samples.
+
+    Each hash packs anchor bin (10 bits), bin delta (7 bits) and frame delta
+    (6 bits) of a pair of nearby peaks, as in Wang's "An Industrial-Strength
+    Audio Search Algorithm". Returns (hashes uint32, offsets uint32).
+    """
+    frame_idx, bin_idx = peaks(spectrogram(samples), sample_rate)
+    hashes, offsets = [], []
+    for step in range(1, FAN_OUT + 1):
+        if len(frame_idx) <= step:
+            break
+        dt = frame_idx[step:] - frame_idx[:-step]
+        df = bin_idx[step:] - bin_idx[:-step]
+        valid = (dt > 0) & (dt <= MAX_DT) & (np.abs(df) <= MAX_DF)
+        anchor_bins = bin_idx[:-step][valid].astype(np.uint32)
+        hashes.append((anchor_bins << 13) | ((df[valid] + 64).astype(np.uint32) << 6) | dt[valid].astype(np.uint32))
+        offsets.append(frame_idx[:-step][valid].astype(np.uint32))
+    if not hashes:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.uint32)
+    return np.concatenate(hashes), np.concatenate(offsets)
@@ -1,2 +1,2 @@
 from . import *
-__all__ = ['signalBot']
\ No newline at end of file
+__all__ = ['signalBot', 'signalOutbox']
\ No newline at end of file
@@ -2,15 +2,32 @@ import requests
 import base64
 import logging
 from pprint import pformat
+from typing import Callable, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 class signalBot:
     """Simple class to send messages using a Signal-compatible Bot API."""
 
-    def __init__(self, sigSender: str, sigGroup: str, sigEndpoint: str):
+    def __init__(self, sigSender: str, sigGroup: str, sigEndpoint: str, image_fetcher: Callable[[str], Optional[bytes]] = None,
+                 timeout: float = 10.0):
         self.sigSender = sigSender
         self.sigGroup = sigGroup
-        self.sigEndpoint = sigEndpoint
-    
+        self.sigEndpoint = str(sigEndpoint).rstrip('/')
+        # Shared fetcher (e.g. the cover cache) so images already downloaded for tagging are reused
+        self.image_fetcher = image_fetcher
+        self.timeout = timeout
+
+        # Pooled keep-alive connections with a few quick retries for transient failures. Sends
+        # (POST) are only retried when the connection failed, since a timed out or 5xx send may
+        # still have been delivered; signalOutbox spools and retries those instead
+        self.session = requests.Session()
+        retry = Retry(total=2, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({'GET'}))
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4, max_retries=retry)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
     def sendMessage(self, payload: dict = None, bot_message: str = None, silently: bool = False, type: str = 'text', binPayload: str = None):
         """
         Send a message or a payload dict dynamically.
@@ -18,50 +35,77 @@ class signalBot:
           or a payload dict with multiple fields.
         - If payload includes 'image_url', fetch and base64 encode image automatically.
         """
-
+        image_urls = []
         if payload:
-            # Check for image URL in payload
-            image_url = payload.get('image_url')
-            if image_url:
-                try:
-                    resp = requests.get(image_url)
-                    resp.raise_for_status()
-                    binPayload = base64.b64encode(resp.content).decode('utf-8')
-                    type = 'image'
-                    payload.pop('image_url', None)  # Remove image_url from text message
-                except Exception as e:
-                    logging.warning(f"Failed to fetch image {image_url}: {e}")
-                    type = 'text'
-                    binPayload = None
+            bot_message, image_urls = self.format_payload(payload)
+
+        attachments = [binPayload] if type == 'image' and binPayload else []
+        attachments += self.fetch_attachments(image_urls)
+
+        try:
+            return self.send_raw(bot_message, attachments)
+        except requests.RequestException as e:
+            logging.warning(f"Signal message send failed: {e}")
+            return None
 
-            # Build dynamic message from payload
-            lines = []
-            for key, value in payload.items():
-                if isinstance(value, (dict, list)):
-                    value_str = pformat(value)
-                else:
-                    value_str = str(value)
-                key_str = key.replace('_', ' ').capitalize()
-                lines.append(f"{key_str}: {value_str}")
-            bot_message = "\n".join(lines) + "\n"
+    @staticmethod
+    def format_payload(payload: dict) -> Tuple[str, List[str]]:
+        """Renders a payload dict as message text, returns (message, image urls)."""
+        payload = dict(payload)
+        image_url = payload.pop('image_url', None)  # Sent as attachment, not as text
 
+        # Build dynamic message from payload
+        lines = []
+        for key, value in payload.items():
+            if isinstance(value, (dict, list)):
+                value_str = pformat(value)
+            else:
+                value_str = str(value)
+            key_str = key.replace('_', ' ').capitalize()
+            lines.append(f"{key_str}: {value_str}")
+        return "\n".join(lines) + "\n", [image_url] if image_url else []
+
+    def fetch_attachments(self, image_urls: List[str]) -> List[str]:
+        """Fetches images and returns them base64 encoded, skipping the ones that fail."""
+        attachments = []
+        for image_url in image_urls:
+            try:
+                image_data = self._fetch_image(image_url)
+                attachments.append(base64.b64encode(image_data).decode('utf-8'))
+            except Exception as e:
+                logging.warning(f"Failed to fetch image {image_url}: {e}")
+        return attachments
+
+    def send_raw(self, bot_message: str, attachments: List[str] = None) -> dict:
+        """Posts one message, raises requests.RequestException on failure."""
         if not bot_message:
             bot_message = "No message content provided."
 
-        try:
-            data = {
-                "message": bot_message,
-                "number": self.sigSender,
-                "recipients": [self.sigGroup]
-            }
+        data = {
+            "message": bot_message,
+            "number": self.sigSender,
+            "recipients": [self.sigGroup]
+        }
 
-            if type == 'image' and binPayload:
-                data["base64_attachments"] = [binPayload]
+        if attachments:
+            data["base64_attachments"] = attachments
 
-            response = requests.post(f'{self.sigEndpoint}/v2/send', json=data)
-            response.raise_for_status()
+        response = self.session.post(f'{self.sigEndpoint}/v2/send', json=data, timeout=self.timeout)
+        response.raise_for_status()
+        try:
             return response.json()
+        except ValueError:
+            return {}
 
-        except requests.RequestException as e:
-            logging.warning(f"Signal message send failed: {e}")
-            return None
+    def close(self):
+        self.session.close()
+
+    def _fetch_image(self, image_url: str) -> bytes:
+        if self.image_fetcher:
+            image_data = self.image_fetcher(image_url)
+            if image_data is None:
+                raise ValueError("image could not be fetched")
+            return image_data
+        resp = self.session.get(image_url, timeout=self.timeout)
+        resp.raise_for_status()
+        return resp.content
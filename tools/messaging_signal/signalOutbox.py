@@ -0,0 +1,209 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+from pathlib import Path
+from typing import List
+
+import requests
+
+from .signalBot import signalBot
+
+MAX_ATTACHMENTS = 10
+
+class signalOutbox:
+    """Queues Signal notifications and delivers them from a background thread.
+
+    Callers never wait on the Signal endpoint. Messages queued with
+    `coalesce=True` that arrive within `coalesce_window` seconds are merged
+    into one message. Messages that can not be delivered are spooled to disk
+    and retried every `retry_interval` seconds, also across restarts.
+    """
+
+    def __init__(self, bot: signalBot, spool_path: Path, coalesce_window: float = 10.0,
+                 retry_interval: float = 300.0, max_spooled: int = 500, logger: logging.Logger = None, metrics=None):
+        self.bot = bot
+        self.spool_path = Path(spool_path)
+        self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+        self.coalesce_window = coalesce_window
+        self.retry_interval = retry_interval
+        self.max_spooled = max_spooled
+        self.logger = logger or logging.getLogger("log")
+        self.metrics = metrics  # Optional stageMetrics, records every send as "signal_send"
+
+        self._recover_interrupted_retry()
+
+        self._queue: "queue.Queue[dict]" = queue.Queue()
+        self._batch: List[dict] = []
+        self._batch_started = 0.0
+        self._next_retry = time.monotonic()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="signalOutbox", daemon=True)
+        self._thread.start()
+
+    def send(self, payload: dict = None, bot_message: str = None, coalesce: bool = False):
+        """Queues a message and returns immediately."""
+        image_urls = []
+        if payload:
+            bot_message, image_urls = self.bot.format_payload(payload)
+        self._queue.put({"message": bot_message, "image_urls": image_urls, "coalesce": coalesce})
+
+    def pending(self) -> int:
+        """Messages queued or waiting to be coalesced, not counting the disk spool."""
+        return self._queue.qsize() + len(self._batch)
+
+    def close(self, timeout: float = 10.0):
+        """Stops the worker; anything still queued is delivered or spooled."""
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+
+    # --- Worker ---
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self._step()
+            except Exception as e:
+                # Keep the worker alive, or send() would queue messages nobody delivers
+                self.logger.error(f"✉️ Signal outbox error: {e!r}")
+
+        # Drain on shutdown
+        try:
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item["coalesce"]:
+                    self._batch.append(item)
+                else:
+                    self._deliver(item)
+            self._flush_batch()
+        except Exception as e:
+            self.logger.error(f"✉️ Signal outbox error while shutting down: {e!r}")
+
+    def _step(self):
+        try:
+            item = self._queue.get(timeout=self._wait_time())
+        except queue.Empty:
+            item = None
+
+        if item is not None:
+            if item["coalesce"] and self.coalesce_window > 0:
+                if not self._batch:
+                    self._batch_started = time.monotonic()
+                self._batch.append(item)
+            else:
+                self._deliver(item)
+
+        if self._batch and time.monotonic() - self._batch_started >= self.coalesce_window:
+            self._flush_batch()
+
+        if time.monotonic() >= self._next_retry:
+            # Scheduled first, so a failing retry pass waits for the next interval instead of looping
+            self._next_retry = time.monotonic() + self.retry_interval
+            self._retry_spooled()
+
+    def _wait_time(self) -> float:
+        now = time.monotonic()
+        wait = self._next_retry - now
+        if self._batch:
+            wait = min(wait, self._batch_started + self.coalesce_window - now)
+        return max(0.1, min(wait, 5.0))
+
+    def _flush_batch(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        if len(batch) == 1:
+            self._deliver(batch[0])
+            return
+        merged = {
+            "message": "\n".join(item["message"].rstrip("\n") for item in batch) + "\n",
+            "image_urls": [url for item in batch for url in item["image_urls"]][:MAX_ATTACHMENTS],
+        }
+        self.logger.debug(f"✉️ Coalesced {len(batch)} notifications into one message")
+        self._deliver(merged)
+
+    def _deliver(self, item: dict) -> bool:
+        try:
+            self._send(item)
+            return True
+        except requests.RequestException as e:
+            self.logger.warning(f"✉️ Signal send failed, keeping message for retry: {e}")
+            self._spool([item])
+            return False
+
+    def _send(self, item: dict):
+        attachments = self.bot.fetch_attachments(item.get("image_urls", []))
+        if self.metrics is None:
+            self.bot.send_raw(item["message"], attachments)
+            return
+        with self.metrics.time("signal_send"):
+            self.bot.send_raw(item["message"], attachments)
+
+    # --- Disk spool ---
+    def _spool(self, items: List[dict]):
+        now = time.time()
+        try:
+            with open(self.spool_path, "a", encoding="utf-8") as f:
+                for item in items:
+                    record = {
+                        "message": item["message"],
+                        "image_urls": item.get("image_urls", []),
+                        "created": item.get("created", now),
+                        "attempts": item.get("attempts", 0) + 1,
+                    }
+                    f.write(json.dumps(record) + "\n")
+        except OSError as e:
+            self.logger.error(f"✉️ Could not spool Signal message: {e}")
+
+    def _read_spool(self) -> List[dict]:
+        try:
+            with open(self.spool_path, encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return []
+        items = []
+        for line in lines:
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+        return items
+
+    def _recover_interrupted_retry(self):
+        """Puts back messages of a retry pass that was cut short by a restart."""
+        tmp_path = self.spool_path.with_suffix(".retry")
+        if not tmp_path.exists():
+            return
+        with open(tmp_path, encoding="utf-8") as src, open(self.spool_path, "a", encoding="utf-8") as dst:
+            dst.write(src.read())
+        tmp_path.unlink()
+
+    def _retry_spooled(self):
+        self._recover_interrupted_retry()  # Left behind by a pass that failed halfway
+        items = self._read_spool()
+        if not items:
+            return
+        if len(items) > self.max_spooled:
+            self.logger.warning(f"✉️ Dropping {len(items) - self.max_spooled} old undelivered Signal messages")
+            items = items[-self.max_spooled:]
+
+        # Take the spool over before sending so new failures append to a fresh file
+        tmp_path = self.spool_path.with_suffix(".retry")
+        os.replace(self.spool_path, tmp_path)
+        failed = []
+        for index, item in enumerate(items):
+            try:
+                self._send(item)
+            except requests.RequestException:
+                # Endpoint still down, keep this and everything after it for later
+                failed = items[index:]
+                break
+        if failed:
+            self._spool(failed)
+        else:
+            self.logger.info(f"✉️ Delivered {len(items)} spooled Signal message(s)")
+        tmp_path.unlink(missing_ok=True)
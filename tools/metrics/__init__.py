@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['stageMetrics', 'metricsServer', 'profileSession']
\ No newline at end of file
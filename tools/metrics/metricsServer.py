@@ -0,0 +1,46 @@
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .stageMetrics import stageMetrics
+
+class metricsServer:
+    """Serves `stageMetrics` on http://host:port/metrics from a daemon thread."""
+
+    def __init__(self, metrics: stageMetrics, host: str = "127.0.0.1", port: int = 9464, logger: logging.Logger = None):
+        self.metrics = metrics
+        self.host = host
+        self.port = port
+        self.logger = logger or logging.getLogger("log")
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        metrics = self.metrics
+
+        class handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = metrics.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass  # Scrapes would flood the log
+
+        self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metricsServer", daemon=True)
+        self._thread.start()
+        self.logger.info(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
@@ -0,0 +1,172 @@
+import asyncio
+import cProfile
+import functools
+import io
+import json
+import logging
+import pstats
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+class profileSession:
+    """cProfile stats and per-file timing traces for the next `files` files or `cycles` scan cycles.
+
+    A single profiler runs per process, switched on in the event loop thread
+    while a cycle runs: Python 3.12+ allows only one active profiler, which
+    then also sees the worker threads; older versions only record the event
+    loop thread. If another profiler is already active, the session keeps
+    writing traces without cProfile stats. Work done in the fingerprint
+    process pool shows up as time waiting for it (and in the traces as
+    `decode_seconds`).
+
+    Every file that leaves the pipeline while the session is active gets one
+    JSON line in `trace-<stamp>.jsonl` with the seconds it spent in each
+    stage. With a file limit, profiling stops as soon as that many files
+    were traced. At the end, `profile-<stamp>.pstats` (for pstats or
+    snakeviz) and a text summary of the most expensive functions are written
+    next to it.
+    """
+
+    TOP_FUNCTIONS = 40
+
+    def __init__(self, log_dir: Path, files: int = 0, cycles: int = 0, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger("log")
+        self.files_limit = files or None
+        self.cycles_limit = cycles or (None if files else 1)
+        self.files = 0
+        self.cycles = 0
+        log_dir = Path(log_dir)
+        log_dir.mkdir(parents=True, exist_ok=True)
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        self.profile_path = log_dir / f"profile-{stamp}.pstats"
+        self.summary_path = log_dir / f"profile-{stamp}.txt"
+        self.trace_path = log_dir / f"trace-{stamp}.jsonl"
+        self._profile = cProfile.Profile()
+        self._profiling = False
+        self._profiled_once = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._trace = open(self.trace_path, 'a', encoding='utf-8')
+
+    @property
+    def finished(self) -> bool:
+        return ((self.files_limit is not None and self.files >= self.files_limit)
+                or (self.cycles_limit is not None and self.cycles >= self.cycles_limit))
+
+    def describe(self) -> str:
+        if self.files_limit is not None:
+            return f"the next {self.files_limit} files"
+        return f"the next {self.cycles_limit} cycle{'s' if self.cycles_limit != 1 else ''}"
+
+    def start_cycle(self):
+        """Switches the profiler on; call from the event loop thread."""
+        if self.finished or self._profiling:
+            return
+        self._loop = asyncio.get_running_loop()
+        try:
+            self._profile.enable()
+        except ValueError as e:
+            # Another profiler (or another session's) is active: traces only
+            self.logger.warning(f"🔬 cProfile unavailable, writing timing traces only: {e}")
+            return
+        self._profiling = True
+        self._profiled_once = True
+
+    def end_cycle(self):
+        self._stop_profile()
+        self.cycles += 1
+
+    def wrap(self, stage: str, handler: Callable) -> Callable:
+        """Times `handler(job)` into `job.timings[stage]` and traces the job once it leaves the pipeline."""
+        if asyncio.iscoroutinefunction(handler):
+            @functools.wraps(handler)
+            async def timed_async(job):
+                started = time.perf_counter()
+                result = None
+                try:
+                    result = await handler(job)
+                    return result
+                except Exception as e:
+                    job.error = job.error or e
+                    raise
+                finally:
+                    self._finish_stage(stage, job, started, result)
+            return timed_async
+
+        @functools.wraps(handler)
+        def timed(job):
+            started = time.perf_counter()
+            result = None
+            try:
+                result = handler(job)
+                return result
+            except Exception as e:
+                job.error = job.error or e
+                raise
+            finally:
+                self._finish_stage(stage, job, started, result)
+        return timed
+
+    def trace(self, job):
+        """Writes the file's timing line; called once the job left the pipeline."""
+        match = job.match
+        record = {
+            "time": time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            "file": job.source_path,
+            "path": job.path,
+            "stages": {stage: round(seconds, 6) for stage, seconds in job.timings.items()},
+            "total": round(sum(job.timings.values()), 6),
+            "decode_seconds": round(job.decode_seconds, 6),
+            "windows": len(job.windows) if job.windows else None,
+            "backend": match.backend if match else None,
+            "matched": bool(match),
+            "cached": job.cached,
+            "fallback": job.fallback,
+            "deferred": job.deferred,
+            "error": repr(job.error) if job.error else None,
+        }
+        with self._lock:
+            if self.finished or self._trace.closed:
+                return  # Past the file limit, or traced after the session ended
+            self._trace.write(json.dumps(record) + "\n")
+            self._trace.flush()
+            self.files += 1
+            reached = self.finished
+        if reached and self._loop is not None:
+            # The profiler belongs to the event loop thread, stop it there
+            try:
+                self._loop.call_soon_threadsafe(self._stop_profile)
+            except RuntimeError:
+                pass  # Loop already closed, end_cycle stopped it
+
+    def close(self) -> Optional[Path]:
+        """Stops profiling and writes the stats; returns the summary path, None when nothing was profiled."""
+        self._stop_profile()
+        with self._lock:
+            self._trace.close()
+        if not self._profiled_once:
+            return None
+        try:
+            stats = pstats.Stats(self._profile)
+        except TypeError:
+            return None  # Enabled, but no calls recorded
+        stats.dump_stats(str(self.profile_path))
+        text = io.StringIO()
+        stats.stream = text
+        stats.sort_stats('cumulative').print_stats(self.TOP_FUNCTIONS)
+        self.summary_path.write_text(text.getvalue(), encoding='utf-8')
+        return self.summary_path
+
+    # --- Internals ---
+    def _stop_profile(self):
+        if self._profiling:
+            self._profile.disable()
+            self._profiling = False
+
+    def _finish_stage(self, stage: str, job, started: float, result):
+        job.timings[stage] = job.timings.get(stage, 0.0) + time.perf_counter() - started
+        if result is None:
+            # Finished, deferred or failed: the job goes no further
+            self.trace(job)
@@ -0,0 +1,128 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds, sized for everything from a sqlite lookup to a slow Shazam round trip
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+class stageMetrics:
+    """Thread-safe counters and latency histograms per processing stage.
+
+    Every stage gets `songid_stage_seconds` (histogram) and
+    `songid_stage_total` (counter, by result) series. Gauges and values owned
+    by other objects (queue lengths, cache hit counters) are read at render
+    time through registered collectors. `render()` returns the Prometheus
+    text exposition format.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, List] = {}  # stage -> [bucket counts, sum, count]
+        self._results: Dict[Tuple[str, str], int] = {}
+        self._gauges: Dict[str, Tuple[str, float]] = {}
+        self._collectors: List[Callable[[], Iterable[Tuple]]] = []
+
+    def observe(self, stage: str, seconds: float, ok: bool = True):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            key = (stage, 'ok' if ok else 'error')
+            self._results[key] = self._results.get(key, 0) + 1
+
+    @contextmanager
+    def time(self, stage: str):
+        """Times the block as one `stage` event; exceptions count as errors and propagate."""
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - started, ok=False)
+            raise
+        self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, stage: str, func: Callable) -> Callable:
+        """Wraps a blocking callable so every call is recorded under `stage`."""
+        def wrapper(*args, **kwargs):
+            with self.time(stage):
+                return func(*args, **kwargs)
+        return wrapper
+
+    def set_gauge(self, name: str, value: float, help_text: str = ""):
+        with self._lock:
+            self._gauges[name] = (help_text, value)
+
+    def register_collector(self, collector: Callable[[], Iterable[Tuple]]):
+        """`collector()` yields (name, type, help, labels dict, value) tuples on every render."""
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Per stage totals: {stage: {"count", "errors", "seconds"}}."""
+        with self._lock:
+            return {
+                stage: {
+                    "count": histogram[2],
+                    "errors": self._results.get((stage, 'error'), 0),
+                    "seconds": histogram[1],
+                }
+                for stage, histogram in self._histograms.items()
+            }
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            histograms = {stage: (list(h[0]), h[1], h[2]) for stage, h in self._histograms.items()}
+            results = dict(self._results)
+            gauges = dict(self._gauges)
+
+        if histograms:
+            lines.append("# HELP songid_stage_seconds Time spent per item in each processing stage.")
+            lines.append("# TYPE songid_stage_seconds histogram")
+            for stage, (counts, total, count) in sorted(histograms.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'songid_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+                lines.append(f'songid_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {count}')
+                lines.append(f'songid_stage_seconds_sum{{stage="{stage}"}} {total}')
+                lines.append(f'songid_stage_seconds_count{{stage="{stage}"}} {count}')
+
+        if results:
+            lines.append("# HELP songid_stage_total Items handled by each processing stage, by result.")
+            lines.append("# TYPE songid_stage_total counter")
+            for (stage, result), value in sorted(results.items()):
+                lines.append(f'songid_stage_total{{stage="{stage}",result="{result}"}} {value}')
+
+        for name, (help_text, value) in sorted(gauges.items()):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name} {value}")
+
+        # Samples of one metric must be adjacent in the output, whichever collector produced them
+        families: Dict[str, Tuple[str, str, List]] = {}
+        for collector in self._collectors:
+            try:
+                samples = list(collector())
+            except Exception:
+                continue  # A broken collector must not take the endpoint down
+            for name, metric_type, help_text, labels, value in samples:
+                families.setdefault(name, (metric_type, help_text, []))[2].append((labels, value))
+
+        for name, (metric_type, help_text, samples) in families.items():
+            if name in gauges:
+                continue
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples:
+                label_text = ",".join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
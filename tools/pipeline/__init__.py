@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['stagedPipeline', 'trackJob', 'cycleScheduler', 'cyclePacer', 'throughputEstimator']
\ No newline at end of file
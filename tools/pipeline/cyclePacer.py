@@ -0,0 +1,30 @@
+class cyclePacer:
+    """Decides how long to wait before the next scan cycle.
+
+    While files are left over for later cycles, the next cycle starts after
+    `backlog_interval` seconds, or once a throttling pause is over, so the
+    backlog drains as fast as the lookup limits allow instead of at
+    `maxQueueSize` files per `checkInterval`. A cycle that found work keeps
+    the normal `check_interval`. Each cycle in a row that found nothing to
+    do doubles the interval, up to `max_idle_interval`.
+    """
+
+    IDLE_BACKOFF = 2.0
+
+    def __init__(self, check_interval: float, backlog_interval: float = 5, max_idle_interval: float = 1800):
+        self.idle_cycles = 0
+        self.configure(check_interval, backlog_interval, max_idle_interval)
+
+    def configure(self, check_interval: float, backlog_interval: float, max_idle_interval: float):
+        self.check_interval = check_interval
+        self.backlog_interval = backlog_interval
+        self.max_idle_interval = max(check_interval, max_idle_interval)
+
+    def next_delay(self, elapsed: float, admitted: int, backlog: int, paused_for: float = 0.0) -> float:
+        """Seconds to sleep after a cycle that took `elapsed` seconds and admitted `admitted` files."""
+        if backlog > 0:
+            self.idle_cycles = 0
+            return max(self.backlog_interval, paused_for)
+        self.idle_cycles = 0 if admitted else self.idle_cycles + 1
+        interval = self.check_interval * self.IDLE_BACKOFF ** max(0, self.idle_cycles - 1)
+        return max(0.0, min(interval, self.max_idle_interval) - elapsed)
@@ -0,0 +1,112 @@
+import asyncio
+import os
+import time
+from typing import Dict, List, Tuple
+
+PRIORITIES = ('newest', 'smallest', 'walk')
+
+class cycleScheduler:
+    """Hands out one per-cycle budget to the files of all monitored paths in priority order.
+
+    `plan()` ranks every candidate of every path at once: by age (`newest`),
+    by size (`smallest`) or by position in the folder walk (`walk`), each
+    divided by the path's weight so heavier paths move up. Every path keeps
+    processing its own files concurrently, but a file is only admitted once
+    all better ranked files, from any path, were admitted or skipped, so the
+    budget always goes to the best candidates found by the cheap checks.
+    """
+
+    def __init__(self, budget: int, priority: str = 'newest', overrides: Dict[str, Dict] = None):
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority}")
+        self.budget = budget
+        self.priority = priority
+        self.overrides = overrides or {}
+        self.used = 0
+        self.deferred = 0  # Candidates left for a later cycle
+        self.deferred_files: List[Tuple[str, str]] = []  # Their (root, file), for callers that hand out files themselves
+        self.used_by_path: Dict[str, int] = {}
+        self._files: Dict[str, List[str]] = {}
+        self._rank: Dict[str, int] = {}
+        self._order: List[Tuple[str, str]] = []
+        self._resolved: List[bool] = []
+        self._head = 0
+        self._changed = asyncio.Event()
+
+    def plan(self, candidates: Dict[str, List[Tuple[str, os.stat_result]]]) -> Dict[str, List[str]]:
+        """Ranks (file, stat) candidates of every path, returns each path's files best first."""
+        now = time.time()
+        scored = []
+        for root_order, (root, entries) in enumerate(candidates.items()):
+            weight = self._override(root, 'weight') or 1.0
+            for walk_order, (file_path, st) in enumerate(entries):
+                if self.priority == 'newest':
+                    metric = max(0.0, now - st.st_mtime)
+                elif self.priority == 'smallest':
+                    metric = st.st_size
+                else:
+                    metric = walk_order
+                scored.append((metric / weight, root_order, file_path, root))
+        scored.sort()
+
+        self._files = {root: [] for root in candidates}
+        self._rank = {}
+        self._order = []
+        for rank, (_, _, file_path, root) in enumerate(scored):
+            self._files[root].append(file_path)
+            self._rank[file_path] = rank
+            self._order.append((root, file_path))
+        self._resolved = [False] * len(scored)
+        self._head = 0
+        return dict(self._files)
+
+    def files_for(self, root: str) -> List[str]:
+        return list(self._files.get(root, []))
+
+    def remaining(self) -> int:
+        return max(0, self.budget - self.used)
+
+    async def admit(self, root: str, file_path: str) -> bool:
+        """Waits for every better ranked file to be decided, then takes one unit of budget.
+
+        Returns False once the global budget or the path's own limit is used up.
+        """
+        rank = self._rank.get(file_path)
+        if rank is not None:
+            while self._head < rank:
+                self._changed.clear()
+                await self._changed.wait()
+
+        path_limit = self._override(root, 'maxQueueSize')
+        admitted = self.used < self.budget and (not path_limit or self.used_by_path.get(root, 0) < path_limit)
+        if admitted:
+            self.used += 1
+            self.used_by_path[root] = self.used_by_path.get(root, 0) + 1
+        self._resolve(rank, deferred=not admitted)
+        return admitted
+
+    def skip(self, file_path: str):
+        """Marks a file as decided without spending budget (already done, unchanged, failed...)."""
+        self._resolve(self._rank.get(file_path))
+
+    def finish(self, root: str):
+        """Releases whatever a path did not get to, so other paths never wait on it."""
+        for file_path in self._files.get(root, []):
+            self._resolve(self._rank.get(file_path), deferred=True)
+
+    def _resolve(self, rank: int, deferred: bool = False):
+        if rank is None or self._resolved[rank]:
+            return
+        self._resolved[rank] = True
+        if deferred:
+            self.deferred += 1
+            self.deferred_files.append(self._order[rank])
+        advanced = False
+        while self._head < len(self._resolved) and self._resolved[self._head]:
+            self._head += 1
+            advanced = True
+        if advanced:
+            self._changed.set()
+
+    def _override(self, root: str, key: str):
+        return (self.overrides.get(root) or {}).get(key)
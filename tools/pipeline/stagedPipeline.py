@@ -0,0 +1,90 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor
+from typing import AsyncIterator, Callable, List
+
+_DONE = object()
+
+class pipelineStage:
+    """One step of a stagedPipeline.
+
+    `handler` receives an item and returns the item to hand to the next stage,
+    or None when the item is finished. Blocking handlers run on the
+    pipeline's executor, async handlers run on the event loop.
+    """
+
+    def __init__(self, name: str, handler: Callable, concurrency: int = 1, blocking: bool = False):
+        self.name = name
+        self.handler = handler
+        self.concurrency = max(1, int(concurrency))
+        self.blocking = blocking
+
+class stagedPipeline:
+    """Runs items through a chain of stages connected by bounded queues.
+
+    `stage_stats` holds, per stage name, the items handled, the seconds its
+    workers spent in the handler and its concurrency, for throughput estimates.
+    """
+
+    def __init__(self, stages: List[pipelineStage], queue_size: int = 8, executor: Executor = None,
+                 on_error: Callable = None, logger: logging.Logger = None):
+        self.stages = stages
+        self.queue_size = queue_size
+        self.executor = executor
+        self.on_error = on_error  # Blocking callable(item, exception), runs on the executor
+        self.logger = logger or logging.getLogger("log")
+        self.stage_stats = {stage.name: [0, 0.0, stage.concurrency] for stage in stages}
+
+    async def run(self, source: AsyncIterator):
+        """Feeds every item produced by `source` through all stages and waits until they drained."""
+        loop = asyncio.get_running_loop()
+        queues = [asyncio.Queue(maxsize=self.queue_size) for _ in self.stages]
+
+        async def feed():
+            try:
+                async for item in source:
+                    await queues[0].put(item)
+            finally:
+                for _ in range(self.stages[0].concurrency):
+                    await queues[0].put(_DONE)
+
+        async def worker(index: int):
+            stage = self.stages[index]
+            while True:
+                item = await queues[index].get()
+                if item is _DONE:
+                    return
+                started = time.perf_counter()
+                try:
+                    if stage.blocking:
+                        result = await loop.run_in_executor(self.executor, stage.handler, item)
+                    else:
+                        result = await stage.handler(item)
+                except Exception as e:
+                    result = None
+                    await self._handle_error(loop, stage, item, e)
+                stats = self.stage_stats[stage.name]
+                stats[0] += 1
+                stats[1] += time.perf_counter() - started
+                if result is not None and index + 1 < len(queues):
+                    await queues[index + 1].put(result)
+
+        async def run_stage(index: int):
+            try:
+                await asyncio.gather(*(worker(index) for _ in range(self.stages[index].concurrency)))
+            finally:
+                if index + 1 < len(queues):
+                    for _ in range(self.stages[index + 1].concurrency):
+                        await queues[index + 1].put(_DONE)
+
+        await asyncio.gather(feed(), *(run_stage(i) for i in range(len(self.stages))))
+
+    async def _handle_error(self, loop, stage: pipelineStage, item, error: Exception):
+        if self.on_error is None:
+            self.logger.error(f"❌ Stage {stage.name} failed for {item}. Error: {error}")
+            return
+        try:
+            await loop.run_in_executor(self.executor, self.on_error, item, error)
+        except Exception as handler_error:
+            self.logger.critical(f"🚨 Error handler failed for {item}. Error: {handler_error}")
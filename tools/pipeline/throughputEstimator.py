@@ -0,0 +1,54 @@
+import math
+from typing import Dict, Optional, Tuple
+
+class throughputEstimator:
+    """Measured files per second of each pipeline stage, smoothed over cycles, and the backlog ETA built from them.
+
+    After every cycle each stage reports how many files it handled, how long
+    its workers were busy with them and how many workers it has; its
+    capacity is `workers * files / busy seconds`. Busy time includes waiting
+    for a lookup slot or a fingerprint process, so the rate and throttling
+    limits are part of what is measured. Capacities are smoothed with an
+    exponentially weighted moving average, the slowest stage sets the pace,
+    and every cycle also costs its walk and the pause before the next one.
+    """
+
+    ALPHA = 0.3  # Weight of the newest cycle
+
+    def __init__(self, alpha: float = ALPHA):
+        self.alpha = alpha
+        self.rates: Dict[str, float] = {}
+        self.cycle_overhead: Optional[float] = None  # Seconds per cycle outside the pipeline
+
+    def observe_stage(self, stage: str, files: int, busy_seconds: float, concurrency: int = 1):
+        if files <= 0 or busy_seconds <= 0:
+            return
+        self.rates[stage] = self._smooth(self.rates.get(stage), concurrency * files / busy_seconds)
+
+    def observe_cycle(self, overhead_seconds: float):
+        self.cycle_overhead = self._smooth(self.cycle_overhead, max(0.0, overhead_seconds))
+
+    def bottleneck(self) -> Optional[Tuple[str, float]]:
+        """(stage, files per second) of the slowest stage, None before anything was measured."""
+        if not self.rates:
+            return None
+        return min(self.rates.items(), key=lambda item: item[1])
+
+    def eta(self, remaining: int, files_per_cycle: int, pause: float = 0.0) -> Optional[float]:
+        """Seconds until `remaining` files are done at `files_per_cycle` per cycle with `pause` between cycles, None while unknown."""
+        if remaining <= 0:
+            return 0.0
+        slowest = self.bottleneck()
+        if slowest is None:
+            return None
+        cycles = math.ceil(remaining / max(1, files_per_cycle))
+        return remaining / slowest[1] + cycles * ((self.cycle_overhead or 0.0) + pause)
+
+    def summary(self) -> str:
+        return ", ".join(f"{stage} {rate:.2f}/s" for stage, rate in self.rates.items())
+
+    # --- Internals ---
+    def _smooth(self, previous: Optional[float], value: float) -> float:
+        if previous is None:
+            return value
+        return self.alpha * value + (1 - self.alpha) * previous
@@ -0,0 +1,24 @@
+class trackJob:
+    """A single audio file travelling through the recognition pipeline."""
+
+    def __init__(self, file_path: str, folder_path: str):
+        self.source_path = file_path  # Where the file was discovered
+        self.path = file_path         # Where the file currently is
+        self.folder_path = folder_path
+        self.step = None           # Last step recorded in the work journal
+        self.snapshot = None       # metadataSnapshot read at discovery, reused for the fallback and the move
+        self.audio_hash = None
+        self.cached = False
+        self.signature = None
+        self.landmarks = None      # (hashes, offsets) for the local fingerprint index, decoded with the signature
+        self.windows = None        # Sampling window offsets, None when the whole file is fingerprinted
+        self.window = 0
+        self.decode_seconds = 0.0
+        self.match = None          # recognitionResult once identified
+        self.fallback = None
+        self.deferred = False      # Left for a later cycle, e.g. while the recognizer throttles us
+        self.timings = {}          # Seconds per stage, only filled while profiling
+        self.error = None
+
+    def __repr__(self):
+        return f"trackJob({self.path!r})"
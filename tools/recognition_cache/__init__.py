@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['audioHash', 'recognitionCache']
\ No newline at end of file
@@ -0,0 +1,160 @@
+import os
+import struct
+import hashlib
+from typing import BinaryIO, List, Optional, Tuple
+
+CHUNK_SIZE = 1 << 20
+
+def audio_payload_hash(file_path: str) -> Optional[str]:
+    """Hashes only the audio payload of a file, ignoring every tag container.
+
+    Retagging a file (ID3, APE, Vorbis comments, FLAC metadata blocks, MP4
+    atoms outside `mdat`) leaves the hash unchanged. Returns None when the
+    container can not be parsed.
+    """
+    ext = os.path.splitext(file_path)[1].lower()
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if ext == '.ogg':
+                return _ogg_hash(f)
+            if ext == '.mp3':
+                spans = [_mp3_span(f, size)]
+            elif ext == '.flac':
+                spans = [_flac_span(f, size)]
+            elif ext == '.wav':
+                spans = _riff_spans(f, size)
+            elif ext == '.m4a':
+                spans = _mp4_spans(f, size)
+            else:
+                return None
+            return _hash_spans(f, spans)
+    except (OSError, ValueError, struct.error):
+        return None
+
+def _hash_spans(f: BinaryIO, spans: List[Tuple[int, int]]) -> Optional[str]:
+    digest = hashlib.blake2b(digest_size=20)
+    hashed = 0
+    for start, end in spans:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+            hashed += len(chunk)
+    if not hashed:
+        return None
+    return digest.hexdigest()
+
+def _skip_id3v2(f: BinaryIO) -> int:
+    """Returns the offset right after any leading ID3v2 tags."""
+    offset = 0
+    while True:
+        f.seek(offset)
+        header = f.read(10)
+        if len(header) < 10 or header[:3] != b'ID3':
+            return offset
+        tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        offset += 10 + tag_size + (10 if header[5] & 0x10 else 0)
+
+def _trailing_tags_start(f: BinaryIO, end: int) -> int:
+    """Walks back over ID3v1 and APEv2 tags at the end of the file."""
+    while end >= 32:
+        if end >= 128:
+            f.seek(end - 128)
+            if f.read(3) == b'TAG':
+                end -= 128
+                continue
+        f.seek(end - 32)
+        footer = f.read(32)
+        if footer[:8] == b'APETAGEX':
+            tag_size, _items, flags = struct.unpack('<III', footer[12:24])
+            end -= tag_size + (32 if flags & 0x80000000 else 0)
+            continue
+        break
+    return end
+
+def _mp3_span(f: BinaryIO, size: int) -> Tuple[int, int]:
+    return _skip_id3v2(f), _trailing_tags_start(f, size)
+
+def _flac_span(f: BinaryIO, size: int) -> Tuple[int, int]:
+    offset = _skip_id3v2(f)
+    f.seek(offset)
+    if f.read(4) != b'fLaC':
+        raise ValueError("not a FLAC stream")
+    offset += 4
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            raise ValueError("truncated FLAC metadata")
+        length = int.from_bytes(header[1:4], 'big')
+        offset += 4 + length
+        if header[0] & 0x80:
+            break
+        f.seek(offset)
+    return offset, _trailing_tags_start(f, size)
+
+def _riff_spans(f: BinaryIO, size: int) -> List[Tuple[int, int]]:
+    f.seek(0)
+    header = f.read(12)
+    if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        raise ValueError("not a RIFF/WAVE file")
+    offset = 12
+    while offset + 8 <= size:
+        f.seek(offset)
+        chunk_id, chunk_size = struct.unpack('<4sI', f.read(8))
+        if chunk_id == b'data':
+            return [(offset + 8, min(size, offset + 8 + chunk_size))]
+        offset += 8 + chunk_size + (chunk_size & 1)
+    raise ValueError("no data chunk")
+
+def _mp4_spans(f: BinaryIO, size: int) -> List[Tuple[int, int]]:
+    spans = []
+    offset = 0
+    while offset + 8 <= size:
+        f.seek(offset)
+        atom_size, atom_type = struct.unpack('>I4s', f.read(8))
+        header_size = 8
+        if atom_size == 1:
+            atom_size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif atom_size == 0:
+            atom_size = size - offset
+        if atom_size < header_size:
+            raise ValueError("invalid MP4 atom")
+        if atom_type == b'mdat':
+            spans.append((offset + header_size, min(size, offset + atom_size)))
+        offset += atom_size
+    if not spans:
+        raise ValueError("no mdat atom")
+    return spans
+
+def _ogg_hash(f: BinaryIO) -> Optional[str]:
+    """Hashes the bodies of Ogg pages that carry audio.
+
+    Header and comment pages never complete an audio packet, so everything up
+    to the first page with a positive granule position is skipped.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    hashed = 0
+    in_audio = False
+    f.seek(0)
+    while True:
+        header = f.read(27)
+        if len(header) < 27:
+            break
+        if header[:4] != b'OggS':
+            raise ValueError("lost Ogg page sync")
+        granule = struct.unpack('<q', header[6:14])[0]
+        segments = f.read(header[26])
+        body = f.read(sum(segments))
+        in_audio = in_audio or granule > 0
+        if in_audio:
+            digest.update(body)
+            hashed += len(body)
+    if not hashed:
+        return None
+    return digest.hexdigest()
@@ -0,0 +1,111 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .audioHash import audio_payload_hash
+
+class recognitionCache:
+    """Persistent cache of parsed recognition results keyed by audio-payload hash.
+
+    Entries expire after `ttl_seconds` and the least recently used ones are
+    evicted once more than `max_entries` are stored.
+    """
+
+    def __init__(self, db_path: Path, ttl_seconds: int, max_entries: int):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                hash      TEXT PRIMARY KEY,
+                result    TEXT NOT NULL,
+                created   REAL NOT NULL,
+                last_used REAL NOT NULL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)")
+        self._conn.commit()
+        self.purge()
+
+    def get(self, audio_hash: str) -> Optional[Dict]:
+        if not audio_hash:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT result, created FROM results WHERE hash = ?", (audio_hash,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            result, created = row
+            if now - created > self.ttl_seconds:
+                self._conn.execute("DELETE FROM results WHERE hash = ?", (audio_hash,))
+                self._conn.commit()
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET last_used = ? WHERE hash = ?", (now, audio_hash))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(result)
+
+    def put(self, audio_hash: str, result: Dict):
+        if not audio_hash or not result:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results (hash, result, created, last_used) VALUES (?, ?, ?, ?)",
+                (audio_hash, json.dumps(result), now, now),
+            )
+            self._evict_over_cap()
+            self._conn.commit()
+
+    def invalidate(self, audio_hash: str) -> bool:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM results WHERE hash = ?", (audio_hash,)).rowcount
+            self._conn.commit()
+        return removed > 0
+
+    def invalidate_file(self, file_path: str) -> bool:
+        """Drops the cached result for the audio contained in `file_path`."""
+        audio_hash = audio_payload_hash(file_path)
+        return bool(audio_hash) and self.invalidate(audio_hash)
+
+    def clear(self) -> int:
+        with self._lock:
+            removed = self._conn.execute("DELETE FROM results").rowcount
+            self._conn.commit()
+        return removed
+
+    def purge(self) -> int:
+        """Removes expired entries and enforces the size cap."""
+        with self._lock:
+            removed = self._conn.execute(
+                "DELETE FROM results WHERE created < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+            removed += self._evict_over_cap()
+            self._conn.commit()
+        return removed
+
+    def _evict_over_cap(self) -> int:
+        count = self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        excess = count - self.max_entries
+        if excess <= 0:
+            return 0
+        return self._conn.execute(
+            "DELETE FROM results WHERE hash IN (SELECT hash FROM results ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        ).rowcount
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
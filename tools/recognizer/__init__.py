@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['fingerprint', 'windowSampler', 'pooledHttpClient', 'recognitionResult', 'recognizerBackend', 'shazamRecognizer', 'replayRecognizer', 'rateController']
\ No newline at end of file
@@ -0,0 +1,42 @@
+import time
+from typing import Optional, Tuple
+import numpy as np
+from pydub import AudioSegment
+from shazamio.converter import Converter
+from shazamio.signature import DecodedMessage
+
+from tools.fingerprint_index import landmarks as landmark_extractor
+
+LANDMARK_MAX_SECONDS = 120  # Audio indexed per file, taken from the middle of the decoded part
+
+def _decode(file_path: str, start_second: float = None, duration: float = None) -> AudioSegment:
+    song = AudioSegment.from_file(file_path, start_second=start_second, duration=duration)
+    return Converter.normalize_audio_data(song)
+
+def extract_landmarks(audio: AudioSegment) -> Tuple[np.ndarray, np.ndarray]:
+    """Spectral landmarks of normalized (16 kHz mono) audio for the local fingerprint index."""
+    samples = np.frombuffer(audio.raw_data, dtype=np.int16)
+    limit = LANDMARK_MAX_SECONDS * audio.frame_rate
+    if len(samples) > limit:
+        start = (len(samples) - limit) // 2
+        samples = samples[start:start + limit]
+    return landmark_extractor.extract(samples, audio.frame_rate)
+
+def generate_fingerprint_bytes(file_path: str, start_second: float = None, duration: float = None,
+                               with_landmarks: bool = False) -> Tuple[Optional[bytes], float, Optional[Tuple[np.ndarray, np.ndarray]]]:
+    """Process pool entry point: only the compact binary signature (and landmark arrays) cross the process boundary.
+
+    This is the CPU and disk heavy half of `Shazam.recognize_song`; the
+    signature goes to `Shazam.send_recognize_request` for the network lookup.
+    With `start_second`/`duration` only that window is decoded by ffmpeg.
+    Returns (signature bytes or None when the audio is too short, decode seconds, (landmark hashes, offsets) or None).
+    Landmarks come from the same decoded audio, so the local index costs no extra decode.
+    """
+    started = time.perf_counter()
+    audio = _decode(file_path, start_second or None, duration)
+    signature = Converter.create_signature_generator(audio).get_next_signature()
+    landmarks = extract_landmarks(audio) if with_landmarks else None
+    return (signature.encode_to_binary() if signature else None), time.perf_counter() - started, landmarks
+
+def signature_from_bytes(data: Optional[bytes]) -> Optional[DecodedMessage]:
+    return DecodedMessage.decode_from_binary(data) if data else None
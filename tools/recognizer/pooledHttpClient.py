@@ -0,0 +1,82 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Union
+
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
+from aiohttp_retry import ExponentialRetry, RetryClient, RetryOptionsBase
+from shazamio.exceptions import BadMethod
+from shazamio.interfaces.client import HTTPClientInterface
+from shazamio.utils import validate_json
+
+from .recognizerBackend import throttledError
+
+# Answers that mean "slow down" rather than "broken"; they are not retried
+# here but raised so the rate controller can back off for everyone
+THROTTLE_STATUSES = {429, 503}
+
+class pooledHttpClient(HTTPClientInterface):
+    """Shazam HTTP client that keeps one aiohttp session and connection pool.
+
+    shazamio's default client opens a new session for every request. This one
+    is created once per process; the session is (re)opened lazily on the
+    running event loop and closed with `close()`. Throttling responses raise
+    `throttledError` instead of being retried with the other server errors.
+    """
+
+    def __init__(self, retry_options: Optional[RetryOptionsBase] = None, pool_size: int = 8, timeout: float = 30.0):
+        # shazamio's default retry policy, minus the throttling statuses
+        self.retry_options = retry_options or ExponentialRetry(
+            attempts=20,
+            max_timeout=60,
+            statuses={500, 502, 504},
+        )
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._session: Optional[ClientSession] = None
+        self._client: Optional[RetryClient] = None
+        self._loop = None
+
+    def _get_client(self) -> RetryClient:
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._session.closed or self._loop is not loop:
+            # A session belongs to the loop that created it
+            self._session = ClientSession(
+                connector=TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                timeout=ClientTimeout(total=self.timeout),
+            )
+            self._client = RetryClient(
+                client_session=self._session,
+                retry_options=self.retry_options,
+                raise_for_status=False,
+            )
+            self._loop = loop
+        return self._client
+
+    async def request(self, method: str, url: str, *args, **kwargs) -> Union[List[Any], Dict[str, Any]]:
+        client = self._get_client()
+        if method.upper() == "GET":
+            async with client.get(url, **kwargs) as resp:
+                self._check_throttled(resp)
+                return await validate_json(resp, *args)
+        if method.upper() == "POST":
+            async with client.post(url, **kwargs) as resp:
+                self._check_throttled(resp)
+                return await validate_json(resp, *args)
+        raise BadMethod("Accept only GET/POST")
+
+    @staticmethod
+    def _check_throttled(resp):
+        if resp.status not in THROTTLE_STATUSES:
+            return
+        retry_after = None
+        try:
+            retry_after = float(resp.headers.get("Retry-After", ""))
+        except ValueError:
+            pass  # Missing, or an HTTP date we do not bother parsing
+        raise throttledError(resp.status, retry_after)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed and self._loop is asyncio.get_running_loop():
+            await self._session.close()
+        self._session = None
+        self._client = None
+        self._loop = None
@@ -0,0 +1,148 @@
+import asyncio
+import collections
+import contextlib
+import logging
+import random
+import time
+from typing import Optional
+
+class rateController:
+    """AIMD limit on concurrent lookups and lookup rate, shared by all monitored paths.
+
+    Every successful lookup raises the allowed concurrency and request rate a
+    little (additive increase); a throttling answer cuts both by `DECREASE`
+    (multiplicative decrease) and pauses all lookups for an exponentially
+    growing, jittered delay, or as long as the service asked for. Throttling
+    answers from requests that were already in flight when the first one
+    arrived count as the same episode, so a burst of 429s cuts the limits
+    once. Throughput therefore settles just below what the service tolerates.
+
+    Lookups start unthrottled up to `max_concurrency` and, when set,
+    `max_rate` requests per second; a rate limit is only imposed once the
+    service pushes back, starting from a cut of the rate that was observed.
+    """
+
+    MIN_RATE = 0.05          # Requests per second, never slower than one every 20s
+    RATE_INCREASE = 0.05     # Requests per second added per successful lookup
+    DECREASE = 0.7           # Share of the limits kept after throttling, closer to 1 wastes less capacity
+    BACKOFF_BASE = 1.0       # Seconds, doubled per consecutive throttling episode
+    BACKOFF_MAX = 300.0
+    RATE_WINDOW = 30.0       # Seconds of request starts used to measure the current rate
+
+    def __init__(self, max_concurrency: int, max_rate: float = 0, logger: logging.Logger = None):
+        self.logger = logger or logging.getLogger("log")
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate or None
+        self.concurrency = float(max_concurrency)
+        self.rate: Optional[float] = self.max_rate
+        self.in_flight = 0
+        self.throttled = 0
+        self._streak = 0
+        self._paused_until = 0.0
+        self._episode_until = 0.0
+        self._next_start = 0.0
+        self._starts = collections.deque(maxlen=1024)
+        self._condition = None
+        self._loop = None
+
+    def configure(self, max_concurrency: int, max_rate: float = 0):
+        """Applies new limits from a config reload without forgetting what was learned."""
+        self.max_concurrency = max_concurrency
+        self.max_rate = max_rate or None
+        self.concurrency = min(self.concurrency, float(max_concurrency))
+        if self.max_rate is not None:
+            self.rate = min(self.rate or self.max_rate, self.max_rate)
+
+    @contextlib.asynccontextmanager
+    async def slot(self):
+        """Waits for a free lookup slot under the current limits and any pause."""
+        await self._acquire()
+        try:
+            yield
+        finally:
+            await self._release()
+
+    def pause_remaining(self) -> float:
+        """Seconds until lookups may start again after throttling, 0 when not paused."""
+        return max(0.0, self._paused_until - time.monotonic())
+
+    def on_success(self):
+        self._streak = 0
+        self.concurrency = min(float(self.max_concurrency), self.concurrency + 1.0 / self.concurrency)
+        if self.rate is not None:
+            self.rate = self.rate + self.RATE_INCREASE
+            if self.max_rate is not None:
+                self.rate = min(self.rate, self.max_rate)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> float:
+        """Backs off after a throttling answer, returns the pause in seconds."""
+        self.throttled += 1
+        now = time.monotonic()
+        if now < self._episode_until:
+            # Another in-flight lookup of the same burst, the limits were already cut
+            return max(0.0, self._paused_until - now)
+
+        self._streak += 1
+        delay = min(self.BACKOFF_MAX, self.BACKOFF_BASE * 2 ** (self._streak - 1))
+        delay = random.uniform(delay / 2, delay)
+        if retry_after:
+            delay = max(delay, min(float(retry_after), self.BACKOFF_MAX))
+        self._paused_until = max(self._paused_until, now + delay)
+        self._episode_until = self._paused_until
+
+        self.concurrency = max(1.0, self.concurrency * self.DECREASE)
+        self.rate = max(self.MIN_RATE, (self.rate or self._observed_rate(now)) * self.DECREASE)
+        self.logger.warning(
+            f"🐢 Throttled by the recognizer, pausing lookups for {delay:.0f}s "
+            f"(limits now {int(self.concurrency)} in flight, {self.rate:.2f}/s)"
+        )
+        return delay
+
+    # --- Internals ---
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._condition is None or self._loop is not loop:
+            self._condition = asyncio.Condition()
+            self._loop = loop
+            self.in_flight = 0
+        return self._condition
+
+    def _observed_rate(self, now: float) -> float:
+        while self._starts and self._starts[0] < now - self.RATE_WINDOW:
+            self._starts.popleft()
+        if len(self._starts) < 2:
+            return self.MIN_RATE * 2
+        return len(self._starts) / max(1.0, now - self._starts[0])
+
+    def _wait_time(self, now: float) -> Optional[float]:
+        """Seconds until a lookup may start, 0 if now, None while every slot is taken."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self.in_flight >= int(self.concurrency):
+            return None
+        if self.rate is not None and now < self._next_start:
+            return self._next_start - now
+        return 0.0
+
+    async def _acquire(self):
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                now = time.monotonic()
+                wait = self._wait_time(now)
+                if wait == 0.0:
+                    break
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+            self.in_flight += 1
+            self._starts.append(now)
+            if self.rate is not None:
+                self._next_start = max(now, self._next_start) + 1.0 / self.rate
+
+    async def _release(self):
+        condition = self._get_condition()
+        async with condition:
+            self.in_flight = max(0, self.in_flight - 1)
+            condition.notify_all()
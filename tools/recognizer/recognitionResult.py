@@ -0,0 +1,32 @@
+from typing import Any, Dict, Optional
+
+class recognitionResult:
+    """A match returned by a recognizer backend."""
+
+    __slots__ = ('title', 'artist', 'album', 'release_date', 'cover_url', 'backend', 'track_id')
+
+    def __init__(self, title: str, artist: str, album: Optional[str] = None, release_date: Optional[str] = None,
+                 cover_url: Optional[str] = None, backend: str = None, track_id: Optional[str] = None):
+        self.title = title
+        self.artist = artist
+        self.album = album
+        self.release_date = release_date
+        self.cover_url = cover_url
+        self.backend = backend
+        self.track_id = track_id
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> Optional['recognitionResult']:
+        """Builds a result from `to_dict()` output (or an older cache entry), None for empty input."""
+        if not data:
+            return None
+        return cls(**{name: data.get(name) for name in cls.__slots__})
+
+    def __eq__(self, other):
+        return isinstance(other, recognitionResult) and self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"recognitionResult({self.artist!r} - {self.title!r}, backend={self.backend!r})"
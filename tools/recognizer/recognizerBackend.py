@@ -0,0 +1,36 @@
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:
+    from shazamio.signature import DecodedMessage  # Only for annotations, songId imports this module before shazamio is needed
+
+from .recognitionResult import recognitionResult
+
+class throttledError(Exception):
+    """The service refused a lookup because of rate limiting (HTTP 429 and friends).
+
+    `retry_after` is the delay in seconds the service asked for, if it said so.
+    """
+
+    def __init__(self, status: int = None, retry_after: Optional[float] = None):
+        super().__init__(f"throttled (HTTP {status})" + (f", retry after {retry_after:.0f}s" if retry_after else ""))
+        self.status = status
+        self.retry_after = retry_after
+
+class recognizerBackend(ABC):
+    """Looks up a fingerprint signature (see `fingerprint`) and returns the match, if any.
+
+    Implementations are created once per process and used concurrently from
+    the event loop. Network or service failures are raised, throttling as
+    `throttledError` so callers can back off instead of giving up; "no
+    match" is returned as None.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def recognize(self, signature: 'DecodedMessage') -> Optional[recognitionResult]:
+        raise NotImplementedError
+
+    async def close(self):
+        """Releases connections and flushes anything kept in memory."""
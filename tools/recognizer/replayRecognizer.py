@@ -0,0 +1,94 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from shazamio.signature import DecodedMessage
+
+from .recognitionResult import recognitionResult
+from .recognizerBackend import recognizerBackend
+
+class replayRecognizer(recognizerBackend):
+    """Records lookups of another backend to disk, or serves them back offline.
+
+    In `record` mode every lookup goes to `inner` and its outcome (match or
+    no match) and latency are appended to a JSONL file keyed by a hash of the
+    signature. In `replay` mode the file is the only source: known signatures
+    are answered without network access, optionally after their recorded
+    latency, and unknown ones count as a miss and return no match.
+    """
+
+    name = "replay"
+
+    def __init__(self, recordings_path: Path, mode: str = 'replay', inner: recognizerBackend = None,
+                 replay_latency: bool = False, logger: logging.Logger = None):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"Unknown mode {mode}")
+        if mode == 'record' and inner is None:
+            raise ValueError("record mode needs a backend to record")
+        self.recordings_path = Path(recordings_path)
+        self.recordings_path.parent.mkdir(parents=True, exist_ok=True)
+        self.mode = mode
+        self.inner = inner
+        self.replay_latency = replay_latency
+        self.logger = logger or logging.getLogger("log")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._recordings: Dict[str, Dict] = self._load()
+
+    @staticmethod
+    def signature_key(signature: DecodedMessage) -> str:
+        return hashlib.blake2b(signature.encode_to_binary(), digest_size=16).hexdigest()
+
+    async def recognize(self, signature: DecodedMessage) -> Optional[recognitionResult]:
+        key = self.signature_key(signature)
+        if self.mode == 'record':
+            started = time.perf_counter()
+            result = await self.inner.recognize(signature)
+            self._append(key, result, time.perf_counter() - started)
+            return result
+
+        recording = self._recordings.get(key)
+        if recording is None:
+            self.misses += 1
+            self.logger.warning(f"📼 No recording for signature {key}, treating it as no match")
+            return None
+        self.hits += 1
+        if self.replay_latency:
+            await asyncio.sleep(recording.get("latency", 0.0))
+        return recognitionResult.from_dict(recording.get("result"))
+
+    async def close(self):
+        if self.inner is not None:
+            await self.inner.close()
+
+    def _load(self) -> Dict[str, Dict]:
+        recordings = {}
+        try:
+            with open(self.recordings_path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        recordings[entry["key"]] = entry
+                    except (json.JSONDecodeError, KeyError):
+                        continue  # Torn last line after a crash
+        except FileNotFoundError:
+            pass
+        return recordings
+
+    def _append(self, key: str, result: Optional[recognitionResult], latency: float):
+        entry = {
+            "key": key,
+            "result": result.to_dict() if result else None,
+            "latency": round(latency, 4),
+            "recorded": time.time(),
+        }
+        with self._lock:
+            self._recordings[key] = entry
+            with open(self.recordings_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
@@ -0,0 +1,50 @@
+from typing import Any, Dict, Optional
+
+from shazamio import Shazam
+from shazamio.signature import DecodedMessage
+
+from .pooledHttpClient import pooledHttpClient
+from .recognitionResult import recognitionResult
+from .recognizerBackend import recognizerBackend
+
+class shazamRecognizer(recognizerBackend):
+    """Shazam lookups through one long-lived client and connection pool."""
+
+    name = "shazam"
+
+    def __init__(self, pool_size: int = 8):
+        self.http_client = pooledHttpClient(pool_size=pool_size)
+        self.client = Shazam(http_client=self.http_client)
+
+    async def recognize(self, signature: DecodedMessage) -> Optional[recognitionResult]:
+        response = await self.client.send_recognize_request(signature)
+        return self.parse_response(response)
+
+    async def close(self):
+        await self.http_client.close()
+
+    @classmethod
+    def parse_response(cls, out: Dict[str, Any]) -> Optional[recognitionResult]:
+        """Pulls title, artist, album, release date and cover url out of a raw Shazam response."""
+        if not out or not out.get('track'):
+            return None
+
+        track = out['track']
+        album = None
+        release_date = None
+        for section in track.get('sections', []):
+            if section.get('type') == 'SONG' and 'metadata' in section:
+                metadata = section['metadata']
+                album = metadata[0].get('text') if metadata else None
+                release_date = metadata[2].get('text') if len(metadata) > 2 else None
+                break
+
+        return recognitionResult(
+            title=track.get('title'),
+            artist=track.get('subtitle'),
+            album=album,
+            release_date=release_date,
+            cover_url=(track.get('images') or {}).get('coverart', None),
+            backend=cls.name,
+            track_id=track.get('key'),
+        )
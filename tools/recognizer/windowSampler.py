@@ -0,0 +1,48 @@
+import threading
+from typing import Dict, List
+
+# Where windows are taken, as a fraction of the track; the middle first, like Shazam itself
+WINDOW_POSITIONS = (0.5, 0.25, 0.75, 0.1, 0.9, 0.4, 0.6)
+
+def window_offsets(length: float, count: int, window_seconds: float) -> List[float]:
+    """Start offsets (seconds) of up to `count` non-overlapping windows, most promising first."""
+    if not length or length <= window_seconds:
+        return [0.0]
+
+    latest = length - window_seconds
+    offsets = []
+    for position in WINDOW_POSITIONS[:count]:
+        start = min(max(0.0, length * position - window_seconds / 2), latest)
+        if all(abs(start - other) >= window_seconds for other in offsets):
+            offsets.append(round(start, 2))
+    return offsets
+
+class windowStats:
+    """Per-window attempt, hit and timing counters used to tune window count and length."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: Dict[int, Dict[str, float]] = {}
+
+    def record(self, window: int, decode_seconds: float, lookup_seconds: float, hit: bool):
+        with self._lock:
+            entry = self._windows.setdefault(window, {"attempts": 0, "hits": 0, "decode": 0.0, "lookup": 0.0})
+            entry["attempts"] += 1
+            entry["hits"] += int(hit)
+            entry["decode"] += decode_seconds
+            entry["lookup"] += lookup_seconds
+
+    def summary(self) -> str:
+        with self._lock:
+            parts = []
+            for window, entry in sorted(self._windows.items()):
+                attempts = entry["attempts"] or 1
+                parts.append(
+                    f"w{window + 1} {entry['hits']}/{entry['attempts']} hit "
+                    f"(decode {entry['decode'] / attempts:.2f}s, lookup {entry['lookup'] / attempts:.2f}s)"
+                )
+        return ", ".join(parts)
+
+    def reset(self):
+        with self._lock:
+            self._windows.clear()
@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['scanIndex', 'treeWalker']
\ No newline at end of file
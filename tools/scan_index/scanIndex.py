@@ -0,0 +1,127 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+class scanIndex:
+    """On-disk index of per-file processing outcomes keyed by path, inode, size and mtime.
+
+    Files whose stat signature still matches the recorded one can be skipped
+    without being opened with mutagen again. A second table remembers each
+    directory's mtime, subdirectories and supported file count so the
+    folder walk can skip directories that did not change (see `treeWalker`).
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                path     TEXT PRIMARY KEY,
+                inode    INTEGER NOT NULL,
+                size     INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                status   TEXT NOT NULL,
+                updated  REAL NOT NULL
+            )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS dirs (
+                path     TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                subdirs  TEXT NOT NULL,
+                files    INTEGER NOT NULL,
+                settled  TEXT,
+                checked  REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def lookup(self, path: str, stat_result: os.stat_result = None) -> Optional[str]:
+        """Returns the recorded status if the file is unchanged since it was recorded, else None."""
+        try:
+            st = stat_result or os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT inode, size, mtime_ns, status FROM files WHERE path = ?", (path,)
+            ).fetchone()
+
+        if row is None:
+            return None
+        inode, size, mtime_ns, status = row
+        if inode != st.st_ino or size != st.st_size or mtime_ns != st.st_mtime_ns:
+            return None
+        return status
+
+    def record(self, path: str, status: str, stat_result: os.stat_result = None):
+        """Stores the outcome for a file together with its current stat signature."""
+        try:
+            st = stat_result or os.stat(path)
+        except OSError:
+            self.forget(path)
+            return
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, status, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, st.st_ino, st.st_size, st.st_mtime_ns, status, time.time()),
+            )
+            self._conn.commit()
+
+    def record_many(self, rows: Iterable[Tuple[str, str, os.stat_result]]):
+        """Stores (path, status, stat) rows in one commit."""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO files (path, inode, size, mtime_ns, status, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, st.st_ino, st.st_size, st.st_mtime_ns, status, now) for path, status, st in rows],
+            )
+            self._conn.commit()
+
+    def move(self, old_path: str, new_path: str, status: str):
+        """Drops the entry of the old location and records the file at its new one."""
+        if old_path != new_path:
+            self.forget(old_path)
+        self.record(new_path, status)
+
+    def counts(self) -> Dict[str, int]:
+        """Number of indexed files per status."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM files GROUP BY status").fetchall())
+
+    def forget(self, path: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM files WHERE path = ?", (path,))
+            self._conn.commit()
+
+    def load_dirs(self) -> Dict[str, Tuple[int, list, int, Optional[str], float]]:
+        """All remembered directories: path -> (mtime_ns, subdirs, files, settled, checked)."""
+        with self._lock:
+            rows = self._conn.execute("SELECT path, mtime_ns, subdirs, files, settled, checked FROM dirs").fetchall()
+        return {path: (mtime_ns, json.loads(subdirs), files, settled, checked)
+                for path, mtime_ns, subdirs, files, settled, checked in rows}
+
+    def store_dirs(self, rows: Iterable[Tuple[str, int, list, int, Optional[str], float]], forget: Iterable[str] = ()):
+        """Saves (path, mtime_ns, subdirs, files, settled, checked) rows and drops vanished directories in one commit."""
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO dirs (path, mtime_ns, subdirs, files, settled, checked) VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, mtime_ns, json.dumps(subdirs), files, settled, checked)
+                 for path, mtime_ns, subdirs, files, settled, checked in rows],
+            )
+            self._conn.executemany("DELETE FROM dirs WHERE path = ?", [(path,) for path in forget])
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
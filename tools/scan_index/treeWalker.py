@@ -0,0 +1,130 @@
+import os
+import time
+from typing import Callable, Iterator, Optional, Tuple
+
+class treeWalker:
+    """Streams the supported files below a folder with `os.scandir`, skipping directories that did not change.
+
+    Files are yielded top-down as `(path, stat)` while the walk goes on, with
+    the stat taken from the `DirEntry`, so nothing is stat'ed twice and no
+    full listing is built first. Files `is_done(path, stat)` reports as
+    already handled are counted but not yielded.
+
+    With a scan index, every fully listed directory is remembered with its
+    mtime, subdirectories and supported file count. A directory is pruned
+    (not listed again, only its subdirectories visited) when its mtime is
+    unchanged, so no entry was added, removed or renamed in it, all of its
+    files were already handled, and it was listed less than
+    `recheck_seconds` ago. Tag edits in place do not touch the directory
+    mtime; they are noticed at the next recheck.
+    """
+
+    RECHECK_SECONDS = 86400
+
+    def __init__(self, extensions: Tuple[str, ...], index=None, is_done: Callable[[str, os.stat_result], bool] = None,
+                 settle_key: str = 'default', recheck_seconds: float = RECHECK_SECONDS):
+        self.extensions = tuple(ext.lower() for ext in extensions)
+        self.index = index
+        self.is_done = is_done
+        self.settle_key = settle_key  # What "all handled" meant, a different mode invalidates pruning
+        self.recheck_seconds = recheck_seconds
+        self.total = 0          # Supported files below the folder, listed or remembered
+        self.done = 0           # Of those, already handled (not yielded)
+        self.listed = 0         # Directories listed
+        self.pruned = 0         # Directories skipped as unchanged
+        self.complete = False   # False when the walk stopped at `limit`
+
+    def walk(self, root: str, limit: Optional[int] = None) -> Iterator[Tuple[str, os.stat_result]]:
+        """Yields files that still need work; stops once `limit` of them were found."""
+        cache = self.index.load_dirs() if self.index is not None else {}
+        updates, vanished = [], []
+        now = time.time()
+        found = 0
+        stack = [root]
+        try:
+            while stack:
+                directory = stack.pop()
+                try:
+                    dir_stat = os.stat(directory)
+                except OSError:
+                    if directory in cache:
+                        vanished.append(directory)
+                    continue
+
+                cached = cache.get(directory)
+                if (cached and cached[0] == dir_stat.st_mtime_ns and cached[3] == self.settle_key
+                        and now - cached[4] < self.recheck_seconds):
+                    self.pruned += 1
+                    self.total += cached[2]
+                    self.done += cached[2]
+                    stack.extend(os.path.join(directory, name) for name in reversed(cached[1]))
+                    continue
+
+                self.listed += 1
+                try:
+                    with os.scandir(directory) as it:
+                        entries = list(it)  # Closed before yielding, a paused walk holds no descriptor
+                except OSError:
+                    continue
+
+                subdirs, files, settled = [], 0, True
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            if not entry.is_symlink():  # Like os.walk, symlinked folders are not followed
+                                subdirs.append(entry.name)
+                            continue
+                        if not entry.name.lower().endswith(self.extensions) or not entry.is_file():
+                            continue
+                        entry_stat = entry.stat()
+                    except OSError:
+                        continue  # Gone since it was listed
+                    files += 1
+                    if self.is_done is not None and self.is_done(entry.path, entry_stat):
+                        self.done += 1
+                        continue
+                    settled = False
+                    yield entry.path, entry_stat
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return  # This directory was not seen completely, so it is not remembered
+
+                self.total += files
+                updates.append((directory, dir_stat.st_mtime_ns, subdirs, files, self.settle_key if settled else None, now))
+                stack.extend(os.path.join(directory, name) for name in reversed(subdirs))
+            self.complete = True
+        finally:
+            if self.index is not None and (updates or vanished):
+                self.index.store_dirs(updates, vanished)
+
+    def count(self, root: str) -> int:
+        """Cheap count of the supported files below `root`: remembered counts for unchanged
+        directories, names only (no stat) for the others."""
+        cache = self.index.load_dirs() if self.index is not None else {}
+        total = 0
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                dir_stat = os.stat(directory)
+            except OSError:
+                continue
+            cached = cache.get(directory)
+            if cached and cached[0] == dir_stat.st_mtime_ns:
+                total += cached[2]
+                stack.extend(os.path.join(directory, name) for name in cached[1])
+                continue
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir():
+                                if not entry.is_symlink():
+                                    stack.append(entry.path)
+                            elif entry.name.lower().endswith(self.extensions) and entry.is_file():
+                                total += 1
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return total
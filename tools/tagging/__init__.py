@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['tagTransaction', 'metadataSnapshot']
\ No newline at end of file
@@ -0,0 +1,128 @@
+import os
+from typing import Dict, Optional, Tuple
+from mutagen import File
+from mutagen.id3 import ID3
+
+from .tagTransaction import FIELDS, ID3_FIELDS, MP4_FIELDS
+
+LOSSY_EXTENSIONS = ('.mp3', '.m4a', '.ogg')
+
+class metadataSnapshot:
+    """What songID needs to know about a file's tags and stream, read with a single mutagen parse.
+
+    The roybatty check, the minimal tag check, the fallback tag read and the
+    quality folder all used to open the file themselves (FLACs twice for
+    the quality); they now read from one snapshot. Only unknown formats
+    need a second, easy-mode parse.
+
+        snapshot = metadataSnapshot.load(path)
+        snapshot.has_comment('roybatty'), snapshot.has_minimal_tags, snapshot.quality_category
+    """
+
+    __slots__ = ('path', 'ext', 'supported', 'title', 'artist', 'album', 'date', 'comments',
+                 'bitrate', 'sample_rate', 'channels', 'length', 'bits_per_sample', 'quality_category')
+
+    def __init__(self, path: str):
+        self.path = path
+        self.ext = os.path.splitext(path)[1].lower()
+        self.supported = False
+        self.title = self.artist = self.album = self.date = None
+        self.comments: Tuple[str, ...] = ()
+        self.bitrate = self.sample_rate = self.channels = 0
+        self.length = 0.0
+        self.bits_per_sample = None
+        self.quality_category = "Unknown"
+
+    @classmethod
+    def load(cls, path: str) -> 'metadataSnapshot':
+        """Parses the file once; unsupported or unreadable-as-audio files give an empty, unsupported snapshot."""
+        snapshot = cls(path)
+        audio = File(path)
+        if audio is None:
+            return snapshot
+        snapshot.supported = True
+        snapshot._read_stream(audio.info)
+
+        tags = audio.tags
+        if isinstance(tags, ID3):
+            values = {key: cls._first_text(tags.get(frame.__name__)) for key, frame in ID3_FIELDS.items()}
+            comments = [str(text) for frame in tags.getall('COMM') for text in frame.text]
+        elif snapshot.ext == '.m4a':
+            tags = tags or {}
+            values = {key: cls._first(tags.get(atom)) for key, atom in MP4_FIELDS.items()}
+            comments = [str(value) for value in tags.get('\xa9cmt', [])]
+        elif tags is not None and snapshot.ext in ('.flac', '.ogg'):
+            # Vorbis comments
+            values = {key: cls._first(tags.get(key)) for key in FIELDS}
+            comments = [str(value) for value in tags.get('comment', [])]
+        else:
+            easy = File(path, easy=True)
+            values = {key: cls._first(easy.get(key)) if easy is not None else None for key in FIELDS}
+            comments = [str(value) for value in (easy.get('comment', []) if easy is not None else [])]
+
+        snapshot.title, snapshot.artist = values['title'], values['artist']
+        snapshot.album, snapshot.date = values['album'], values['date']
+        snapshot.comments = tuple(comments)
+        return snapshot
+
+    @property
+    def has_minimal_tags(self) -> bool:
+        return bool(self.title and self.artist)
+
+    def has_comment(self, text: str) -> bool:
+        text = text.lower()
+        return any(text in comment.lower() for comment in self.comments)
+
+    def tags(self) -> Dict[str, Optional[str]]:
+        return {'title': self.title, 'artist': self.artist, 'album': self.album, 'date': self.date}
+
+    def quality(self) -> Dict[str, any]:
+        """Same shape `_extract_audio_quality` always returned."""
+        if not self.supported:
+            return {"quality_category": "Unknown", "bitrate": 0, "sample_rate": 0}
+        info = {
+            "bitrate": self.bitrate,
+            "sample_rate": self.sample_rate,
+            "channels": self.channels,
+            "length": self.length,
+            "quality_category": self.quality_category,
+        }
+        if self.bits_per_sample is not None:
+            info["bits_per_sample"] = self.bits_per_sample
+        return info
+
+    # --- Internals ---
+    def _read_stream(self, info):
+        self.bitrate = getattr(info, 'bitrate', 0) or 0
+        self.sample_rate = getattr(info, 'sample_rate', 0) or 0
+        self.channels = getattr(info, 'channels', 0) or 0
+        self.length = getattr(info, 'length', 0) or 0
+        if self.ext == '.flac':
+            self.bits_per_sample = getattr(info, 'bits_per_sample', 16)
+            self.quality_category = "Lossless"
+        elif self.ext == '.wav':
+            self.quality_category = "Lossless"
+        elif self.ext in LOSSY_EXTENSIONS:
+            self.quality_category = self._lossy_category(self.bitrate // 1000)
+
+    @staticmethod
+    def _lossy_category(bitrate_kbps: int) -> str:
+        if bitrate_kbps >= 320:
+            return "High (320+ kbps)"
+        if bitrate_kbps >= 256:
+            return "High (256+ kbps)"
+        if bitrate_kbps >= 192:
+            return "Medium (192+ kbps)"
+        if bitrate_kbps >= 128:
+            return "Medium (128+ kbps)"
+        if bitrate_kbps > 0:
+            return "Low (<128 kbps)"
+        return "Unknown"
+
+    @staticmethod
+    def _first(values) -> Optional[str]:
+        return str(values[0]) if values else None
+
+    @staticmethod
+    def _first_text(frame) -> Optional[str]:
+        return str(frame.text[0]) if frame is not None and frame.text else None
@@ -0,0 +1,182 @@
+import os
+from typing import Dict, Optional
+from mutagen import File
+from mutagen.flac import FLAC, Picture
+from mutagen.mp3 import MP3
+from mutagen.wave import WAVE
+from mutagen.id3 import ID3, APIC, COMM, TIT2, TPE1, TALB, TDRC
+from mutagen.mp4 import MP4, MP4Cover
+
+# Frames that survive a strip, everything else (comments included) is dropped
+ID3_FRAMES_TO_KEEP = {'TIT2', 'TPE1', 'TALB', 'TDRC', 'TYER', 'APIC'}
+ID3_FIELDS = {'title': TIT2, 'artist': TPE1, 'album': TALB, 'date': TDRC}
+MP4_FIELDS = {'title': '\xa9nam', 'artist': '\xa9ART', 'album': '\xa9alb', 'date': '\xa9day'}
+FIELDS = ('title', 'artist', 'album', 'date')
+
+class tagTransaction:
+    """Collects strip, set, comment and cover changes for one file and writes them at once.
+
+    The file is loaded and parsed once and saved once in `commit()`, however
+    many changes were queued.
+
+        tags = tagTransaction(path).strip().set(artist=a, title=t).comment('roybatty').commit()
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._strip = False
+        self._fields: Dict[str, str] = {}
+        self._comment: Optional[str] = None
+        self._cover: Optional[tuple] = None
+
+    def strip(self) -> 'tagTransaction':
+        """Drops every tag except title, artist, album, date (and pictures for FLAC)."""
+        self._strip = True
+        return self
+
+    def set(self, artist: str = None, title: str = None, album: str = None, date: str = None) -> 'tagTransaction':
+        for key, value in (('artist', artist), ('title', title), ('album', album), ('date', date)):
+            if value:
+                self._fields[key] = value
+        return self
+
+    def comment(self, text: str) -> 'tagTransaction':
+        if text:
+            self._comment = text
+        return self
+
+    def cover(self, image_data: bytes, mime_type: str = 'image/jpeg') -> 'tagTransaction':
+        if image_data:
+            self._cover = (image_data, mime_type)
+        return self
+
+    def commit(self) -> Dict[str, str]:
+        """Applies all queued changes with a single save.
+
+        Returns the title/artist/album/date found in the file before any change,
+        or an empty dict for unsupported files.
+        """
+        ext = os.path.splitext(self.file_path)[1].lower()
+        if ext == '.mp3':
+            return self._commit_id3(MP3(self.file_path, ID3=ID3))
+        if ext == '.wav':
+            return self._commit_id3(WAVE(self.file_path))
+        if ext == '.flac':
+            return self._commit_flac(FLAC(self.file_path))
+        if ext == '.m4a':
+            return self._commit_mp4(MP4(self.file_path))
+        return self._commit_easy()
+
+    # --- Per-format writers ---
+    def _commit_id3(self, audio) -> Dict[str, str]:
+        if audio.tags is None:
+            audio.add_tags()
+        id3 = audio.tags
+
+        previous = {}
+        for key, frame_id in (('title', 'TIT2'), ('artist', 'TPE1'), ('album', 'TALB'), ('date', 'TDRC')):
+            frame = id3.get(frame_id)
+            previous[key] = str(frame.text[0]) if frame and frame.text else None
+
+        if self._strip:
+            id3.delall("COMM")
+            for key in list(id3.keys()):
+                if key not in ID3_FRAMES_TO_KEEP:
+                    id3.delall(key)
+
+        for key, value in self._fields.items():
+            id3.setall(ID3_FIELDS[key].__name__, [ID3_FIELDS[key](encoding=3, text=[value])])
+
+        if self._comment:
+            id3.add(COMM(encoding=3, lang='eng', desc='Comment', text=self._comment))
+
+        if self._cover:
+            image_data, mime_type = self._cover
+            id3.add(APIC(encoding=3, mime=mime_type, type=3, desc='Cover', data=image_data))
+
+        audio.save()
+        return previous
+
+    def _commit_flac(self, audio: FLAC) -> Dict[str, str]:
+        if audio.tags is None:
+            audio.add_tags()
+
+        previous = {key: audio.get(key, [None])[0] for key in FIELDS}
+
+        if self._strip:
+            audio.tags.clear()
+            for key, value in previous.items():
+                if value:
+                    audio[key.upper()] = value
+
+        for key, value in self._fields.items():
+            audio[key.upper()] = value
+
+        if self._comment:
+            audio['comment'] = self._comment
+
+        if self._cover:
+            image_data, mime_type = self._cover
+            image = Picture()
+            image.data = image_data
+            image.type = 3  # cover(front)
+            image.mime = mime_type
+            image.desc = "Cover"
+            audio.clear_pictures()
+            audio.add_picture(image)
+
+        audio.save()
+        return previous
+
+    def _commit_mp4(self, audio: MP4) -> Dict[str, str]:
+        if audio.tags is None:
+            audio.add_tags()
+
+        previous = {}
+        for key, atom in MP4_FIELDS.items():
+            values = audio.tags.get(atom)
+            previous[key] = str(values[0]) if values else None
+
+        if self._strip:
+            audio.tags.clear()
+            for key, value in previous.items():
+                if value:
+                    audio[MP4_FIELDS[key]] = value
+
+        for key, value in self._fields.items():
+            audio[MP4_FIELDS[key]] = value
+
+        if self._comment:
+            audio["\xa9cmt"] = self._comment
+
+        if self._cover:
+            image_data, mime_type = self._cover
+            image_format = MP4Cover.FORMAT_PNG if mime_type == 'image/png' else MP4Cover.FORMAT_JPEG
+            audio["covr"] = [MP4Cover(image_data, imageformat=image_format)]
+
+        audio.save()
+        return previous
+
+    def _commit_easy(self) -> Dict[str, str]:
+        audio = File(self.file_path, easy=True)
+        if audio is None:
+            return {}
+        if audio.tags is None:
+            audio.add_tags()
+
+        previous = {key: audio.get(key, [None])[0] for key in FIELDS}
+
+        if self._strip:
+            audio.tags.clear()
+            for key, value in previous.items():
+                if value:
+                    audio[key] = value
+
+        for key, value in self._fields.items():
+            audio[key] = value
+
+        if self._comment:
+            audio['comment'] = self._comment
+
+        audio.save()
+        return previous
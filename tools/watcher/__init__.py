@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['folderWatcher']
\ No newline at end of file
@@ -0,0 +1,259 @@
+import os
+import ctypes
+import ctypes.util
+import select
+import struct
+import threading
+import time
+import logging
+from typing import Dict, List, Tuple
+
+# inotify(7) flags
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0x00000800
+IN_CLOEXEC = 0x00080000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE_SELF | IN_MOVE_SELF
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class folderWatcher:
+    """Watches the monitored folders and queues created or moved-in audio files.
+
+    Uses inotify when the platform provides it and falls back to a cheap
+    periodic stat snapshot otherwise. Files are only handed out once they
+    have been quiet for `debounce` seconds and their size and mtime stopped
+    changing, so partially written downloads are not picked up.
+    """
+
+    def __init__(self, roots: List[str], extensions: Tuple[str, ...], debounce: float = 5.0,
+                 poll_interval: float = 10.0, logger: logging.Logger = None):
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.extensions = tuple(e.lower() for e in extensions)
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.logger = logger or logging.getLogger("log")
+
+        self._pending: Dict[str, list] = {}  # path -> [root, last_event, size, mtime_ns]
+        self._lock = threading.Lock()
+        self._event = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._overflow = False
+        self.mode = None
+
+        # inotify state
+        self._fd = None
+        self._wd_paths: Dict[int, Tuple[str, str]] = {}  # wd -> (root, directory)
+
+    # --- Lifecycle ---
+    def start(self):
+        libc = self._load_libc()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                self._libc = libc
+                self._fd = fd
+                for root in self.roots:
+                    self._watch_tree(root, root)
+                self.mode = "inotify"
+                self._thread = threading.Thread(target=self._inotify_loop, name="folderWatcher", daemon=True)
+                self._thread.start()
+                self.logger.info(f"👁️ Watching {len(self.roots)} path(s) with inotify ({len(self._wd_paths)} folders)")
+                return
+            self.logger.warning(f"👁️ inotify unavailable (errno {ctypes.get_errno()}), falling back to polling")
+
+        self.mode = "polling"
+        self._snapshot = self._take_snapshot()
+        self._thread = threading.Thread(target=self._polling_loop, name="folderWatcher", daemon=True)
+        self._thread.start()
+        self.logger.info(f"👁️ Watching {len(self.roots)} path(s) by polling every {self.poll_interval}s")
+
+    def stop(self):
+        self._stop.set()
+        self._event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # --- Consumer API ---
+    def ready(self) -> List[Tuple[str, str]]:
+        """Returns (root, file_path) pairs whose debounce window has elapsed with a stable stat."""
+        now = time.monotonic()
+        out = []
+        with self._lock:
+            for path, entry in list(self._pending.items()):
+                root, last_event, size, mtime_ns = entry
+                if now - last_event < self.debounce:
+                    continue
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    del self._pending[path]  # Gone before we got to it
+                    continue
+                if (st.st_size, st.st_mtime_ns) != (size, mtime_ns):
+                    # Still being written, restart the quiet period
+                    entry[1:] = [now, st.st_size, st.st_mtime_ns]
+                    continue
+                del self._pending[path]
+                out.append((root, path))
+            if not self._pending:
+                self._event.clear()
+        return out
+
+    def wait(self, timeout: float):
+        """Blocks until a queued file may be ready or the timeout elapses."""
+        with self._lock:
+            if self._pending:
+                earliest = min(entry[1] for entry in self._pending.values())
+                timeout = min(timeout, max(0.1, earliest + self.debounce - time.monotonic()))
+                wait_for_event = False
+            else:
+                wait_for_event = True
+        if wait_for_event:
+            if self._event.wait(timeout):
+                # Something arrived, give it its debounce window
+                self._stop.wait(self.debounce)
+        else:
+            self._stop.wait(timeout)
+
+    def take_overflow(self) -> bool:
+        """True once after events were lost and a full reconciliation scan is needed."""
+        with self._lock:
+            overflow, self._overflow = self._overflow, False
+        return overflow
+
+    def pending_count(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    # --- Internals ---
+    def _queue(self, root: str, path: str):
+        if not path.lower().endswith(self.extensions):
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        with self._lock:
+            self._pending[path] = [root, time.monotonic(), st.st_size, st.st_mtime_ns]
+            self._event.set()
+
+    def _touch(self, root: str, path: str):
+        with self._lock:
+            entry = self._pending.get(path)
+            if entry is not None:
+                entry[1] = time.monotonic()
+                return
+        self._queue(root, path)
+
+    @staticmethod
+    def _load_libc():
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1
+            libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        return libc
+
+    def _watch_tree(self, root: str, directory: str, queue_files: bool = False):
+        for current, dirs, files in os.walk(directory):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(current), WATCH_MASK)
+            if wd < 0:
+                self.logger.warning(f"👁️ Could not watch {current} (errno {ctypes.get_errno()}), check fs.inotify.max_user_watches")
+                with self._lock:
+                    self._overflow = True
+                continue
+            self._wd_paths[wd] = (root, current)
+            if queue_files:
+                # A whole folder was moved in, its files never produce their own events
+                for filename in files:
+                    self._queue(root, os.path.join(current, filename))
+
+    def _inotify_loop(self):
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], 1.0)
+            except (OSError, ValueError):
+                break
+            if not readable:
+                continue
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                break
+            self._handle_events(data)
+
+    def _handle_events(self, data: bytes):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                self.logger.warning("👁️ inotify queue overflowed, a reconciliation scan will follow")
+                with self._lock:
+                    self._overflow = True
+                continue
+            if mask & IN_IGNORED:
+                self._wd_paths.pop(wd, None)
+                continue
+
+            watched = self._wd_paths.get(wd)
+            if watched is None or not name:
+                continue
+            root, directory = watched
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self._watch_tree(root, path, queue_files=True)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE):
+                self._queue(root, path)
+            elif mask & IN_MODIFY:
+                self._touch(root, path)
+
+    def _take_snapshot(self) -> Dict[str, Tuple[str, int, int]]:
+        snapshot = {}
+        for root in self.roots:
+            stack = [root]
+            while stack:
+                directory = stack.pop()
+                try:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            if entry.is_dir(follow_symlinks=False):
+                                stack.append(entry.path)
+                            elif entry.name.lower().endswith(self.extensions):
+                                st = entry.stat()
+                                snapshot[entry.path] = (root, st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+        return snapshot
+
+    def _polling_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            snapshot = self._take_snapshot()
+            for path, (root, size, mtime_ns) in snapshot.items():
+                previous = self._snapshot.get(path)
+                if previous is None or previous[1:] != (size, mtime_ns):
+                    self._queue(root, path)
+            self._snapshot = snapshot
@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['workJournal']
\ No newline at end of file
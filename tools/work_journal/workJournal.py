@@ -0,0 +1,95 @@
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+class workJournal:
+    """Write-ahead journal of the files admitted to the pipeline and how far each got.
+
+    A file is journaled as `queued` when it is admitted, then advanced to
+    `fingerprinted` (with its signature), `looked_up` (with the match) and
+    `tagged`; it is removed once it has been moved or given up on. After a
+    restart, the entries still present are exactly the files that were in
+    flight, and each one carries what is needed to continue after its last
+    step without decoding or asking Shazam again.
+    """
+
+    STEPS = ('queued', 'fingerprinted', 'looked_up', 'tagged')
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # FULL: a step must survive the container being killed right after it was written
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                source_path TEXT PRIMARY KEY,
+                folder_path TEXT NOT NULL,
+                path        TEXT NOT NULL,
+                step        TEXT NOT NULL,
+                payload     TEXT NOT NULL,
+                signature   BLOB,
+                created     REAL NOT NULL,
+                updated     REAL NOT NULL
+            )"""
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def enqueue(self, source_path: str, folder_path: str):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO jobs (source_path, folder_path, path, step, payload, signature, created, updated) "
+                "VALUES (?, ?, ?, 'queued', '{}', NULL, ?, ?)",
+                (source_path, folder_path, source_path, now, now),
+            )
+            self._conn.commit()
+
+    def advance(self, source_path: str, step: str, path: str, payload: Dict = None, signature: bytes = None):
+        """Records that `step` finished; `payload` is merged into what earlier steps stored."""
+        if step not in self.STEPS:
+            raise ValueError(f"Unknown step {step}")
+        with self._lock:
+            row = self._conn.execute("SELECT payload FROM jobs WHERE source_path = ?", (source_path,)).fetchone()
+            if row is None:
+                return
+            merged = {**json.loads(row[0]), **(payload or {})}
+            self._conn.execute(
+                "UPDATE jobs SET step = ?, path = ?, payload = ?, signature = COALESCE(?, signature), updated = ? "
+                "WHERE source_path = ?",
+                (step, path, json.dumps(merged), signature, time.time(), source_path),
+            )
+            self._conn.commit()
+
+    def complete(self, source_path: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM jobs WHERE source_path = ?", (source_path,))
+            self._conn.commit()
+
+    def pending(self, folder_path: Optional[str] = None) -> List[Dict]:
+        """Unfinished entries in admission order, optionally for one monitored folder."""
+        query = "SELECT source_path, folder_path, path, step, payload, signature FROM jobs"
+        args = ()
+        if folder_path is not None:
+            query += " WHERE folder_path = ?"
+            args = (folder_path,)
+        with self._lock:
+            rows = self._conn.execute(query + " ORDER BY created", args).fetchall()
+        return [
+            {"source_path": source, "folder_path": folder, "path": path, "step": step,
+             "payload": json.loads(payload), "signature": signature}
+            for source, folder, path, step, payload, signature in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
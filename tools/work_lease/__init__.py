@@ -0,0 +1,2 @@
+from . import *
+__all__ = ['leaseManager']
\ No newline at end of file
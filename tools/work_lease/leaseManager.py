@@ -0,0 +1,171 @@
+import hashlib
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Dict, Optional
+
+class leaseManager:
+    """Claims files for this worker with lease files, so several songID instances can share a library.
+
+    A lease is a small file in `<monitored path>/.songid_leases`, named
+    after the file's path relative to the monitored path (so workers may
+    mount the library in different places). It is created with `O_EXCL`,
+    which is atomic on local filesystems and NFSv3+, so exactly one worker
+    gets it. A background thread touches every held lease each third of
+    `lease_seconds`; a lease whose file was not touched for `lease_seconds`
+    belongs to a dead worker and is taken over. Expiry compares the lease
+    file's mtime with the local clock, so the workers' clocks must be kept
+    in sync (NTP).
+
+        leases = leaseManager('worker-a', lease_seconds=300)
+        if leases.claim(folder_path, file_path):
+            ...
+            leases.release(folder_path, file_path)
+    """
+
+    LEASE_DIR = '.songid_leases'
+
+    def __init__(self, worker_id: str = None, lease_seconds: float = 300, logger: logging.Logger = None):
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.logger = logger or logging.getLogger("log")
+        self.claimed = 0
+        self.contended = 0
+        self.reclaimed = 0
+        self.lost = 0
+        self._held: Dict[str, str] = {}  # lease file -> leased file path
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._heartbeat, name="lease-heartbeat", daemon=True)
+        self._thread.start()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._held)
+
+    def claim(self, folder_path: str, file_path: str) -> bool:
+        """True when this worker now holds the file, False while another live worker does."""
+        lease_path = self._lease_path(folder_path, file_path)
+        with self._lock:
+            if lease_path in self._held:
+                return True
+        body = json.dumps({"worker": self.worker_id, "path": os.path.relpath(file_path, folder_path),
+                           "claimed": time.time()}).encode()
+
+        for _ in range(3):
+            try:
+                os.makedirs(os.path.dirname(lease_path), exist_ok=True)
+                fd = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+            except FileExistsError:
+                owner = self._owner(lease_path)
+                if owner == self.worker_id:
+                    os.utime(lease_path)
+                    break  # Ours from before a restart with the same worker id
+                if not self._expired(lease_path):
+                    self.contended += 1
+                    return False
+                if not self._take_over(lease_path):
+                    continue
+                self.reclaimed += 1
+                self.logger.info(f"🪪 Reclaimed expired lease of {owner or 'an unknown worker'} on {os.path.basename(file_path)}")
+                continue
+            except FileNotFoundError:
+                continue  # The lease folder was removed as empty in between, create it again
+            try:
+                os.write(fd, body)
+            finally:
+                os.close(fd)
+            break
+        else:
+            self.contended += 1
+            return False
+
+        with self._lock:
+            self._held[lease_path] = file_path
+        self.claimed += 1
+        return True
+
+    def holds(self, folder_path: str, file_path: str) -> bool:
+        """False once the lease was lost, e.g. taken over after this worker stalled past its expiry."""
+        with self._lock:
+            return self._lease_path(folder_path, file_path) in self._held
+
+    def release(self, folder_path: str, file_path: str):
+        lease_path = self._lease_path(folder_path, file_path)
+        with self._lock:
+            if self._held.pop(lease_path, None) is None:
+                return
+        self._remove_if_owned(lease_path)
+
+    def close(self):
+        """Stops the heartbeat and gives up every lease still held."""
+        self._stop.set()
+        self._thread.join(timeout=5)
+        with self._lock:
+            held, self._held = list(self._held), {}
+        for lease_path in held:
+            self._remove_if_owned(lease_path)
+
+    # --- Internals ---
+    def _lease_path(self, folder_path: str, file_path: str) -> str:
+        relative = os.path.relpath(file_path, folder_path)
+        digest = hashlib.sha1(relative.encode('utf-8', 'surrogateescape')).hexdigest()
+        return os.path.join(folder_path, self.LEASE_DIR, f"{digest}.lease")
+
+    @staticmethod
+    def _owner(lease_path: str) -> Optional[str]:
+        try:
+            with open(lease_path, 'rb') as f:
+                return json.loads(f.read() or b'{}').get("worker")
+        except (OSError, ValueError):
+            return None  # Gone, or still being written
+
+    def _expired(self, lease_path: str) -> bool:
+        try:
+            return time.time() - os.stat(lease_path).st_mtime > self.lease_seconds
+        except OSError:
+            return True
+
+    def _take_over(self, lease_path: str) -> bool:
+        """Moves an expired lease aside; only one of several workers trying this at once succeeds."""
+        stale = f"{lease_path}.{self.worker_id.replace(os.sep, '_')}.stale"
+        try:
+            os.rename(lease_path, stale)
+        except OSError:
+            return False  # Someone else took it over or released it first
+        if not self._expired(stale):
+            # Renewed or re-claimed between our check and the rename: put it back
+            try:
+                os.link(stale, lease_path)
+            except OSError:
+                pass  # A third worker claimed it meanwhile, theirs wins
+            os.unlink(stale)
+            return False
+        os.unlink(stale)
+        return True
+
+    def _remove_if_owned(self, lease_path: str):
+        if self._owner(lease_path) == self.worker_id:
+            try:
+                os.unlink(lease_path)
+            except OSError:
+                pass
+
+    def _heartbeat(self):
+        while not self._stop.wait(self.lease_seconds / 3):
+            with self._lock:
+                held = list(self._held.items())
+            for lease_path, file_path in held:
+                if self._owner(lease_path) == self.worker_id:
+                    try:
+                        os.utime(lease_path)
+                        continue
+                    except OSError:
+                        pass
+                with self._lock:
+                    self._held.pop(lease_path, None)
+                self.lost += 1
+                self.logger.warning(f"🪪 Lost the lease on {os.path.basename(file_path)}, another worker took it over")